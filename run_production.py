@@ -17,7 +17,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from llm_framework.orchestrator import AgentOrchestrator
 from llm_framework.continuous_agent import ContinuousAgent
+from llm_framework.agent_journal import AgentJournal
 from llm_framework.github_integration import GitHubIntegration, AgentGitHubBridge
+from llm_framework.callback_dispatcher import CallbackDispatcher, OVERFLOW_POLICIES
+from llm_framework.async_runtime import AsyncAgentRuntime
+from llm_framework.sharded_runner import ShardedAgentRunner
 
 # Set up logging
 logging.basicConfig(
@@ -37,6 +41,10 @@ class PersistentAgentRunner:
     def __init__(self, args):
         self.args = args
         self.continuous_agents = []
+        self.callback_dispatcher = None
+        self.runtime = None
+        self.sharded_runner = None
+        self.journals = []
         self.running = True
         self.restart_count = 0
         self.max_restarts = 100
@@ -65,6 +73,16 @@ class PersistentAgentRunner:
             logger.info(f"Setting up GitHub integration for {repo_owner}/{repo_name}")
             github = GitHubIntegration(repo_owner, repo_name)
             github_bridge = AgentGitHubBridge(github, self.args.issue_number)
+
+            # Deliver results from background workers so GitHub latency
+            # never blocks the agents
+            self.callback_dispatcher = CallbackDispatcher(
+                github_bridge,
+                max_outbox=self.args.callback_outbox,
+                overflow_policy=self.args.callback_overflow,
+                spill_path=self.args.callback_spill_path,
+            )
+            self.callback_dispatcher.start()
         
         # Determine which agents to run
         if self.args.agent == "all":
@@ -72,32 +90,85 @@ class PersistentAgentRunner:
         else:
             agent_names = [self.args.agent]
         
+        if self.args.shards > 1:
+            return self.setup_sharded_agents(agent_names)
+        
+        # Host agents as coroutines on one event loop instead of one thread each
+        if self.args.runtime == "async":
+            self.runtime = AsyncAgentRuntime(max_concurrency=self.args.max_concurrency)
+            logger.info(f"Using async runtime (max concurrency {self.args.max_concurrency})")
+        
         # Create continuous agents
         for name in agent_names:
             agent = orchestrator.get_agent(name)
             if agent:
-                cont_agent = ContinuousAgent(
-                    agent=agent,
+                agent_kwargs = dict(
                     interval=self.args.interval,
-                    max_iterations=self.args.max_iterations
+                    max_iterations=self.args.max_iterations,
+                    max_queue_depth=self.args.max_queue_depth,
+                    max_queue_wait=self.args.max_queue_wait
                 )
+                if self.args.state_dir:
+                    # Queue and history survive restarts of this process
+                    journal = AgentJournal(os.path.join(self.args.state_dir, f"{name}.wal"))
+                    self.journals.append(journal)
+                    agent_kwargs['journal'] = journal
+                if self.runtime:
+                    cont_agent = self.runtime.add_agent(name, agent, **agent_kwargs)
+                else:
+                    cont_agent = ContinuousAgent(agent=agent, **agent_kwargs)
                 
                 # Set up GitHub callback if available
-                if github_bridge:
-                    cont_agent.on_result_callback = github_bridge
+                if self.callback_dispatcher:
+                    cont_agent.on_result_callback = self.callback_dispatcher
                 
-                # Add demo tasks for testing
-                cont_agent.add_task(f"Analyze the current state of {name} capabilities")
-                cont_agent.add_task(f"List best practices for {name} tasks")
+                # Add demo tasks for testing, unless work was recovered
+                if len(cont_agent.scheduler) == 0:
+                    cont_agent.add_task(f"Analyze the current state of {name} capabilities")
+                    cont_agent.add_task(f"List best practices for {name} tasks")
+                else:
+                    logger.info(f"{name}: resuming {len(cont_agent.scheduler)} "
+                               f"recovered task(s)")
                 
                 self.continuous_agents.append((name, cont_agent))
         
         return len(self.continuous_agents) > 0
     
+    def setup_sharded_agents(self, agent_names):
+        """Spread agents across worker processes; each shard builds its own providers."""
+        logger.info(f"Sharding {len(agent_names)} agent(s) across {self.args.shards} processes")
+        self.sharded_runner = ShardedAgentRunner(
+            agent_names,
+            num_shards=self.args.shards,
+            state_dir=self.args.state_dir,
+            agent_kwargs=dict(
+                interval=self.args.interval,
+                max_iterations=self.args.max_iterations,
+                max_queue_depth=self.args.max_queue_depth,
+                max_queue_wait=self.args.max_queue_wait
+            )
+        )
+        if self.callback_dispatcher:
+            self.sharded_runner.on_result_callback = self.callback_dispatcher
+        
+        for proxy in self.sharded_runner.agents():
+            proxy.add_task(f"Analyze the current state of {proxy.name} capabilities")
+            proxy.add_task(f"List best practices for {proxy.name} tasks")
+            self.continuous_agents.append((proxy.name, proxy))
+        
+        return len(self.continuous_agents) > 0
+    
     def start_agents(self):
         """Start all continuous agents."""
         logger.info(f"Starting {len(self.continuous_agents)} continuous agent(s)...")
         
+        if self.sharded_runner:
+            self.sharded_runner.start()
+            for shard in self.sharded_runner.get_status()["shards"]:
+                logger.info(f"✓ Started shard {shard['shard_id']} (pid {shard['pid']}): "
+                           f"{', '.join(shard['agents'])}")
+            return
+        
         for name, cont_agent in self.continuous_agents:
             cont_agent.start()
             logger.info(f"✓ Started {name} agent")
@@ -151,10 +222,26 @@ class PersistentAgentRunner:
         logger.info("=== Agent Status ===")
         for name, cont_agent in self.continuous_agents:
             status = cont_agent.get_status()
+            admission = status.get('admission', {})
             logger.info(f"{name}: Running={status['is_running']}, "
                        f"Iterations={status['iteration_count']}, "
                        f"Pending={status['tasks_pending']}, "
-                       f"Results={status['results_count']}")
+                       f"Results={status['results_count']}, "
+                       f"Shed={admission.get('shed', 0)}, "
+                       f"Rejected={admission.get('rejected', 0)}")
+        if self.sharded_runner:
+            for shard in self.sharded_runner.get_status()["shards"]:
+                logger.info(f"Shard {shard['shard_id']}: Alive={shard['alive']}, "
+                           f"PID={shard['pid']}, "
+                           f"Heartbeat={shard['heartbeat_age']}s ago, "
+                           f"Restarts={shard['restarts']}")
+        if self.callback_dispatcher:
+            stats = self.callback_dispatcher.get_stats()
+            logger.info(f"GitHub outbox: Depth={stats['outbox_depth']}, "
+                       f"Delivered={stats['delivered']}, "
+                       f"Failed={stats['failed']}, "
+                       f"Dropped={stats['dropped']}, "
+                       f"Spilled={stats['spilled_pending']}")
     
     def stop_agents(self):
         """Stop all agents gracefully."""
@@ -165,6 +252,22 @@ class PersistentAgentRunner:
                 logger.info(f"✓ Stopped {name} agent")
             except Exception as e:
                 logger.error(f"Error stopping {name} agent: {e}")
+
+        if self.runtime:
+            self.runtime.stop()
+
+        if self.sharded_runner:
+            self.sharded_runner.stop()
+
+        for journal in self.journals:
+            journal.close()
+
+        if self.callback_dispatcher:
+            logger.info("Flushing pending GitHub results...")
+            self.callback_dispatcher.stop(timeout=30)
+            stats = self.callback_dispatcher.get_stats()
+            logger.info(f"Results delivered={stats['delivered']}, "
+                       f"failed={stats['failed']}, dropped={stats['dropped']}")
     
     def run(self):
         """Main run loop."""
@@ -230,6 +333,58 @@ def main():
         type=int,
         help="GitHub issue number for threaded conversation"
     )
+    parser.add_argument(
+        "--runtime",
+        choices=["thread", "async"],
+        default="thread",
+        help="Run each agent in its own thread, or all agents on one event loop"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=32,
+        help="Maximum concurrent LLM calls in the async runtime (default: 32)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Number of worker processes to spread agents across (default: 1)"
+    )
+    parser.add_argument(
+        "--max-queue-depth",
+        type=int,
+        help="Maximum pending tasks per agent (default: unlimited)"
+    )
+    parser.add_argument(
+        "--max-queue-wait",
+        type=float,
+        help="Shed new tasks while average queue wait exceeds this many seconds"
+    )
+    parser.add_argument(
+        "--callback-outbox",
+        type=int,
+        default=1000,
+        help="Maximum results buffered for GitHub delivery (default: 1000)"
+    )
+    parser.add_argument(
+        "--callback-overflow",
+        choices=OVERFLOW_POLICIES,
+        default="block",
+        help="What to do when the result outbox is full (default: block)"
+    )
+    parser.add_argument(
+        "--callback-spill-path",
+        type=str,
+        default="/tmp/llm_agents_outbox.jsonl",
+        help="Spill file used by --callback-overflow spill"
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=str,
+        help="Directory for per-agent queue journals; pending tasks and history "
+             "are recovered from it on restart (default: not persisted)"
+    )
     parser.add_argument(
         "--max-iterations",
         type=int,
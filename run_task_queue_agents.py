@@ -5,15 +5,19 @@ No auto-generated busywork - only processes tasks you submit.
 """
 import sys
 import os
-import time
 import signal
 import logging
+import argparse
+import time
 from datetime import datetime
 
 sys.path.insert(0, 'src')
 
 from llm_framework.orchestrator import AgentOrchestrator
-from task_queue import get_next_task, complete_task, load_queue
+from task_queue import default_worker_id, listen, POLL_INTERVAL
+from task_workers import WorkerPool, parse_concurrency
+
+STATS_INTERVAL = 60  # Seconds between pool stats log lines
 
 # Setup logging
 logging.basicConfig(
@@ -27,13 +31,40 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 shutdown_requested = False
+listener = None
 
 def signal_handler(sig, frame):
     global shutdown_requested
     logger.info("Shutdown requested...")
     shutdown_requested = True
+    if listener:
+        listener.wake()
+
+def log_pool_stats(pools):
+    for agent_type, pool in pools.items():
+        stats = pool.get_stats()
+        logger.info(
+            f"Pool {agent_type}: {stats['completed']} done, {stats['failed']} failed, "
+            f"{stats['in_flight']}/{stats['concurrency']} busy, "
+            f"{stats['throughput_per_min']}/min, "
+            f"latency p50 {stats['latency']['p50']}s p95 {stats['latency']['p95']}s, "
+            f"queue wait p95 {stats['queue_wait']['p95']}s"
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Process queued tasks with per-agent worker pools')
+    parser.add_argument('--concurrency', default=os.getenv('AGENT_POOL_CONCURRENCY', ''),
+                        help='Threads per agent type, e.g. coding=4,research=2 '
+                             '(env AGENT_POOL_CONCURRENCY)')
+    parser.add_argument('--default-concurrency', type=int, default=1,
+                        help='Threads for agent types not listed (default: 1)')
+    parser.add_argument('--shutdown-timeout', type=float, default=300,
+                        help='Seconds to let in-flight tasks finish on shutdown (default: 300)')
+    return parser.parse_args()
 
 def main():
+    global listener
+    args = parse_args()
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
@@ -42,6 +73,8 @@ def main():
     logger.info("="*80)
     logger.info(f"Started at: {datetime.now()}")
     logger.info(f"PID: {os.getpid()}")
+    worker_id = default_worker_id()
+    logger.info(f"Worker: {worker_id}")
     logger.info("")
     logger.info("Submit tasks with: python task_queue.py add <agent> <task>")
     logger.info("View results with: python task_queue.py results")
@@ -65,49 +98,45 @@ def main():
         'writing': orch.get_agent('writing')
     }
     
+    # One pool per agent type so a slow generation never blocks other types
+    concurrency = parse_concurrency(args.concurrency, agents, args.default_concurrency)
+    pools = {
+        agent_type: WorkerPool(agent_type, agent, concurrency[agent_type], worker_id=worker_id)
+        for agent_type, agent in agents.items()
+    }
+    
+    # Register for wakeups before starting pools so no submission is missed
+    listener = listen()
+    if not listener.is_push:
+        logger.info(f"Queue notifications unavailable; polling every {POLL_INTERVAL:.0f}s")
+    
+    for agent_type, pool in pools.items():
+        pool.start()
+        logger.info(f"Pool {agent_type}: {pool.concurrency} worker(s)")
+    
     logger.info("Agents ready. Waiting for tasks...")
     logger.info("")
     
-    check_interval = 5  # Check for new tasks every 5 seconds
-    last_queue_check = time.time()
-    
+    last_stats = time.monotonic()
     while not shutdown_requested:
-        current_time = time.time()
-        
-        # Check for tasks periodically
-        if current_time - last_queue_check >= check_interval:
-            last_queue_check = current_time
-            
-            # Check each agent type
-            for agent_type, agent in agents.items():
-                task_entry = get_next_task(agent_type)
-                
-                if task_entry:
-                    task_id = task_entry['id']
-                    task = task_entry['task']
-                    
-                    logger.info(f"{'='*80}")
-                    logger.info(f"Processing Task #{task_id}")
-                    logger.info(f"Agent: {agent_type}")
-                    logger.info(f"Task: {task}")
-                    logger.info(f"{'='*80}")
-                    
-                    try:
-                        result = agent.execute(task)
-                        complete_task(task_id, result)
-                        
-                        logger.info(f"\n✓ Task #{task_id} COMPLETED")
-                        logger.info(f"Result ({len(result)} chars):")
-                        logger.info(f"{result[:500]}...")
-                        logger.info(f"{'='*80}\n")
-                        
-                    except Exception as e:
-                        error_msg = f"Error: {str(e)}"
-                        complete_task(task_id, error_msg)
-                        logger.error(f"✗ Task #{task_id} FAILED: {error_msg}\n")
+        # Idle: block until a task is submitted (no I/O), polling as a fallback
+        listener.wait(timeout=min(POLL_INTERVAL, STATS_INTERVAL))
+        for pool in pools.values():
+            pool.notify()
         
-        time.sleep(1)
+        if time.monotonic() - last_stats >= STATS_INTERVAL:
+            last_stats = time.monotonic()
+            log_pool_stats(pools)
+    
+    logger.info(f"Waiting up to {args.shutdown_timeout:.0f}s for in-flight tasks...")
+    deadline = time.monotonic() + args.shutdown_timeout
+    for pool in pools.values():
+        pool.is_running = False
+    for pool in pools.values():
+        pool.stop(timeout=max(0.0, deadline - time.monotonic()))
+    log_pool_stats(pools)
     
+    listener.close()
     logger.info("Shutdown complete")
 
 if __name__ == '__main__':
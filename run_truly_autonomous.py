@@ -7,12 +7,19 @@ import sys
 import os
 import time
 import signal
+import argparse
+import logging
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from llm_framework.orchestrator import AgentOrchestrator
+from llm_framework.analysis_cache import AnalysisCache
+from llm_framework.autonomous_pipeline import AutonomousPipeline
+from llm_framework.budget_scheduler import BudgetScheduler, Quota, WorkScorer
+from llm_framework.change_feed import GitChangeFeed
+from llm_framework.repo_index import RepoIndex
 from llm_framework.autonomous_agent import (
     CodeAnalysisAgent,
     TestMonitorAgent,
@@ -27,8 +34,114 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Run autonomous repository agents")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Run agents one after another in fixed cycles instead of a pipeline")
+    parser.add_argument("--discover-workers", type=int, default=1,
+                        help="Threads looking for work (default: 1)")
+    parser.add_argument("--prepare-workers", type=int, default=2,
+                        help="Threads reading files and building prompts (default: 2)")
+    parser.add_argument("--generate-workers", type=int, default=4,
+                        help="Concurrent LLM calls (default: 4)")
+    parser.add_argument("--sink-workers", type=int, default=1,
+                        help="Threads logging results (default: 1)")
+    parser.add_argument("--queue-size", type=int, default=16,
+                        help="Capacity of the queues between stages (default: 16)")
+    parser.add_argument("--idle-interval", type=float, default=30.0,
+                        help="Seconds before an agent that found no work looks again (default: 30)")
+    parser.add_argument("--calls-per-window", type=int, default=None,
+                        help="LLM calls each agent may make per budget window (default: unlimited)")
+    parser.add_argument("--tokens-per-window", type=int, default=None,
+                        help="Estimated tokens each agent may use per budget window "
+                        "(default: unlimited)")
+    parser.add_argument("--budget-window", type=float, default=60.0,
+                        help="Length of the budget window in seconds (default: 60)")
+    parser.add_argument("--no-git-feed", action="store_true",
+                        help="Rescan the file system for changes instead of following git")
+    parser.add_argument("--git-poll-interval", type=float, default=2.0,
+                        help="Seconds between checks of git state (default: 2)")
+    return parser.parse_args()
+
+
+# Relative value of each agent's work when ranking LLM calls
+AGENT_WEIGHTS = {
+    "test_monitor": 1.5,
+    "code_analysis": 1.0,
+    "documentation": 0.8,
+    "issue_monitor": 0.5,
+}
+
+
+def run_sequential(autonomous_agents):
+    """Run agents one after another, then wait for the next cycle."""
+    cycle = 0
+    while True:
+        cycle += 1
+        print(f"\n[Cycle {cycle}] {datetime.now().strftime('%H:%M:%S')}")
+        
+        work_done = False
+        for agent in autonomous_agents:
+            if agent.run_cycle():
+                work_done = True
+                
+        if not work_done:
+            print("  No work found this cycle")
+            
+        # Wait between cycles
+        time.sleep(30)  # 30 second cycles
+
+
+def run_pipelined(autonomous_agents, args, feed=None):
+    """Run agents as a pipeline; agents pick up work as soon as it exists."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s', datefmt='%H:%M:%S')
+    # All agents share one budget; the most valuable prepared work runs first
+    test_agent = next((a for a in autonomous_agents if isinstance(a, TestMonitorAgent)), None)
+    scorer = WorkScorer(
+        autonomous_agents[0].index,
+        graph=test_agent.impact.graph if test_agent else None,
+        agent_weights=AGENT_WEIGHTS,
+    )
+    budget = BudgetScheduler(
+        default_quota=Quota(calls=args.calls_per_window, tokens=args.tokens_per_window),
+        window=args.budget_window,
+        scorer=scorer,
+        maxsize=args.queue_size,
+    )
+    pipeline = AutonomousPipeline(
+        autonomous_agents,
+        discover_workers=args.discover_workers,
+        prepare_workers=args.prepare_workers,
+        generate_workers=args.generate_workers,
+        sink_workers=args.sink_workers,
+        queue_size=args.queue_size,
+        idle_interval=args.idle_interval,
+        budget=budget,
+    )
+    if feed is not None:
+        # Resting agents look for work as soon as something changes
+        feed.add_listener(lambda events: pipeline.wake())
+    pipeline.start()
+    try:
+        while True:
+            time.sleep(60)
+            stats = pipeline.get_stats()
+            queued = ", ".join(f"{name}={s['queued']}" for name, s in stats['stages'].items())
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Completed: {stats['completed']} "
+                  f"| Queued: {queued} | {stats['throughput_per_min']}/min "
+                  f"| LLM calls granted: {stats['budget']['granted']}")
+    finally:
+        if feed is not None:
+            feed.stop()
+        pipeline.stop(timeout=5)
+        for agent in autonomous_agents:
+            agent.close()
+
+
 def main():
     """Run autonomous agents."""
+    args = parse_args()
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
@@ -36,7 +149,8 @@ def main():
     print("TRULY AUTONOMOUS AGENTS")
     print("="*80)
     print(f"Started: {datetime.now().isoformat()}")
-    print(f"Mode: Autonomous repository monitoring")
+    print(f"Mode: Autonomous repository monitoring "
+          f"({'sequential' if args.sequential else 'pipelined'})")
     print(f"Repo: {os.getcwd()}")
     print()
     
@@ -52,39 +166,51 @@ def main():
     # Create autonomous agents
     repo_path = os.getcwd()
     
+    # Files already analysed survive restarts; edited files are picked up again
+    cache_path = os.getenv("AUTONOMOUS_CACHE_DB", "/tmp/autonomous_analysis_cache.db")
+    cache = AnalysisCache(cache_path)
+    
+    # With the git change feed the tree is walked once; later changes come from git
+    feed = None
+    if args.no_git_feed or not os.path.exists(os.path.join(repo_path, '.git')):
+        index = RepoIndex.shared(repo_path)
+    else:
+        index = RepoIndex(repo_path, refresh_interval=None)
+        feed = GitChangeFeed(
+            repo_path,
+            index,
+            state_path=os.getenv("AUTONOMOUS_FEED_STATE", "/tmp/autonomous_change_feed.json"),
+            poll_interval=args.git_poll_interval,
+        )
+    
     autonomous_agents = [
-        CodeAnalysisAgent(orch.get_agent('coding'), repo_path),
-        TestMonitorAgent(orch.get_agent('research'), repo_path),
-        DocumentationAgent(orch.get_agent('writing'), repo_path),
-        IssueMonitorAgent(orch.get_agent('research'), repo_path),
+        CodeAnalysisAgent(orch.get_agent('coding'), repo_path, index, cache),
+        TestMonitorAgent(orch.get_agent('research'), repo_path, index, cache),
+        DocumentationAgent(orch.get_agent('writing'), repo_path, index, cache),
+        IssueMonitorAgent(orch.get_agent('research'), repo_path, index, cache),
     ]
+    if feed is not None:
+        for agent in autonomous_agents:
+            agent.follow(feed)
+        feed.poll()
+        feed.start()
     
     print("Autonomous Agents:")
     for agent in autonomous_agents:
         print(f"  - {agent.name}")
     print()
     print("Agents are now monitoring the repository and finding work autonomously...")
-    print("Work logs: /tmp/autonomous_*_log.json")
+    print("Work logs: /tmp/autonomous_*_log.jsonl")
+    print(f"Analysis cache: {cache_path} ({cache.count()} entries)")
+    print(f"Change detection: {'git change feed' if feed else 'file system rescans'}")
     print("Press Ctrl+C to stop")
     print("="*80)
     print()
     
-    # Main loop
-    cycle = 0
-    while True:
-        cycle += 1
-        print(f"\n[Cycle {cycle}] {datetime.now().strftime('%H:%M:%S')}")
-        
-        work_done = False
-        for agent in autonomous_agents:
-            if agent.run_cycle():
-                work_done = True
-                
-        if not work_done:
-            print("  No work found this cycle")
-            
-        # Wait between cycles
-        time.sleep(30)  # 30 second cycles
+    if args.sequential:
+        run_sequential(autonomous_agents)
+    else:
+        run_pipelined(autonomous_agents, args, feed)
 
 
 if __name__ == '__main__':
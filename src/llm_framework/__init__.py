@@ -5,22 +5,64 @@ __author__ = "LLM Framework Team"
 
 from .core.base_provider import BaseProvider
 from .core.agent import Agent, AgentConfig
+from .core.deadline import Deadline, DeadlineExceeded
 from .providers.claude_provider import ClaudeProvider
 from .providers.ollama_provider import OllamaProvider
 from .providers.mock_provider import MockLLMProvider
 from .providers.openai_compatible_provider import OpenAICompatibleProvider
 from .continuous_agent import ContinuousAgent
+from .agent_journal import AgentJournal
+from .callback_dispatcher import CallbackDispatcher
+from .admission import AdmissionController, QueueFullError
+from .scheduler import TaskScheduler
+from .async_runtime import AsyncAgentRuntime, AsyncContinuousAgent
+from .sharded_runner import ShardedAgentRunner
+from .task_store import SQLiteTaskStore
+from .task_notify import QueueListener
+from .repo_index import RepoIndex
+from .change_feed import GitChangeFeed
+from .analysis_cache import AnalysisCache
+from .work_log import WorkLogWriter
+from .autonomous_pipeline import AutonomousPipeline
+from .code_chunker import PythonChunker
+from .doc_coverage import DocCoverageIndex
+from .impact_analysis import ImpactAnalyzer
+from .budget_scheduler import BudgetScheduler, Quota
+from .provider_discovery import ProviderDiscovery
 from .github_integration import GitHubIntegration, AgentGitHubBridge
 
 __all__ = [
     "BaseProvider",
     "Agent",
     "AgentConfig",
+    "Deadline",
+    "DeadlineExceeded",
     "ClaudeProvider",
     "OllamaProvider",
     "MockLLMProvider",
     "OpenAICompatibleProvider",
     "ContinuousAgent",
+    "AgentJournal",
+    "CallbackDispatcher",
+    "AdmissionController",
+    "QueueFullError",
+    "TaskScheduler",
+    "AsyncAgentRuntime",
+    "AsyncContinuousAgent",
+    "ShardedAgentRunner",
+    "SQLiteTaskStore",
+    "QueueListener",
+    "RepoIndex",
+    "GitChangeFeed",
+    "AnalysisCache",
+    "WorkLogWriter",
+    "AutonomousPipeline",
+    "PythonChunker",
+    "DocCoverageIndex",
+    "ImpactAnalyzer",
+    "BudgetScheduler",
+    "Quota",
+    "ProviderDiscovery",
     "GitHubIntegration",
     "AgentGitHubBridge",
 ]
@@ -0,0 +1,197 @@
+"""Admission control and load shedding for task queues."""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .scheduler import PRIORITY_INTERACTIVE
+
+ADMISSION_REJECT = "reject"
+ADMISSION_BLOCK = "block"
+ADMISSION_POLICIES = (ADMISSION_REJECT, ADMISSION_BLOCK)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a task is refused by admission control."""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Decide whether new work may enter a queue.
+
+    Two independent limits are applied:
+    - a hard cap on queue depth, enforced by rejecting or blocking the caller
+    - load shedding, which refuses new work while the measured time tasks spend
+      waiting in the queue exceeds ``max_queue_wait``; interactive tasks are
+      never shed, only held to the depth limit
+
+    The average is only sampled when a task starts, so it decays while none
+    does (halving every ``max_queue_wait`` seconds) and is reset once the queue
+    drains; a slow spell cannot keep shedding work after it ends.
+
+    The controller only tracks measurements and counters; the queue that owns it
+    is responsible for waiting when the ``block`` policy is used.
+    """
+
+    def __init__(
+        self,
+        max_queue_depth: Optional[int] = None,
+        policy: str = ADMISSION_REJECT,
+        block_timeout: Optional[float] = None,
+        max_queue_wait: Optional[float] = None,
+        wait_smoothing: float = 0.2,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_queue_depth: Maximum pending tasks (None for unlimited)
+            policy: "reject" to refuse work when full, "block" to wait for space
+            block_timeout: Maximum seconds to block before rejecting (None waits forever)
+            max_queue_wait: Shed new work while the average queue wait in seconds
+                exceeds this value (None disables shedding)
+            wait_smoothing: Weight of the newest sample in the moving average
+        """
+        if policy not in ADMISSION_POLICIES:
+            raise ValueError(
+                f"Unknown admission policy '{policy}'. "
+                f"Use one of: {', '.join(ADMISSION_POLICIES)}"
+            )
+
+        self.max_queue_depth = max_queue_depth
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.max_queue_wait = max_queue_wait
+        self.wait_smoothing = wait_smoothing
+
+        self._lock = threading.Lock()
+        self._last_sample = time.monotonic()
+        self.avg_queue_wait = 0.0
+        self.max_observed_wait = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+        self.background_suppressed = 0
+
+    def is_full(self, depth: int) -> bool:
+        """
+        Check the depth limit.
+
+        Args:
+            depth: Current number of pending tasks
+
+        Returns:
+            True if no more tasks may be queued
+        """
+        return self.max_queue_depth is not None and depth >= self.max_queue_depth
+
+    def is_overloaded(
+        self,
+        depth: int,
+        oldest_wait: float = 0.0,
+        priority_class: Optional[str] = None,
+    ) -> bool:
+        """
+        Check whether a new task should be shed.
+
+        Args:
+            depth: Current number of pending tasks
+            oldest_wait: Age in seconds of the oldest pending task
+            priority_class: Class of the task being submitted (interactive
+                tasks are never shed)
+
+        Returns:
+            True if measured queue wait exceeds the configured limit
+        """
+        if self.max_queue_wait is None or priority_class == PRIORITY_INTERACTIVE:
+            return False
+        with self._lock:
+            if depth == 0:
+                # The backlog behind the measured wait is gone
+                self.avg_queue_wait = 0.0
+            return max(self._decayed_wait(), oldest_wait) > self.max_queue_wait
+
+    def _decayed_wait(self) -> float:
+        """Average wait, decayed by the time since the last sample. Caller must hold the lock."""
+        if not self.avg_queue_wait or not self.max_queue_wait:
+            return self.avg_queue_wait
+        idle = time.monotonic() - self._last_sample
+        return self.avg_queue_wait * 0.5 ** (idle / self.max_queue_wait)
+
+    def record_wait(self, seconds: float):
+        """
+        Record how long a task waited in the queue before it started.
+
+        Args:
+            seconds: Time between submission and start of execution
+        """
+        with self._lock:
+            average = self._decayed_wait()
+            if average == 0.0:
+                self.avg_queue_wait = seconds
+            else:
+                self.avg_queue_wait = average + self.wait_smoothing * (seconds - average)
+            self._last_sample = time.monotonic()
+            self.max_observed_wait = max(self.max_observed_wait, seconds)
+
+    def record_admitted(self):
+        """Count a task that entered the queue."""
+        with self._lock:
+            self.admitted += 1
+
+    def record_suppressed(self):
+        """Count a generated background task that was not queued."""
+        with self._lock:
+            self.background_suppressed += 1
+
+    def reject(self, depth: int, overloaded: bool = False):
+        """
+        Count a refused task and raise.
+
+        Args:
+            depth: Queue depth at the time of rejection
+            overloaded: True if the task was shed because of queue wait time
+
+        Raises:
+            QueueFullError: Always
+        """
+        with self._lock:
+            if overloaded:
+                self.shed += 1
+            else:
+                self.rejected += 1
+
+        if overloaded:
+            raise QueueFullError(
+                f"Queue overloaded: queue wait exceeds {self.max_queue_wait:.1f}s "
+                f"({depth} pending)",
+                reason="overloaded",
+            )
+        raise QueueFullError(
+            f"Queue full: {depth} pending tasks (limit {self.max_queue_depth})",
+            reason="queue_full",
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get admission counters and measurements.
+
+        Returns:
+            Dictionary of limits, counters and queue wait measurements
+        """
+        with self._lock:
+            return {
+                "max_queue_depth": self.max_queue_depth,
+                "policy": self.policy,
+                "max_queue_wait": self.max_queue_wait,
+                "avg_queue_wait": round(self._decayed_wait(), 3),
+                "max_observed_wait": round(self.max_observed_wait, 3),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "shed": self.shed,
+                "background_suppressed": self.background_suppressed,
+            }
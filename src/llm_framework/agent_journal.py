@@ -0,0 +1,250 @@
+"""Durable write-ahead log with snapshots for ContinuousAgent queues."""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JournalState:
+    """Queue state rebuilt from a journal on startup."""
+
+    pending: List[Dict[str, Any]] = field(default_factory=list)
+    history: List[Dict[str, Any]] = field(default_factory=list)
+    iteration_count: int = 0
+    requeued: int = 0
+    abandoned: int = 0
+
+
+class AgentJournal:
+    """
+    Persist a ContinuousAgent's queue and results across restarts.
+
+    Every change is appended to a JSON-lines write-ahead log (``<path>``) and
+    flushed before the agent acts on it. Every ``snapshot_every`` records the
+    full state is written atomically to ``<path>.snapshot`` and the log is
+    truncated, so recovery reads one small snapshot plus a short log tail.
+
+    On recovery, tasks that were running when the process died are re-queued
+    once, ahead of the rest of their class. A task that was already re-queued
+    and was running again at the next crash is moved to the history as an
+    error instead, so one poison task cannot crash-loop the agent.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        snapshot_every: int = 1000,
+        history_limit: int = 1000,
+        fsync: bool = False,
+    ):
+        """
+        Open a journal.
+
+        Args:
+            path: Write-ahead log path (the snapshot is stored next to it)
+            snapshot_every: Log records between snapshots
+            history_limit: Most recent results kept across restarts
+            fsync: Force each record to disk (survives power loss, not just
+                process crashes, at the cost of a disk sync per record)
+        """
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.snapshot_every = snapshot_every
+        self.history_limit = history_limit
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._records = 0
+        self._next_id = 1
+        # Live state mirrored from the log, used to write snapshots
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._history: List[Dict[str, Any]] = []
+        self._iteration_count = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def recover(self) -> JournalState:
+        """
+        Load the snapshot and replay the log, then open the log for appending.
+
+        Returns:
+            Pending tasks in submission order, recent history and counters
+        """
+        with self._lock:
+            self._load_snapshot()
+            self._replay_log()
+
+            state = JournalState()
+            for task_id, task in list(self._tasks.items()):
+                if task["started"]:
+                    if task.get("requeued"):
+                        state.abandoned += 1
+                        self._finish(task_id, {"error": "Abandoned: interrupted by two restarts"})
+                        continue
+                    task["started"] = False
+                    task["requeued"] = True
+                    state.requeued += 1
+
+            state.pending = [dict(t) for t in self._tasks.values()]
+            state.history = list(self._history)
+            state.iteration_count = self._iteration_count
+
+            # Start from a clean snapshot so recovery work is not replayed twice
+            self._write_snapshot()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        if state.requeued or state.abandoned or state.pending:
+            logger.info(
+                "Recovered %d pending task(s) from %s (%d re-queued, %d abandoned)",
+                len(state.pending), self.path, state.requeued, state.abandoned,
+            )
+        return state
+
+    def add(self, task: str, priority: str, tenant: str, deadline: Optional[float] = None) -> str:
+        """
+        Record a newly queued task.
+
+        Args:
+            task: Task description
+            priority: Priority class
+            tenant: Flow used for fair sharing
+            deadline: Expiry as seconds since the epoch, if the task has one
+
+        Returns:
+            Journal id of the task (used as its scheduler key)
+        """
+        with self._lock:
+            task_id = f"j{self._next_id}"
+            self._next_id += 1
+            self._commit({"op": "add", "id": task_id, "task": task, "priority": priority,
+                          "tenant": tenant, "deadline": deadline})
+            return task_id
+
+    def start(self, task_id: str):
+        """Record that a task was taken for execution."""
+        self._log({"op": "start", "id": task_id})
+
+    def done(self, task_id: str, entry: Dict[str, Any], iteration_count: int):
+        """
+        Record a finished task.
+
+        Args:
+            task_id: Journal id
+            entry: History entry (result or error) as stored by the agent
+            iteration_count: Agent iteration count after the task
+        """
+        self._log({"op": "done", "id": task_id, "entry": entry,
+                   "iterations": iteration_count})
+
+    def close(self):
+        """Write a final snapshot and close the log."""
+        with self._lock:
+            if self._file is not None:
+                self._write_snapshot()
+                self._file.close()
+                self._file = None
+
+    def _log(self, record: Dict[str, Any]):
+        with self._lock:
+            self._commit(record)
+
+    def _commit(self, record: Dict[str, Any]):
+        """Write, flush and apply one record. Caller must hold the lock."""
+        if self._file is None:
+            raise RuntimeError("Journal is not open; call recover() first")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._apply(record)
+
+        self._records += 1
+        if self._records >= self.snapshot_every:
+            self._write_snapshot()
+
+    def _apply(self, record: Dict[str, Any]):
+        """Update live state from a record. Caller must hold the lock."""
+        op, task_id = record["op"], record["id"]
+        if op == "add":
+            self._tasks[task_id] = {
+                "id": task_id,
+                "task": record["task"],
+                "priority": record["priority"],
+                "tenant": record["tenant"],
+                "deadline": record.get("deadline"),
+                "started": False,
+                "requeued": False,
+            }
+            self._next_id = max(self._next_id, int(task_id[1:]) + 1)
+        elif op == "start" and task_id in self._tasks:
+            self._tasks[task_id]["started"] = True
+        elif op == "done":
+            self._iteration_count = record.get("iterations", self._iteration_count)
+            self._finish(task_id, record["entry"])
+
+    def _finish(self, task_id: str, entry: Dict[str, Any]):
+        """Drop a task from the live state and keep its history entry."""
+        task = self._tasks.pop(task_id, None)
+        if task is not None and "task" not in entry:
+            entry = {"timestamp": datetime.now().isoformat(), "task": task["task"], **entry}
+        self._history.append(entry)
+        if len(self._history) > self.history_limit:
+            del self._history[: len(self._history) - self.history_limit]
+
+    def _write_snapshot(self):
+        """Atomically replace the snapshot with the live state."""
+        snapshot = {
+            "next_id": self._next_id,
+            "iteration_count": self._iteration_count,
+            "tasks": list(self._tasks.values()),
+            "history": self._history,
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # The log is emptied only after the snapshot is durable
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+        else:
+            with open(self.path, "w", encoding="utf-8"):
+                pass
+        self._records = 0
+
+    def _load_snapshot(self):
+        """Load the last snapshot, if any. Caller must hold the lock."""
+        if not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self._next_id = snapshot["next_id"]
+        self._iteration_count = snapshot.get("iteration_count", 0)
+        self._tasks = {t["id"]: t for t in snapshot["tasks"]}
+        self._history = snapshot.get("history", [])
+
+    def _replay_log(self):
+        """Apply log records written after the snapshot. Caller must hold the lock."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash; nothing after it is valid
+                    logger.warning("Ignoring partial record at end of %s", self.path)
+                    break
+                self._apply(record)
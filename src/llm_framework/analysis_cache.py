@@ -0,0 +1,157 @@
+"""Persistent, content-addressed record of files already analysed by autonomous agents."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    content_hash TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    prompt_version INTEGER NOT NULL,
+    path TEXT,
+    analyzed_at REAL NOT NULL,
+    result TEXT,
+    PRIMARY KEY (content_hash, agent, prompt_version)
+) WITHOUT ROWID;
+"""
+
+
+class AnalysisCache:
+    """
+    Remember which file contents each agent has analysed.
+
+    Entries are keyed by content hash (the git blob SHA from ``RepoIndex``),
+    agent name and prompt version, not by path. An unchanged file is therefore
+    skipped across restarts, an edited file gets a new hash and is analysed
+    again, and bumping an agent's prompt version re-analyses everything for
+    that agent only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (and create if needed) a cache.
+
+        Args:
+            path: SQLite database path (None keeps the cache in memory only)
+        """
+        self.path = path
+        if path is not None:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path or ":memory:", timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        if path is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+
+    def seen(self, content_hash: str, agent: str, prompt_version: int) -> bool:
+        """
+        Check whether content was already analysed.
+
+        Args:
+            content_hash: Content hash of the file
+            agent: Agent name
+            prompt_version: Version of the agent's prompt
+
+        Returns:
+            True if an entry exists
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM analyses WHERE content_hash = ? AND agent = ? "
+                "AND prompt_version = ?",
+                (content_hash, agent, prompt_version),
+            ).fetchone()
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return row is not None
+
+    def record(
+        self,
+        content_hash: str,
+        agent: str,
+        prompt_version: int,
+        path: Optional[str] = None,
+        result: Optional[str] = None,
+    ):
+        """
+        Record that content was analysed (or checked and found to need no work).
+
+        Recording again keeps an earlier result unless a new one is given.
+
+        Args:
+            content_hash: Content hash of the file
+            agent: Agent name
+            prompt_version: Version of the agent's prompt
+            path: Path the content was found at
+            result: Analysis result, if any
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO analyses (content_hash, agent, prompt_version, path, "
+                "analyzed_at, result) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (content_hash, agent, prompt_version) DO UPDATE SET "
+                "path = COALESCE(excluded.path, path), analyzed_at = excluded.analyzed_at, "
+                "result = COALESCE(excluded.result, result)",
+                (content_hash, agent, prompt_version, path, time.time(), result),
+            )
+
+    def get(self, content_hash: str, agent: str, prompt_version: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a cache entry.
+
+        Args:
+            content_hash: Content hash of the file
+            agent: Agent name
+            prompt_version: Version of the agent's prompt
+
+        Returns:
+            The entry as a dictionary, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analyses WHERE content_hash = ? AND agent = ? "
+                "AND prompt_version = ?",
+                (content_hash, agent, prompt_version),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def count(self, agent: Optional[str] = None) -> int:
+        """
+        Count entries.
+
+        Args:
+            agent: Only count this agent's entries
+
+        Returns:
+            Number of entries
+        """
+        with self._lock:
+            if agent is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM analyses WHERE agent = ?", (agent,)
+                ).fetchone()
+        return row[0]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
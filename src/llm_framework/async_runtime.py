@@ -0,0 +1,370 @@
+"""Asyncio runtime hosting many continuous agents in a single event loop."""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .continuous_agent import ContinuousAgent
+from .core.agent import Agent
+from .scheduler import TaskScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncContinuousAgent(ContinuousAgent):
+    """
+    ContinuousAgent driven by a coroutine on an AsyncAgentRuntime.
+
+    Queueing, admission control, results and status are inherited unchanged;
+    only the run loop differs. Instead of a dedicated thread, each agent is a
+    lightweight coroutine, and before each task it waits for a turn from the
+    runtime's shared scheduler, so work from every agent is dispatched by
+    priority class and fairly across agents.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        runtime: "AsyncAgentRuntime",
+        name: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        Initialize the agent.
+
+        Args:
+            agent: The agent to run continuously
+            runtime: Runtime hosting the agent's coroutine
+            name: Flow name in the runtime's scheduler (defaults to the agent's name)
+            **kwargs: Passed through to ContinuousAgent
+        """
+        super().__init__(agent, **kwargs)
+        self.runtime = runtime
+        self.name = name or agent.config.name
+        self._future: Optional[concurrent.futures.Future] = None
+        self._async_wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        """Schedule the agent's coroutine on the runtime."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._future = self.runtime.submit(self._run_async())
+
+    def stop(self):
+        """Stop the agent and wait for its coroutine to finish."""
+        self.is_running = False
+        self._notify_worker()
+        if self._future:
+            try:
+                self._future.result(timeout=5)
+            except Exception:
+                self._future.cancel()
+
+    def _notify_worker(self):
+        """Wake the coroutine before its interval elapses."""
+        event = self._async_wakeup
+        if event is not None and self.runtime.loop is not None:
+            self.runtime.loop.call_soon_threadsafe(event.set)
+
+    async def _run_async(self):
+        """Coroutine equivalent of ContinuousAgent._run."""
+        self._async_wakeup = asyncio.Event()
+        try:
+            while self.is_running:
+                if self.max_iterations and self.iteration_count >= self.max_iterations:
+                    break
+
+                # Keep the agent busy with generated work only when nothing is queued
+                if len(self.scheduler):
+                    self.admission.record_suppressed()
+                else:
+                    self._generate_task()
+
+                # Wait for a turn before popping, so a stop while waiting
+                # leaves the task queued
+                priority_class = self.scheduler.next_class()
+                if priority_class is not None:
+                    await self.runtime.acquire_turn(self.name, priority_class)
+                    try:
+                        if self.is_running:
+                            await self._run_turn()
+                    finally:
+                        self.runtime.release_turn()
+
+                try:
+                    await asyncio.wait_for(self._async_wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._async_wakeup.clear()
+        finally:
+            self.is_running = False
+
+    async def _run_turn(self):
+        """Pop, run and record one task; journal writes stay off the loop thread."""
+        task = await self.runtime.run_blocking(self._pop_task)
+        if task is None:
+            return
+
+        self._busy_since = time.monotonic()
+        try:
+            result = await self.runtime.run_blocking(self._execute, task)
+            await self.runtime.run_blocking(self._record_result, task, result)
+
+            if self.on_result_callback:
+                await self.runtime.invoke(self.on_result_callback, task, result)
+
+        except asyncio.CancelledError:
+            # Cancelled by a forced stop: keep the task in the history
+            self._record_error(task, RuntimeError("Cancelled: runtime stopped"))
+            raise
+        except Exception as e:
+            await self.runtime.run_blocking(self._record_error, task, e)
+
+        self._busy_since = None
+        self.iteration_count += 1
+
+
+class AsyncAgentRuntime:
+    """
+    One event loop hosting many AsyncContinuousAgents.
+
+    The loop runs in its own thread so the runtime can be driven from ordinary
+    synchronous code with the same start/stop/get_status calls as
+    ContinuousAgent. Agents keep their own queues, but every task waits for a
+    turn from one shared TaskScheduler: a turn carries the task's priority
+    class and the agent's name as its flow, and at most ``max_concurrency``
+    turns run at once. Interactive work from any agent therefore overtakes
+    background work from all the others, and agents share capacity by
+    weight. Periodic jobs are scheduled as timers on the loop rather than
+    polled.
+    """
+
+    def __init__(self, max_concurrency: int = 32, scheduler: Optional[TaskScheduler] = None):
+        """
+        Initialize the runtime.
+
+        Args:
+            max_concurrency: Maximum blocking calls (LLM requests) in flight at once
+            scheduler: Scheduler ordering turns across agents (defaults to a
+                new TaskScheduler; its flow weights are keyed by agent name)
+        """
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler or TaskScheduler()
+        self._turns_in_flight = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.agents: Dict[str, AsyncContinuousAgent] = {}
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._timers: List[concurrent.futures.Future] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop thread."""
+        with self._lock:
+            if self.is_running:
+                return
+
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="agent-runtime"
+            )
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="agent-runtime-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self.is_running = True
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop all agents and timers, then the event loop.
+
+        Args:
+            timeout: Maximum seconds to wait for agents to finish their current task
+        """
+        if not self.is_running:
+            return
+
+        for cont_agent in self.agents.values():
+            cont_agent.is_running = False
+            cont_agent._notify_worker()
+
+        futures = [a._future for a in self.agents.values() if a._future]
+        concurrent.futures.wait(futures, timeout=timeout)
+
+        # Cancel timers and overdue agents on the loop and let their handlers
+        # run (e.g. recording a cancelled task) before the loop stops
+        async def cancel_pending():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(cancel_pending()).result(timeout=timeout)
+        except Exception as e:
+            logger.warning("Runtime tasks did not finish cancelling: %s", e)
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=timeout)
+        if not self.loop.is_running():
+            self.loop.close()
+        self._executor.shutdown(wait=False)
+        self._timers = []
+        self.is_running = False
+
+    def add_agent(self, name: str, agent: Agent, **kwargs) -> AsyncContinuousAgent:
+        """
+        Create and register an agent hosted by this runtime.
+
+        Args:
+            name: Unique name for the agent
+            agent: Agent to run continuously
+            **kwargs: Passed through to ContinuousAgent (interval, max_iterations, ...)
+
+        Returns:
+            The hosted agent (not yet started)
+        """
+        cont_agent = AsyncContinuousAgent(agent, self, name=name, **kwargs)
+        self.agents[name] = cont_agent
+        return cont_agent
+
+    def start_agents(self):
+        """Start every registered agent."""
+        for cont_agent in self.agents.values():
+            cont_agent.start()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the runtime loop from any thread.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Future for the coroutine's result
+        """
+        if not self.is_running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def acquire_turn(self, flow: str, priority_class: str):
+        """
+        Wait until the shared scheduler lets a task of this flow run.
+
+        Must be paired with ``release_turn`` once the task finishes.
+
+        Args:
+            flow: Agent name the turn is scheduled under
+            priority_class: Priority class of the task about to run
+        """
+        turn = asyncio.get_running_loop().create_future()
+        self.scheduler.push(turn, priority_class=priority_class, flow=flow)
+        self._grant_turns()
+        try:
+            await turn
+        except asyncio.CancelledError:
+            # Granted just before the waiter was cancelled: hand the slot back
+            if turn.done() and not turn.cancelled():
+                self.release_turn()
+            raise
+
+    def release_turn(self):
+        """Free the slot of a finished turn and grant the next one."""
+        self._turns_in_flight -= 1
+        self._grant_turns()
+
+    def _grant_turns(self):
+        """Start waiting turns in scheduler order while slots are free. Loop thread only."""
+        while self._turns_in_flight < self.max_concurrency:
+            entry = self.scheduler.pop()
+            if entry is None:
+                return
+            if not entry.task.done():
+                entry.task.set_result(None)
+                self._turns_in_flight += 1
+
+    async def run_blocking(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the shared worker pool.
+
+        Args:
+            fn: Function to call
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def invoke(self, fn: Callable, *args) -> Any:
+        """
+        Call a sync or async callable without blocking the loop.
+
+        Coroutine functions are awaited directly; plain callables run on the
+        worker pool.
+        """
+        if inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(
+            getattr(fn, "__call__", None)
+        ):
+            return await fn(*args)
+        return await self.run_blocking(fn, *args)
+
+    def call_every(self, interval: float, fn: Callable[[], Any]) -> concurrent.futures.Future:
+        """
+        Run a function periodically on the loop.
+
+        Args:
+            interval: Seconds between calls
+            fn: Sync or async callable taking no arguments
+
+        Returns:
+            Future that can be cancelled to stop the timer
+        """
+
+        async def periodic():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.invoke(fn)
+                except Exception:
+                    logger.exception("Periodic task %r failed", fn)
+
+        timer = self.submit(periodic())
+        self._timers.append(timer)
+        return timer
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get status of the runtime and every hosted agent.
+
+        Returns:
+            Status dictionary with one ContinuousAgent status per agent
+        """
+        agents = {name: a.get_status() for name, a in self.agents.items()}
+        return {
+            "is_running": self.is_running,
+            "agent_count": len(agents),
+            "agents_running": sum(1 for s in agents.values() if s["is_running"]),
+            "tasks_pending": sum(s["tasks_pending"] for s in agents.values()),
+            "max_concurrency": self.max_concurrency,
+            "turns_in_flight": self._turns_in_flight,
+            "scheduler": self.scheduler.get_stats(),
+            "timers": len(self._timers),
+            "agents": agents,
+        }
@@ -3,12 +3,20 @@ Truly autonomous agents that monitor the repository and perform useful work.
 """
 
 import os
-import time
-import subprocess
-import json
+import hashlib
 import logging
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
+
+from .analysis_cache import AnalysisCache
+from .change_feed import ChangeSubscription, GitChangeFeed
+from .code_chunker import PythonChunker, format_units, pack_units
+from .doc_coverage import DocCoverageIndex
+from .impact_analysis import ImpactAnalyzer
+from .repo_index import FileEntry, RepoIndex
+from .work_log import WorkLogWriter
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -19,23 +27,60 @@ class AutonomousAgent:
     Base class for autonomous agents that find and execute work on their own.
     """
 
-    def __init__(self, name: str, agent, repo_path: str):
+    # Bump when an agent's prompt changes so its cached analyses are redone
+    PROMPT_VERSION = 1
+
+    # Recent entries kept in memory; the full history is in the log file
+    WORK_LOG_MEMORY = 100
+
+    def __init__(
+        self,
+        name: str,
+        agent,
+        repo_path: str,
+        index: Optional[RepoIndex] = None,
+        cache: Optional[AnalysisCache] = None,
+        log_writer: Optional[WorkLogWriter] = None,
+    ):
         self.name = name
         self.agent = agent
         self.repo_path = repo_path
-        self.work_log = []
+        # Shared by every agent on the same repository unless one is given
+        self.index = index if index is not None else RepoIndex.shared(repo_path)
+        # In-memory unless a persistent cache is given
+        self.cache = cache or AnalysisCache()
+        # Content claimed in this run whose result is not cached yet
+        self._claimed: set = set()
+        # Guards claims and other bookkeeping shared by the pipeline's stage threads
+        self._state_lock = threading.RLock()
+        self.work_log = deque(maxlen=self.WORK_LOG_MEMORY)
+        self.log_writer = log_writer or WorkLogWriter(f"/tmp/autonomous_{name}_log.jsonl")
+        # Changed files from a git change feed (see follow)
+        self.changes: Optional[ChangeSubscription] = None
+        self._changed: "OrderedDict[str, Any]" = OrderedDict()
         self.running = False
 
     def find_work(self) -> Optional[Dict[str, Any]]:
         """
         Find work to do autonomously. Can be overridden in subclasses.
         
-        Default implementation returns None (no work found).
-        Subclasses should override this method to provide specific work-finding logic.
+        Subclasses either override this method, or split it into
+        ``discover_work`` and ``prepare_work`` so the pipelined runtime can run
+        the two steps in separate stages; this default then chains them.
+        Otherwise it returns None (no work found).
         
         Returns:
             dict with 'task' and 'context' keys, or None if no work is found.
         """
+        if type(self).discover_work is not AutonomousAgent.discover_work:
+            while True:
+                work = self.discover_work()
+                if work is None:
+                    return None
+                work = self.prepare_work(work)
+                if work is not None:
+                    return work
+
         logger.warning(
             "Using default find_work() implementation for %s. "
             "Consider overriding this method in subclass for autonomous behavior.",
@@ -43,6 +88,96 @@ class AutonomousAgent:
         )
         return None
 
+    def discover_work(self) -> Optional[Dict[str, Any]]:
+        """
+        Cheaply find the next piece of work (e.g. which file), without reading it.
+
+        Returns:
+            Work with at least a 'context', or None if no work is found
+        """
+        return self.find_work()
+
+    def prepare_work(self, work: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Turn discovered work into a prompt (read files, build the 'task').
+
+        Args:
+            work: Work from ``discover_work``
+
+        Returns:
+            Work with a 'task', or None if it turned out to need no LLM call
+        """
+        return work
+
+    def follow(self, feed: GitChangeFeed):
+        """
+        Take changed files from a git change feed instead of scanning the index.
+
+        Args:
+            feed: Change feed of this agent's repository
+        """
+        self.changes = feed.subscribe(self.name)
+
+    def iter_files(self, suffix: Optional[str] = None) -> Iterator[FileEntry]:
+        """
+        Iterate over the files that may need work.
+
+        Without a change feed this is every indexed file. With one, it is
+        every file on the first complete pass, then only files the feed
+        reported as changed; a changed file stays queued until the iteration
+        reaches it, so a caller may stop early.
+
+        Args:
+            suffix: Only files ending with this (e.g. ".py")
+
+        Yields:
+            Index entries of existing files
+        """
+        if self.changes is None or self.changes.full_scan:
+            yield from self.index.files(suffix)
+            if self.changes is not None:
+                self.changes.full_scan = False
+            return
+
+        for event in self.changes.drain():
+            self._changed.pop(event.path, None)
+            self._changed[event.path] = event
+        while self._changed:
+            path, _ = self._changed.popitem(last=False)
+            if suffix is not None and not path.endswith(suffix):
+                continue
+            entry = self.index.get(path)
+            if entry is not None:
+                yield entry
+
+    def claim(self, content_hash: str) -> bool:
+        """
+        Claim content (a file, code unit, report...) for this agent.
+
+        The claim is kept in memory only, so content whose work fails is not
+        picked again in this run but is retried after a restart. The cache
+        entry is written by ``finish_work`` once the result is in.
+
+        Returns:
+            True the first time this content is seen; False if it was claimed
+            earlier in this run or finished in this or an earlier run
+        """
+        with self._state_lock:
+            if content_hash in self._claimed or \
+                    self.cache.seen(content_hash, self.name, self.PROMPT_VERSION):
+                return False
+            self._claimed.add(content_hash)
+            return True
+
+    def claim_file(self, entry: FileEntry) -> bool:
+        """
+        Claim a file's current content for this agent (see ``claim``).
+
+        Returns:
+            True the first time this content is seen
+        """
+        return self.claim(entry.hash)
+
     def execute_work(self, work: Dict[str, Any]) -> str:
         """Execute the work and return result."""
         task = work.get("task", "")
@@ -57,11 +192,23 @@ class AutonomousAgent:
             "result": result[:200],  # First 200 chars
         }
         self.work_log.append(entry)
-
-        # Save to file
-        log_file = f"/tmp/autonomous_{self.name}_log.json"
-        with open(log_file, "w", encoding="utf-8") as f:
-            json.dump(self.work_log, f, indent=2)
+        self.log_writer.append(entry)
+
+    def finish_work(self, work: Dict[str, Any], result: str):
+        """Log the result and store it in the analysis cache."""
+        self.log_work(work, result)
+        context = work.get("context") or {}
+        hashes = context.get("hashes") or [context.get("hash")]
+        for content_hash in hashes:
+            if content_hash:
+                self.cache.record(content_hash, self.name, self.PROMPT_VERSION,
+                                  context.get("file"), result=result)
+                with self._state_lock:
+                    self._claimed.discard(content_hash)
+
+    def close(self):
+        """Flush and close the work log."""
+        self.log_writer.close()
 
     def run_cycle(self) -> bool:
         """
@@ -71,7 +218,7 @@ class AutonomousAgent:
         if work:
             print(f"[{self.name}] Found work: {work.get('task', '')[:60]}...")
             result = self.execute_work(work)
-            self.log_work(work, result)
+            self.finish_work(work, result)
             print(f"[{self.name}] Completed. Result: {result[:80]}...")
             return True
         return False
@@ -80,162 +227,303 @@ class AutonomousAgent:
 class CodeAnalysisAgent(AutonomousAgent):
     """
     Analyzes repository code for improvements, issues, and documentation needs.
+
+    Files are split into functions, classes and module-level blocks, and each
+    unit is cached by its own hash, so an edit only re-queues the units it
+    touched. Small units, from one or several files, are packed into one
+    prompt up to ``token_budget`` tokens.
     """
 
-    def __init__(self, agent, repo_path: str):
-        super().__init__("code_analysis", agent, repo_path)
-        self.analyzed_files = set()
+    PROMPT_VERSION = 2
+
+    # Estimated prompt tokens per LLM call
+    TOKEN_BUDGET = 1500
+
+    def __init__(
+        self,
+        agent,
+        repo_path: str,
+        index: Optional[RepoIndex] = None,
+        cache: Optional[AnalysisCache] = None,
+        token_budget: int = TOKEN_BUDGET,
+    ):
+        super().__init__("code_analysis", agent, repo_path, index, cache)
+        self.token_budget = token_budget
+        self.chunker = PythonChunker(max_tokens=token_budget)
+        # Changed units waiting to be packed into a prompt
+        self._pending = deque()
+        # File hash -> (path, unit hashes not analysed yet); a file is cached
+        # once all its units are, so units lost in a restart are found again
+        self._open_files: Dict[str, Any] = {}
+
+    def discover_work(self) -> Optional[Dict[str, Any]]:
+        """
+        Find the next batch of changed code units.
 
-    def find_work(self) -> Optional[Dict[str, Any]]:
-        """Find Python files that need analysis."""
+        Files are chunked here rather than in ``prepare_work`` because which
+        units need analysis, and so how many files fill a prompt, is only
+        known once a file has been split.
+        """
         try:
-            # Find all Python files
-            result = subprocess.run(
-                ["find", self.repo_path, "-name", "*.py", "-type", "f"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                check=False,
-            )
-            files = [
-                f
-                for f in result.stdout.strip().split("\n")
-                if f and "__pycache__" not in f and "venv" not in f
-            ]
-
-            # Find unanalyzed file
-            for filepath in files:
-                if filepath not in self.analyzed_files:
-                    self.analyzed_files.add(filepath)
-
-                    # Read file content
-                    try:
-                        with open(filepath, "r", encoding="utf-8") as f:
-                            content = f.read()
-
-                        if len(content) > 100:  # Skip tiny files
-                            return {
-                                "task": f"Analyze this Python code for improvements, "
-                                f"potential bugs, and missing documentation:\n\n"
-                                f"{content[:500]}",
-                                "context": {"file": filepath},
-                            }
-                    except Exception:
-                        continue
+            # Find unanalyzed files (new, or changed since they were analyzed)
+            for entry in self.iter_files(".py"):
+                with self._state_lock:
+                    if sum(unit.tokens for unit in self._pending) >= self.token_budget:
+                        break
+                # Skip tiny files without reading them
+                if entry.size > 100 and self.claim_file(entry):
+                    self._queue_units(entry)
 
         except Exception as e:
             print(f"[{self.name}] Error finding work: {e}")
 
-        return None
+        with self._state_lock:
+            if not self._pending:
+                return None
+            batch = pack_units(list(self._pending), self.token_budget)[0]
+            for _ in batch:
+                self._pending.popleft()
+        return {
+            "units": batch,
+            "context": {
+                "files": sorted({os.path.join(self.repo_path, u.path) for u in batch}),
+                "units": [unit.label for unit in batch],
+                "hashes": [unit.hash for unit in batch],
+            },
+        }
+
+    def _queue_units(self, entry: FileEntry):
+        """Split a file and queue the units not analysed or claimed before."""
+        try:
+            with open(entry.path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except Exception:
+            return
+
+        units = self.chunker.chunk(content, entry.rel_path)
+        # Held throughout, so finish_work sees the file open or not at all
+        with self._state_lock:
+            remaining = set()
+            for unit in units:
+                if self.claim(unit.hash):
+                    self._pending.append(unit)
+                # Units claimed for another file still hold this one open
+                if unit.hash in self._claimed:
+                    remaining.add(unit.hash)
+
+            if remaining:
+                self._open_files[entry.hash] = (entry.rel_path, remaining)
+            else:
+                self._record_file(entry.hash, entry.rel_path)
+
+    def _record_file(self, file_hash: str, rel_path: str):
+        """Cache a file whose units are all analysed. Caller holds the state lock."""
+        self.cache.record(file_hash, self.name, self.PROMPT_VERSION, rel_path)
+        self._claimed.discard(file_hash)
+
+    def finish_work(self, work: Dict[str, Any], result: str):
+        """Cache each analysed unit, then every file with no units left."""
+        self.log_work(work, result)
+        context = work.get("context") or {}
+        done = set(context.get("hashes") or [])
+        for unit_hash, label in zip(context.get("hashes") or [], context.get("units") or []):
+            self.cache.record(unit_hash, self.name, self.PROMPT_VERSION, label, result=result)
+
+        with self._state_lock:
+            self._claimed -= done
+            for file_hash, (rel_path, remaining) in list(self._open_files.items()):
+                remaining -= done
+                if not remaining:
+                    del self._open_files[file_hash]
+                    self._record_file(file_hash, rel_path)
+
+    def prepare_work(self, work: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build the analysis prompt for a batch of units."""
+        return {
+            "task": format_units(
+                work["units"],
+                "Analyze this Python code for improvements, potential bugs, and "
+                "missing documentation. Each section is one function, class or "
+                "block of module-level code from the repository:",
+            ),
+            "context": work["context"],
+        }
 
 
 class TestMonitorAgent(AutonomousAgent):
     """
     Monitors and runs tests, reports failures autonomously.
+
+    After each change only the affected test files are run (see
+    ``ImpactAnalyzer``), in parallel. The LLM is asked to triage failures
+    only, and the same failures are triaged once.
     """
 
     # Prevent pytest from treating this class as a test case while still allowing
     # it to be imported and used in orchestrator flows.
     __test__ = False
 
-    def __init__(self, agent, repo_path: str):
-        super().__init__("test_monitor", agent, repo_path)
-        self.last_test_run = 0
+    PROMPT_VERSION = 2
+
+    # Traceback characters sent per failing test file
+    MAX_FAILURE_CHARS = 3000
+
+    def __init__(
+        self,
+        agent,
+        repo_path: str,
+        index: Optional[RepoIndex] = None,
+        cache: Optional[AnalysisCache] = None,
+        impact: Optional[ImpactAnalyzer] = None,
+    ):
+        super().__init__("test_monitor", agent, repo_path, index, cache)
+        self.impact = impact or ImpactAnalyzer(self.index)
+        # File hashes as of the last run; empty, so the first run covers every test
+        self._hashes: Dict[str, str] = {}
+        self.last_results = []
+
+    def discover_work(self) -> Optional[Dict[str, Any]]:
+        """Find the test files affected by changes since the last run."""
+        try:
+            current = {e.rel_path: e.hash for e in self.index.files(".py")}
+            changed = {
+                path for path in current.keys() | self._hashes.keys()
+                if current.get(path) != self._hashes.get(path)
+            }
+            self._hashes = current
+            if changed:
+                tests = self.impact.affected_tests(changed)
+                if tests:
+                    return {"context": {"changed": sorted(changed), "tests": tests}}
 
-    def find_work(self) -> Optional[Dict[str, Any]]:
-        """Run tests periodically."""
-        current_time = time.time()
+        except Exception as e:
+            print(f"[{self.name}] Error finding work: {e}")
 
-        # Run tests every 5 minutes
-        if current_time - self.last_test_run > 300:
-            self.last_test_run = current_time
+        return None
 
-            # Check if tests exist
-            test_dir = os.path.join(self.repo_path, "tests")
-            if os.path.exists(test_dir):
-                return {
-                    "task": "Summarize the purpose and coverage of the test suite, "
-                    "and suggest what additional tests might be valuable",
-                    "context": {"test_dir": test_dir},
-                }
+    def prepare_work(self, work: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run the affected tests and build a triage prompt for the failures."""
+        context = work["context"]
+        self.last_results = self.impact.run_tests(context["tests"])
+        failures = [r for r in self.last_results if not r.passed]
+        if not failures:
+            return None
 
-        return None
+        report = "\n\n".join(
+            f"### {r.path}\n{r.failures(self.MAX_FAILURE_CHARS)}" for r in failures
+        )
+        key = hashlib.sha1(report.encode("utf-8")).hexdigest()
+        if not self.claim(key):
+            return None
+        return {
+            "task": f"These tests fail after changes to {', '.join(context['changed'][:10])}. "
+            f"For each failure, explain the likely cause and suggest a fix:\n\n{report}",
+            "context": {**context, "failed": [r.path for r in failures], "hash": key},
+        }
 
 
 class DocumentationAgent(AutonomousAgent):
     """
     Monitors code for missing or outdated documentation.
+
+    Undocumented modules, classes and functions come from a docstring
+    coverage index, so the LLM is only asked about real gaps, one symbol at
+    a time. Each symbol is cached by the hash of its own source.
     """
 
-    def __init__(self, agent, repo_path: str):
-        super().__init__("documentation", agent, repo_path)
-        self.checked_files = set()
+    PROMPT_VERSION = 2
 
-    def find_work(self) -> Optional[Dict[str, Any]]:
-        """Find files with missing docstrings."""
+    # Longest symbol source included in a prompt
+    MAX_SOURCE_CHARS = 4000
+
+    def __init__(
+        self,
+        agent,
+        repo_path: str,
+        index: Optional[RepoIndex] = None,
+        cache: Optional[AnalysisCache] = None,
+        coverage: Optional[DocCoverageIndex] = None,
+    ):
+        super().__init__("documentation", agent, repo_path, index, cache)
+        self.coverage = coverage or DocCoverageIndex(self.index)
+
+    def discover_work(self) -> Optional[Dict[str, Any]]:
+        """Find an undocumented symbol."""
         try:
-            # Find Python files
-            result = subprocess.run(
-                ["find", self.repo_path, "-name", "*.py", "-type", "f"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                check=False,
-            )
-            files = [
-                f
-                for f in result.stdout.strip().split("\n")
-                if f and "__pycache__" not in f and "venv" not in f
-            ]
-
-            for filepath in files:
-                if filepath not in self.checked_files:
-                    self.checked_files.add(filepath)
-
-                    try:
-                        with open(filepath, "r", encoding="utf-8") as f:
-                            content = f.read()
-
-                        # Check for missing docstrings
-                        if "def " in content and '"""' not in content[:500]:
-                            return {
-                                "task": f"Review this code and suggest what documentation "
-                                f"should be added:\n\n{content[:400]}",
-                                "context": {"file": filepath},
-                            }
-                    except Exception:
-                        continue
+            for symbol in self.coverage.missing():
+                if not self.claim(symbol.hash):
+                    continue
+                return {
+                    "context": {
+                        "file": os.path.join(self.index.repo_path, symbol.path),
+                        "symbol": symbol.symbol,
+                        "kind": symbol.kind,
+                        "lines": [symbol.start_line, symbol.end_line],
+                        "hash": symbol.hash,
+                    }
+                }
 
         except Exception as e:
             print(f"[{self.name}] Error: {e}")
 
         return None
 
+    def prepare_work(self, work: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Read the symbol's source and build the docstring prompt."""
+        context = work["context"]
+        try:
+            with open(context["file"], "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except Exception:
+            return None
+
+        start, end = context["lines"]
+        source = "".join(lines[start - 1:end])[:self.MAX_SOURCE_CHARS]
+        if not source.strip():
+            return None
+        name = "this module" if context["kind"] == "module" else \
+            f"the {context['kind']} `{context['symbol']}`"
+        return {
+            "task": f"Write a docstring for {name} "
+            f"({os.path.relpath(context['file'], self.index.repo_path)}, "
+            f"line {start}):\n\n```python\n{source.rstrip()}\n```",
+            "context": context,
+        }
+
+    def close(self):
+        """Flush the work log and stop the coverage index's workers."""
+        super().close()
+        self.coverage.close()
+
 
 class IssueMonitorAgent(AutonomousAgent):
     """
     Monitors repository issues and suggests solutions.
     """
 
-    def __init__(self, agent, repo_path: str):
-        super().__init__("issue_monitor", agent, repo_path)
-        self.analyzed_issues = set()
+    def __init__(
+        self,
+        agent,
+        repo_path: str,
+        index: Optional[RepoIndex] = None,
+        cache: Optional[AnalysisCache] = None,
+    ):
+        super().__init__("issue_monitor", agent, repo_path, index, cache)
 
     def find_work(self) -> Optional[Dict[str, Any]]:
         """Monitor for issues that need analysis."""
         # For now, analyze repository health
         try:
-            # Check README exists
-            readme = os.path.join(self.repo_path, "README.md")
-            if os.path.exists(readme):
-                if "readme" not in self.analyzed_issues:
-                    self.analyzed_issues.add("readme")
-                    with open(readme, "r", encoding="utf-8") as f:
+            # Check README exists (reviewed again whenever it changes)
+            readme = self.index.get("README.md")
+            if readme is not None:
+                if self.claim_file(readme):
+                    with open(readme.path, "r", encoding="utf-8") as f:
                         content = f.read()
                     return {
                         "task": f"Review this README and suggest improvements:\n\n"
                         f"{content[:600]}",
-                        "context": {"file": "README.md"},
+                        "context": {"file": "README.md", "hash": readme.hash},
                     }
         except Exception as e:
             print(f"[{self.name}] Error: {e}")
@@ -0,0 +1,319 @@
+"""Pipelined runtime running autonomous agents' stages concurrently."""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .autonomous_agent import AutonomousAgent
+from .budget_scheduler import BudgetScheduler
+from .code_chunker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("discover", "prepare", "generate", "sink")
+
+WorkItem = Tuple[AutonomousAgent, Dict[str, Any], Optional[str]]
+
+
+class AutonomousPipeline:
+    """
+    Run autonomous agents as a four-stage pipeline.
+
+    - discover: ``discover_work`` finds what to do (e.g. which file)
+    - prepare: ``prepare_work`` reads files and builds the prompt
+    - generate: ``execute_work`` makes the LLM call
+    - sink: ``finish_work`` logs the result and updates the cache
+
+    Stages run on their own worker threads and are connected by bounded
+    queues, so a slow LLM call never holds up discovery for other agents, and
+    a full queue slows the stages before it instead of growing memory. An
+    agent that finds work is asked again straight away; one that finds none
+    rests for ``idle_interval`` seconds or until ``wake`` is called.
+
+    With a ``BudgetScheduler`` as ``budget``, it replaces the generate stage's
+    queue: LLM calls then go to the most valuable prepared work first, within
+    each agent's quota.
+    """
+
+    def __init__(
+        self,
+        agents: List[AutonomousAgent],
+        discover_workers: int = 1,
+        prepare_workers: int = 2,
+        generate_workers: int = 4,
+        sink_workers: int = 1,
+        queue_size: int = 16,
+        idle_interval: float = 30.0,
+        budget: Optional[BudgetScheduler] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            agents: Autonomous agents to run
+            discover_workers: Threads running ``discover_work``
+            prepare_workers: Threads building prompts
+            generate_workers: Concurrent LLM calls
+            sink_workers: Threads logging results
+            queue_size: Capacity of each queue between stages
+            idle_interval: Seconds before an agent that found no work looks again
+            budget: Shared LLM budget ordering the generate stage's work
+        """
+        self.workers = {
+            "discover": discover_workers,
+            "prepare": prepare_workers,
+            "generate": generate_workers,
+            "sink": sink_workers,
+        }
+        for stage, count in self.workers.items():
+            if count < 1:
+                raise ValueError(f"{stage}_workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+
+        self.agents = list(agents)
+        self.idle_interval = idle_interval
+        self.budget = budget
+        self.is_running = False
+
+        # Inbox of each stage after discovery
+        self._queues: Dict[str, Any] = {
+            stage: queue.Queue(maxsize=queue_size) for stage in STAGES[1:]
+        }
+        if budget is not None:
+            self._queues["generate"] = budget
+        self._stopping = threading.Event()
+        self._stage_done = {stage: threading.Event() for stage in STAGES}
+        self._threads: Dict[str, List[threading.Thread]] = {}
+        self._alive = dict(self.workers)
+
+        # Agents by the time they next look for work; each agent is in the
+        # heap at most once, so only one thread runs its discovery at a time
+        self._schedule: List[Tuple[float, int, AutonomousAgent]] = []
+        self._schedule_cond = threading.Condition()
+        self._seq = itertools.count()
+
+        self._stats_lock = threading.Lock()
+        self._processed = {stage: 0 for stage in STAGES}
+        self._errors = {stage: 0 for stage in STAGES}
+        self._completed_by_agent = {agent.name: 0 for agent in self.agents}
+        self._started_at: Optional[float] = None
+
+    def start(self):
+        """Start all stage threads."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._started_at = time.monotonic()
+        now = time.monotonic()
+        with self._schedule_cond:
+            for agent in self.agents:
+                heapq.heappush(self._schedule, (now, next(self._seq), agent))
+
+        stage_fns: Dict[str, Callable[[WorkItem], Optional[WorkItem]]] = {
+            "prepare": self._prepare,
+            "generate": self._generate,
+            "sink": self._sink,
+        }
+        self._threads["discover"] = [
+            threading.Thread(target=self._discover_loop, name=f"discover-{i}", daemon=True)
+            for i in range(self.workers["discover"])
+        ]
+        for index, stage in enumerate(STAGES[1:], 1):
+            outbox = self._queues[STAGES[index + 1]] if index + 1 < len(STAGES) else None
+            self._threads[stage] = [
+                threading.Thread(
+                    target=self._stage_loop,
+                    args=(stage, STAGES[index - 1], self._queues[stage], outbox,
+                          stage_fns[stage]),
+                    name=f"{stage}-{i}",
+                    daemon=True,
+                )
+                for i in range(self.workers[stage])
+            ]
+        for threads in self._threads.values():
+            for thread in threads:
+                thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop discovering new work and let queued work finish.
+
+        Args:
+            timeout: Maximum seconds to wait for the pipeline to drain
+                (None waits forever)
+        """
+        self._stopping.set()
+        with self._schedule_cond:
+            self._schedule_cond.notify_all()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for stage in STAGES:
+            for thread in self._threads.get(stage, []):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                thread.join(remaining)
+        self.is_running = False
+
+    def wake(self, agent: Optional[AutonomousAgent] = None):
+        """
+        Make resting agents look for work now (e.g. after files changed).
+
+        Args:
+            agent: Agent to wake (None wakes all)
+        """
+        with self._schedule_cond:
+            now = time.monotonic()
+            self._schedule = [
+                (min(due, now) if agent is None or queued is agent else due, seq, queued)
+                for due, seq, queued in self._schedule
+            ]
+            heapq.heapify(self._schedule)
+            self._schedule_cond.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-stage counters.
+
+        Returns:
+            Workers, processed and failed items, and queue depth per stage,
+            plus completed work per agent and overall throughput
+        """
+        with self._stats_lock:
+            stages = {
+                stage: {
+                    "workers": self.workers[stage],
+                    "processed": self._processed[stage],
+                    "errors": self._errors[stage],
+                    "queued": self._queues[stage].qsize() if stage in self._queues else 0,
+                }
+                for stage in STAGES
+            }
+            completed = dict(self._completed_by_agent)
+
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        total = sum(completed.values())
+        stats = {
+            "is_running": self.is_running,
+            "stages": stages,
+            "completed": completed,
+            "throughput_per_min": round(total / elapsed * 60, 2) if elapsed else 0.0,
+        }
+        if self.budget is not None:
+            stats["budget"] = self.budget.get_stats()
+        return stats
+
+    def _count(self, stage: str, ok: bool):
+        with self._stats_lock:
+            if ok:
+                self._processed[stage] += 1
+            else:
+                self._errors[stage] += 1
+
+    def _next_agent(self) -> Optional[AutonomousAgent]:
+        """Take the agent due soonest, waiting until it is due."""
+        with self._schedule_cond:
+            while not self._stopping.is_set():
+                if self._schedule:
+                    due, _, agent = self._schedule[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self._schedule)
+                        return agent
+                    self._schedule_cond.wait(wait)
+                else:
+                    self._schedule_cond.wait()
+            return None
+
+    def _reschedule(self, agent: AutonomousAgent, delay: float):
+        with self._schedule_cond:
+            heapq.heappush(self._schedule, (time.monotonic() + delay, next(self._seq), agent))
+            self._schedule_cond.notify()
+
+    def _put(self, outbox, item: WorkItem):
+        """Hand an item to the next stage, blocking while it is full."""
+        while True:
+            try:
+                outbox.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                # Downstream stages keep draining during shutdown
+                continue
+
+    def _discover_loop(self):
+        """Discovery thread: ask due agents for work."""
+        try:
+            while True:
+                agent = self._next_agent()
+                if agent is None:
+                    return
+
+                try:
+                    work = agent.discover_work()
+                    self._count("discover", True)
+                except Exception as e:
+                    logger.error("[%s] Discovery failed: %s", agent.name, e)
+                    self._count("discover", False)
+                    work = None
+
+                if work is not None:
+                    self._put(self._queues["prepare"], (agent, work, None))
+                # Agents with work are asked again straight away
+                self._reschedule(agent, 0.0 if work is not None else self.idle_interval)
+        finally:
+            self._finish_thread("discover")
+
+    def _stage_loop(self, stage: str, upstream: str, inbox, outbox,
+                    fn: Callable[[WorkItem], Optional[WorkItem]]):
+        """Worker loop shared by the stages after discovery."""
+        try:
+            while True:
+                try:
+                    item = inbox.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stage_done[upstream].is_set() and inbox.empty():
+                        return
+                    continue
+
+                try:
+                    result = fn(item)
+                    self._count(stage, True)
+                except Exception as e:
+                    logger.error("[%s] %s failed: %s", item[0].name, stage, e)
+                    self._count(stage, False)
+                    continue
+
+                if result is not None and outbox is not None:
+                    self._put(outbox, result)
+        finally:
+            self._finish_thread(stage)
+
+    def _finish_thread(self, stage: str):
+        """Mark a stage done once its last thread exits."""
+        with self._stats_lock:
+            self._alive[stage] -= 1
+            if self._alive[stage] == 0:
+                self._stage_done[stage].set()
+
+    def _prepare(self, item: WorkItem) -> Optional[WorkItem]:
+        agent, work, _ = item
+        prepared = agent.prepare_work(work)
+        return None if prepared is None else (agent, prepared, None)
+
+    def _generate(self, item: WorkItem) -> WorkItem:
+        agent, work, _ = item
+        logger.info("[%s] Found work: %s...", agent.name, work.get("task", "")[:60])
+        return agent, work, agent.execute_work(work)
+
+    def _sink(self, item: WorkItem) -> None:
+        agent, work, result = item
+        agent.finish_work(work, result)
+        if self.budget is not None:
+            self.budget.charge(agent.name, estimate_tokens(result))
+        with self._stats_lock:
+            self._completed_by_agent[agent.name] += 1
+        logger.info("[%s] Completed. Result: %s...", agent.name, result[:80])
@@ -0,0 +1,361 @@
+"""Offline batch runner: stream a JSONL prompt set through orchestrator agents.
+
+Usage:
+    python -m llm_framework.batch prompts.jsonl -o results.jsonl --concurrency 8
+
+Each input line is ``{"id": ..., "agent": "coding", "task": "...", "context": {...}}``
+(``id`` defaults to the line number, ``context`` is optional). Each output line
+is the input id, agent and task plus either ``result`` or ``error``.
+
+The output file doubles as the checkpoint: rerunning the same command skips ids
+that already have a result, so an interrupted run resumes where it stopped.
+With ``--retry-errors`` the failed records are first removed from the file, so
+every id still appears once.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .core.agent import Agent
+from .orchestrator import AgentOrchestrator
+
+logger = logging.getLogger(__name__)
+
+
+def read_records(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Parse batch records from JSONL, lazily.
+
+    Args:
+        lines: Lines of JSONL (a file object is read incrementally)
+
+    Yields:
+        (sequence number, record) with ``id`` filled in from the line number
+        when missing
+
+    Raises:
+        ValueError: If a line is not a JSON object with ``agent`` and ``task``
+    """
+    seq = 0
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        record = json.loads(line)
+        if not isinstance(record, dict) or not record.get("agent") or not record.get("task"):
+            raise ValueError(f"Line {number}: expected an object with 'agent' and 'task'")
+        record["id"] = str(record.get("id", number))
+        yield seq, record
+        seq += 1
+
+
+def load_completed_ids(output_path: str, retry_errors: bool = False) -> Set[str]:
+    """
+    Read ids already finished in an output file and repair a torn last line.
+
+    A crash can leave a partially written final line; it is truncated so that
+    appended records start on a fresh line. With ``retry_errors``, records with
+    an ``error`` are removed from the file, as they are about to be rerun.
+
+    Args:
+        output_path: Output JSONL file from an earlier run
+        retry_errors: Treat records with an ``error`` as not finished
+
+    Returns:
+        Ids to skip
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    completed = set()
+    valid_size = 0
+    has_errors = False
+    with open(output_path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            valid_size += len(raw)
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if "result" in record or ("error" in record and not retry_errors):
+                completed.add(str(record["id"]))
+            elif "error" in record:
+                has_errors = True
+
+    if has_errors:
+        _drop_error_records(output_path, valid_size)
+    elif valid_size < os.path.getsize(output_path):
+        logger.warning("Truncating partial last line of %s", output_path)
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_size)
+    return completed
+
+
+def _drop_error_records(output_path: str, valid_size: int):
+    """Rewrite an output file without its error records (and torn last line)."""
+    tmp_path = f"{output_path}.tmp"
+    with open(output_path, "rb") as src, open(tmp_path, "wb") as dst:
+        remaining = valid_size
+        for raw in src:
+            if remaining <= 0:
+                break
+            remaining -= len(raw)
+            try:
+                if "error" in json.loads(raw):
+                    continue
+            except ValueError:
+                pass
+            dst.write(raw)
+    os.replace(tmp_path, output_path)
+
+
+class BatchRunner:
+    """
+    Run batch records through agents with bounded concurrency.
+
+    At most ``concurrency`` records execute at once, and at most twice that
+    many are read ahead. Each record runs on a fresh copy of its ``Agent``
+    (sharing the provider), so no conversation history accumulates and
+    memory stays constant regardless of input size. In ordered mode, output
+    follows input order; completed records wait in a buffer bounded by the
+    same read-ahead window.
+    """
+
+    def __init__(
+        self,
+        agents: Dict[str, Agent],
+        concurrency: int = 4,
+        ordered: bool = False,
+        progress_interval: Optional[float] = 1.0,
+        progress_stream: Optional[IO[str]] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            agents: Agents by name, as referenced by the records' ``agent`` field
+            concurrency: Maximum records executing at once
+            ordered: Write output in input order instead of completion order
+            progress_interval: Seconds between progress updates (None disables)
+            progress_stream: Where progress is written (default stderr)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.agents = agents
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.progress_interval = progress_interval
+        self.progress_stream = progress_stream or sys.stderr
+
+        self._lock = threading.Lock()
+        self._started_at = 0.0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def run(
+        self,
+        records: Iterable[Tuple[int, Dict[str, Any]]],
+        output: IO[str],
+        skip_ids: Optional[Set[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute every record and write one output line per record.
+
+        Args:
+            records: (sequence number, record) pairs, e.g. from ``read_records``
+            output: Text stream the JSONL output is appended to
+            skip_ids: Ids finished by an earlier run
+
+        Returns:
+            Run statistics
+        """
+        skip_ids = skip_ids or set()
+        window = threading.BoundedSemaphore(self.concurrency * 2)
+        write_lock = threading.Lock()
+        buffered: Dict[int, Optional[Dict[str, Any]]] = {}
+        next_seq = [0]
+
+        def emit(seq: int, line: Optional[Dict[str, Any]]):
+            """Write a finished (or skipped, line=None) record."""
+            with write_lock:
+                if not self.ordered:
+                    ready = [(seq, line)]
+                else:
+                    buffered[seq] = line
+                    ready = []
+                    while next_seq[0] in buffered:
+                        ready.append((next_seq[0], buffered.pop(next_seq[0])))
+                        next_seq[0] += 1
+
+                for _, item in ready:
+                    if item is not None:
+                        output.write(json.dumps(item, ensure_ascii=False) + "\n")
+                if ready:
+                    output.flush()
+            for _ in ready:
+                window.release()
+
+        self._started_at = time.monotonic()
+        stop_progress = threading.Event()
+        progress = None
+        if self.progress_interval:
+            progress = threading.Thread(
+                target=self._report_progress, args=(stop_progress,), daemon=True
+            )
+            progress.start()
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="batch"
+            ) as pool:
+                for seq, record in records:
+                    window.acquire()
+                    if record["id"] in skip_ids:
+                        with self._lock:
+                            self.skipped += 1
+                        emit(seq, None)
+                        continue
+
+                    with self._lock:
+                        self.submitted += 1
+                    future = pool.submit(self._execute, record)
+                    future.add_done_callback(lambda f, seq=seq: emit(seq, f.result()))
+        finally:
+            stop_progress.set()
+            if progress is not None:
+                progress.join()
+                self._print_progress(final=True)
+
+        return self.get_stats()
+
+    def _execute(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one record; errors are captured in the output line."""
+        line = {"id": record["id"], "agent": record["agent"], "task": record["task"]}
+        start = time.monotonic()
+        try:
+            agent = self.agents.get(record["agent"])
+            if agent is None:
+                raise ValueError(f"Unknown agent '{record['agent']}'")
+            if isinstance(agent, Agent):
+                # Records are independent; a shared history would only grow
+                agent = Agent(agent.config, agent.provider)
+            line["result"] = agent.execute(record["task"], record.get("context"))
+            with self._lock:
+                self.succeeded += 1
+        except Exception as e:
+            line["error"] = str(e)
+            with self._lock:
+                self.failed += 1
+        line["elapsed"] = round(time.monotonic() - start, 3)
+        return line
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get progress counters.
+
+        Returns:
+            Records submitted, succeeded, failed and skipped, elapsed seconds
+            and completed records per second
+        """
+        with self._lock:
+            done = self.succeeded + self.failed
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            return {
+                "submitted": self.submitted,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "in_flight": self.submitted - done,
+                "elapsed": round(elapsed, 1),
+                "per_second": round(done / elapsed, 2) if elapsed else 0.0,
+            }
+
+    def _report_progress(self, stop: threading.Event):
+        """Progress thread loop."""
+        while not stop.wait(self.progress_interval):
+            self._print_progress()
+
+    def _print_progress(self, final: bool = False):
+        """Write one progress line, redrawn in place on a terminal."""
+        stats = self.get_stats()
+        text = (
+            f"{stats['succeeded']} ok, {stats['failed']} failed, {stats['skipped']} skipped, "
+            f"{stats['in_flight']} running | {stats['per_second']}/s | {stats['elapsed']}s"
+        )
+        interactive = getattr(self.progress_stream, "isatty", lambda: False)()
+        if interactive:
+            self.progress_stream.write("\r\033[K" + text + ("\n" if final else ""))
+        else:
+            self.progress_stream.write(text + "\n")
+        self.progress_stream.flush()
+
+
+def main(argv=None) -> int:
+    """Run a JSONL batch through the default orchestrator agents."""
+    parser = argparse.ArgumentParser(
+        prog="python -m llm_framework.batch",
+        description="Run a JSONL file of {id, agent, task, context} records through agents",
+    )
+    parser.add_argument("input", help="Input JSONL file, or '-' for stdin")
+    parser.add_argument(
+        "-o", "--output", required=True, help="Output JSONL file (also the checkpoint)"
+    )
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=4, help="Records run at once (default: 4)"
+    )
+    parser.add_argument("--ordered", action="store_true", help="Write output in input order")
+    parser.add_argument("--restart", action="store_true", help="Ignore and overwrite existing output")
+    parser.add_argument("--retry-errors", action="store_true", help="Rerun records that failed before")
+    parser.add_argument("--provider", help="Provider for the agents (default: first available)")
+    parser.add_argument("--quiet", "-q", action="store_true", help="No progress display")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+
+    skip_ids: Set[str] = set()
+    if not args.restart:
+        skip_ids = load_completed_ids(args.output, retry_errors=args.retry_errors)
+        if skip_ids:
+            logger.info("Resuming: %d records already done", len(skip_ids))
+
+    orchestrator = AgentOrchestrator()
+    orchestrator.setup_default_providers()
+    orchestrator.setup_default_agents(args.provider)
+
+    runner = BatchRunner(
+        orchestrator.agents,
+        concurrency=args.concurrency,
+        ordered=args.ordered,
+        progress_interval=None if args.quiet else 1.0,
+    )
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    try:
+        with open(args.output, "w" if args.restart else "a", encoding="utf-8") as output:
+            stats = runner.run(read_records(source), output, skip_ids)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    logger.info(
+        "Done: %d succeeded, %d failed, %d skipped in %.1fs",
+        stats["succeeded"], stats["failed"], stats["skipped"], stats["elapsed"],
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
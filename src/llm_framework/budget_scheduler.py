@@ -0,0 +1,333 @@
+"""Shared LLM call budget for autonomous agents, serving the most valuable work first."""
+
+import heapq
+import itertools
+import logging
+import math
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .code_chunker import estimate_tokens
+from .impact_analysis import ImportGraph
+from .repo_index import RepoIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS = {"recency": 0.4, "size": 0.2, "centrality": 0.4}
+
+
+@dataclass
+class Quota:
+    """LLM usage allowed per window (None means unlimited)."""
+
+    calls: Optional[int] = None
+    tokens: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("calls", "tokens"):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"Quota {name} must be at least 1")
+
+
+class WorkScorer:
+    """
+    Estimate how valuable a piece of autonomous work is.
+
+    The score combines, for the files named in the work's context, how
+    recently they changed (halving every ``half_life`` seconds), their size
+    (log scale, saturating at ``max_size``) and how many files depend on them
+    in the import graph. Each part is in [0, 1]; the weighted sum is
+    multiplied by the agent's weight.
+    """
+
+    def __init__(
+        self,
+        index: RepoIndex,
+        graph: Optional[ImportGraph] = None,
+        weights: Optional[Dict[str, float]] = None,
+        agent_weights: Optional[Dict[str, float]] = None,
+        half_life: float = 24 * 3600,
+        max_size: int = 100_000,
+    ):
+        """
+        Initialize the scorer.
+
+        Args:
+            index: Repository file index
+            graph: Import graph for centrality (None skips centrality)
+            weights: Weight of "recency", "size" and "centrality"
+            agent_weights: Multiplier per agent name (default 1.0)
+            half_life: Seconds after which a change counts half as recent
+            max_size: File size in bytes scoring 1.0
+        """
+        self.index = index
+        self.graph = graph
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.agent_weights = agent_weights or {}
+        self.half_life = half_life
+        self.max_size = max_size
+
+    def score(self, agent_name: str, work: Dict[str, Any]) -> float:
+        """
+        Score a piece of work.
+
+        Args:
+            agent_name: Agent the work belongs to
+            work: Work with a 'context'
+
+        Returns:
+            Value score (0 when the work names no indexed file)
+        """
+        context = work.get("context") or {}
+        paths = list(context.get("files") or []) + list(context.get("changed") or [])
+        if context.get("file"):
+            paths.append(context["file"])
+
+        best = 0.0
+        now_ns = time.time_ns()
+        for path in paths:
+            entry = self.index.get(path)
+            if entry is None:
+                continue
+            age = max(0.0, (now_ns - entry.mtime_ns) / 1e9)
+            parts = {
+                "recency": 0.5 ** (age / self.half_life),
+                "size": min(1.0, math.log1p(entry.size) / math.log1p(self.max_size)),
+                "centrality": self._centrality(entry.rel_path),
+            }
+            best = max(best, sum(self.weights.get(k, 0.0) * v for k, v in parts.items()))
+        return best * self.agent_weights.get(agent_name, 1.0)
+
+    def _centrality(self, rel_path: str) -> float:
+        """Share of files depending on a file (log scale)."""
+        if self.graph is None or not rel_path.endswith(".py"):
+            return 0.0
+        dependents = len(self.graph.dependents([rel_path])) - 1
+        total = max(2, len(self.index))
+        return min(1.0, math.log1p(dependents) / math.log1p(total))
+
+
+class BudgetScheduler:
+    """
+    Queue of prepared LLM work shared by all agents, with per-agent quotas.
+
+    Used as the inbox of the pipeline's generate stage (it has the
+    ``queue.Queue`` methods the pipeline needs). ``get`` returns the
+    highest-scoring item among agents that still have quota in the current
+    sliding window, so low-value work never crowds out valuable work and an
+    agent over its quota waits while others keep the provider busy. A call
+    is charged the prompt's estimated tokens when it is handed out; the
+    pipeline charges the response's tokens with ``charge`` when it finishes.
+    """
+
+    def __init__(
+        self,
+        quotas: Optional[Dict[str, Quota]] = None,
+        default_quota: Optional[Quota] = None,
+        window: float = 60.0,
+        scorer: Optional[WorkScorer] = None,
+        min_score: Optional[float] = None,
+        maxsize: int = 16,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            quotas: Quota per agent name
+            default_quota: Quota of agents not in ``quotas`` (None is unlimited)
+            window: Length of the sliding quota window in seconds
+            scorer: Scores work (None keeps arrival order)
+            min_score: Drop work scoring below this (it is not offered again)
+            maxsize: Items held before ``put`` blocks
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.quotas = quotas or {}
+        self.default_quota = default_quota or Quota()
+        self.window = window
+        self.scorer = scorer
+        self.min_score = min_score
+        self.maxsize = maxsize
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        # Per agent: heap of (-score, seq, item)
+        self._pending: Dict[str, List[Tuple[float, int, Any]]] = {}
+        self._size = 0
+        # Per agent: (time, tokens, calls) charged in the window
+        self._usage: Dict[str, Deque[Tuple[float, int, int]]] = {}
+        self.granted = 0
+        self.dropped = 0
+
+    def quota(self, agent_name: str) -> Quota:
+        """Get an agent's quota."""
+        return self.quotas.get(agent_name, self.default_quota)
+
+    def put(self, item: Tuple[Any, Dict[str, Any], Any], block: bool = True,
+            timeout: Optional[float] = None):
+        """
+        Add prepared work.
+
+        Args:
+            item: (agent, work, result) tuple from the pipeline
+            block: Wait for room when full
+            timeout: Maximum seconds to wait
+
+        Raises:
+            queue.Full: If there is no room in time
+        """
+        agent, work = item[0], item[1]
+        score = self.scorer.score(agent.name, work) if self.scorer else 0.0
+        if self.min_score is not None and score < self.min_score:
+            with self._cond:
+                self.dropped += 1
+            logger.debug("[%s] Dropped work scoring %.3f", agent.name, score)
+            return
+        work.setdefault("context", {})["score"] = round(score, 4)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._size >= self.maxsize:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise queue.Full
+                self._cond.wait(remaining)
+            heapq.heappush(self._pending.setdefault(agent.name, []),
+                           (-score, next(self._seq), item))
+            self._size += 1
+            self._cond.notify_all()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        """
+        Take the most valuable work whose agent has quota left.
+
+        Args:
+            block: Wait for eligible work
+            timeout: Maximum seconds to wait
+
+        Returns:
+            An (agent, work, result) tuple
+
+        Raises:
+            queue.Empty: If no eligible work arrives in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                best, retry_at = None, None
+                for name, heap in self._pending.items():
+                    if not heap:
+                        continue
+                    tokens = estimate_tokens(heap[0][2][1].get("task", ""))
+                    free_at = self._free_at(name, tokens, now)
+                    if free_at > now:
+                        retry_at = free_at if retry_at is None else min(retry_at, free_at)
+                    elif best is None or heap[0][:2] < self._pending[best][0][:2]:
+                        best = name
+
+                if best is not None:
+                    _, _, item = heapq.heappop(self._pending[best])
+                    self._size -= 1
+                    self._usage.setdefault(best, deque()).append(
+                        (now, estimate_tokens(item[1].get("task", "")), 1)
+                    )
+                    self.granted += 1
+                    self._cond.notify_all()
+                    return item
+
+                waits = [t - now for t in (retry_at, deadline) if t is not None]
+                if not block or (deadline is not None and deadline <= now):
+                    raise queue.Empty
+                self._cond.wait(min(waits) if waits else None)
+
+    def charge(self, agent_name: str, tokens: int):
+        """
+        Add tokens (e.g. of a response) to an agent's usage in the window.
+
+        Args:
+            agent_name: Agent name
+            tokens: Tokens used
+        """
+        with self._cond:
+            self._usage.setdefault(agent_name, deque()).append((time.monotonic(), tokens, 0))
+            self._cond.notify_all()
+
+    def usage(self, agent_name: str) -> Dict[str, int]:
+        """
+        Get an agent's usage in the current window.
+
+        Args:
+            agent_name: Agent name
+
+        Returns:
+            Calls and tokens used
+        """
+        with self._cond:
+            usage = self._window(agent_name, time.monotonic())
+            return {"calls": sum(c for _, _, c in usage), "tokens": sum(t for _, t, _ in usage)}
+
+    def qsize(self) -> int:
+        """Number of items waiting."""
+        with self._cond:
+            return self._size
+
+    def empty(self) -> bool:
+        """True if no items are waiting."""
+        return self.qsize() == 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters.
+
+        Returns:
+            Granted and dropped counts, and per-agent usage and backlog
+        """
+        with self._cond:
+            now = time.monotonic()
+            agents = {}
+            for name in set(self._pending) | set(self._usage):
+                usage = self._window(name, now)
+                agents[name] = {
+                    "calls": sum(c for _, _, c in usage),
+                    "tokens": sum(t for _, t, _ in usage),
+                    "pending": len(self._pending.get(name, ())),
+                }
+            return {
+                "granted": self.granted,
+                "dropped": self.dropped,
+                "agents": agents,
+            }
+
+    def _window(self, agent_name: str, now: float) -> Deque[Tuple[float, int, int]]:
+        """Drop usage older than the window. Caller must hold the lock."""
+        usage = self._usage.setdefault(agent_name, deque())
+        while usage and usage[0][0] <= now - self.window:
+            usage.popleft()
+        return usage
+
+    def _free_at(self, agent_name: str, tokens: int, now: float) -> float:
+        """When an agent can next make a call of ``tokens``. Caller must hold the lock."""
+        quota = self.quota(agent_name)
+        usage = self._window(agent_name, now)
+        calls = sum(c for _, _, c in usage)
+        used = sum(t for _, t, _ in usage)
+        # A single call larger than the whole token quota still runs, alone
+        needed = min(tokens, quota.tokens) if quota.tokens is not None else 0
+
+        free_at = now
+        for at, spent, call in usage:
+            if (quota.calls is None or calls < quota.calls) and \
+                    (quota.tokens is None or used + needed <= quota.tokens):
+                break
+            calls -= call
+            used -= spent
+            free_at = at + self.window
+        return free_at
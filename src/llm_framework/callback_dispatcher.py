@@ -0,0 +1,349 @@
+"""Asynchronous dispatch of agent results to slow callback sinks."""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_SPILL = "spill"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL)
+
+ResultItem = Tuple[str, str]
+
+
+class CallbackDispatcher:
+    """
+    Deliver (task, result) pairs to a callback from dedicated worker threads.
+
+    The dispatcher is itself callable with the same ``(task, result)`` signature
+    as ``ContinuousAgent.on_result_callback``, so it can wrap any existing sink.
+    Results are placed on a bounded outbox and delivered in batches with retry.
+    Sinks that expose a ``deliver_batch(items)`` method receive whole batches;
+    other sinks are called once per item.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, str], Any],
+        max_outbox: int = 1000,
+        workers: int = 1,
+        batch_size: int = 10,
+        batch_wait: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        overflow_policy: str = OVERFLOW_BLOCK,
+        spill_path: Optional[str] = None,
+        block_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            callback: Sink receiving results, called as ``callback(task, result)``
+            max_outbox: Maximum number of results held in memory
+            workers: Number of delivery worker threads
+            batch_size: Maximum number of results delivered per batch
+            batch_wait: Seconds a worker waits to fill a batch before delivering
+            max_retries: Delivery retries per batch before giving up
+            retry_backoff: Base delay in seconds for exponential retry backoff
+            overflow_policy: One of "block", "drop_oldest" or "spill"
+            spill_path: JSONL file for spilled results (required for "spill")
+            block_timeout: Maximum seconds to block when the outbox is full
+                (None blocks until space is available)
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{overflow_policy}'. "
+                f"Use one of: {', '.join(OVERFLOW_POLICIES)}"
+            )
+        if overflow_policy == OVERFLOW_SPILL and not spill_path:
+            raise ValueError("spill_path is required for the 'spill' overflow policy")
+
+        self.callback = callback
+        self.max_outbox = max(1, max_outbox)
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.block_timeout = block_timeout
+
+        self._outbox: Deque[ResultItem] = deque()
+        self._cond = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._spilled_pending = 0
+        self._in_flight = 0
+        self._threads: List[threading.Thread] = []
+        self.is_running = False
+
+        self.submitted = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.batches = 0
+
+        if self.spill_path and os.path.exists(self.spill_path):
+            self._spilled_pending = self._count_spilled()
+
+    def __call__(self, task: str, result: str):
+        """Enqueue a result; signature-compatible with ``on_result_callback``."""
+        self.submit(task, result)
+
+    def start(self):
+        """Start the delivery worker threads."""
+        with self._cond:
+            if self.is_running:
+                return
+            self.is_running = True
+
+        self._threads = []
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"callback-dispatcher-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0, drain: bool = True):
+        """
+        Stop the workers.
+
+        Args:
+            timeout: Maximum seconds to wait for the workers to finish
+            drain: Deliver everything still in the outbox before stopping
+        """
+        if drain:
+            self.flush(timeout)
+
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the outbox and any in-flight batches are delivered.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if everything was delivered, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._outbox or self._in_flight or self._spilled_pending:
+                if not self.is_running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def submit(self, task: str, result: str) -> bool:
+        """
+        Place a result on the outbox.
+
+        Args:
+            task: The task that was executed
+            result: The result from the agent
+
+        Returns:
+            True if the result was accepted (queued or spilled), False if dropped
+        """
+        if not self.is_running:
+            self.start()
+
+        item = (task, result)
+        with self._cond:
+            self.submitted += 1
+
+            if len(self._outbox) >= self.max_outbox:
+                if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+                    self._outbox.popleft()
+                    self.dropped += 1
+                    logger.warning("Callback outbox full, dropped oldest result")
+                elif self.overflow_policy == OVERFLOW_SPILL:
+                    self._spill([item])
+                    return True
+                else:
+                    if not self._wait_for_space():
+                        self.dropped += 1
+                        logger.warning("Callback outbox full, dropped result after blocking")
+                        return False
+
+            self._outbox.append(item)
+            self._cond.notify_all()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get dispatcher counters.
+
+        Returns:
+            Dictionary of outbox depth and delivery counters
+        """
+        with self._cond:
+            return {
+                "is_running": self.is_running,
+                "outbox_depth": len(self._outbox),
+                "in_flight": self._in_flight,
+                "spilled_pending": self._spilled_pending,
+                "submitted": self.submitted,
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "batches": self.batches,
+                "overflow_policy": self.overflow_policy,
+            }
+
+    def _wait_for_space(self) -> bool:
+        """Block until the outbox has room. Caller must hold the condition."""
+        deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+        while len(self._outbox) >= self.max_outbox:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._cond.wait(remaining)
+        return True
+
+    def _worker(self):
+        """Worker loop: collect a batch, deliver it, repeat."""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._in_flight -= len(batch)
+                    self._cond.notify_all()
+
+    def _next_batch(self) -> Optional[List[ResultItem]]:
+        """Take up to ``batch_size`` items, waiting ``batch_wait`` to fill a batch."""
+        with self._cond:
+            while not self._outbox:
+                if self._spilled_pending and self._refill_from_spill():
+                    break
+                if not self.is_running:
+                    return None
+                self._cond.wait()
+
+            if len(self._outbox) < self.batch_size and self.batch_wait > 0 and self.is_running:
+                self._cond.wait(self.batch_wait)
+
+            batch = []
+            while self._outbox and len(batch) < self.batch_size:
+                batch.append(self._outbox.popleft())
+            self._in_flight += len(batch)
+            self._cond.notify_all()
+            return batch
+
+    def _deliver(self, batch: List[ResultItem]):
+        """Deliver a batch, retrying failed items with exponential backoff."""
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            pending = self._attempt(pending)
+            if not pending:
+                break
+            if attempt < self.max_retries:
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+        with self._cond:
+            self.batches += 1
+            self.delivered += len(batch) - len(pending)
+            self.failed += len(pending)
+
+        if pending:
+            logger.error("Failed to deliver %d result(s) after %d retries",
+                         len(pending), self.max_retries)
+
+    def _attempt(self, items: List[ResultItem]) -> List[ResultItem]:
+        """Try to deliver items once and return those that failed."""
+        deliver_batch = getattr(self.callback, "deliver_batch", None)
+        if callable(deliver_batch):
+            try:
+                deliver_batch(items)
+                return []
+            except Exception as e:
+                logger.warning("Batch delivery failed: %s", e)
+                return items
+
+        failed = []
+        for task, result in items:
+            try:
+                self.callback(task, result)
+            except Exception as e:
+                logger.warning("Result delivery failed: %s", e)
+                failed.append((task, result))
+        return failed
+
+    def _spill(self, items: List[ResultItem]):
+        """Append items to the spill file. Caller must hold the condition."""
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for task, result in items:
+                    f.write(json.dumps({"task": task, "result": result}) + "\n")
+        self.spilled += len(items)
+        self._spilled_pending += len(items)
+        self._cond.notify_all()
+
+    def _count_spilled(self) -> int:
+        """Count results left in the spill file by a previous run."""
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    def _refill_from_spill(self) -> bool:
+        """
+        Move spilled results back into the outbox. Caller must hold the condition.
+
+        Returns:
+            True if any items were loaded
+        """
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                self._spilled_pending = 0
+                return False
+
+            replay_path = self.spill_path + ".replay"
+            os.replace(self.spill_path, replay_path)
+            free = self.max_outbox - len(self._outbox)
+            loaded = 0
+            with open(replay_path, "r", encoding="utf-8") as src:
+                with open(self.spill_path, "a", encoding="utf-8") as rest:
+                    for line in src:
+                        if not line.strip():
+                            continue
+                        if loaded < free:
+                            entry = json.loads(line)
+                            self._outbox.append((entry["task"], entry["result"]))
+                            loaded += 1
+                        else:
+                            rest.write(line)
+            os.remove(replay_path)
+            if os.path.getsize(self.spill_path) == 0:
+                os.remove(self.spill_path)
+
+        self._spilled_pending = max(0, self._spilled_pending - loaded)
+        if not os.path.exists(self.spill_path):
+            self._spilled_pending = 0
+        return loaded > 0
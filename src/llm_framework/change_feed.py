@@ -0,0 +1,412 @@
+"""Git-aware change feed telling autonomous agents exactly which files changed."""
+
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .repo_index import RepoIndex
+
+logger = logging.getLogger(__name__)
+
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+# Fingerprint of a dirty path: (porcelain status, size, mtime_ns)
+Fingerprint = Tuple[str, int, int]
+
+
+class GitError(RuntimeError):
+    """A git command failed."""
+
+
+@dataclass
+class ChangeEvent:
+    """One changed file."""
+
+    path: str
+    status: str
+    source: str
+    # Changed line ranges (start, count) in the new file; None means the whole file
+    hunks: Optional[List[Tuple[int, int]]] = None
+    commit: Optional[str] = None
+    old_path: Optional[str] = None
+
+
+class ChangeSubscription:
+    """
+    One consumer's view of the feed: changed paths not yet consumed.
+
+    Starts with ``full_scan`` set, since nothing is known about changes made
+    before the consumer subscribed; the consumer clears it after its first
+    full pass.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.full_scan = True
+        self._lock = threading.Lock()
+        self._events: "OrderedDict[str, ChangeEvent]" = OrderedDict()
+
+    def push(self, events: List[ChangeEvent]):
+        """Queue events, keeping the latest per path."""
+        with self._lock:
+            for event in events:
+                self._events.pop(event.path, None)
+                self._events[event.path] = event
+
+    def drain(self) -> List[ChangeEvent]:
+        """
+        Take all queued events.
+
+        Returns:
+            Events in the order their paths last changed
+        """
+        with self._lock:
+            events = list(self._events.values())
+            self._events.clear()
+            return events
+
+    def resync(self):
+        """Ask the consumer for a full pass (history could not be followed)."""
+        with self._lock:
+            self._events.clear()
+            self.full_scan = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+class GitChangeFeed:
+    """
+    Watch a git repository and publish changed files and hunks.
+
+    Each poll reads HEAD from ``.git`` without running git, so a repository
+    with no new commits costs two small file reads. When HEAD moves, the diff
+    from the last processed commit to HEAD is published. With ``worktree``
+    enabled, ``git status`` also reports dirty files, and only those whose
+    stat changed since the last poll are diffed against HEAD. The last
+    processed commit is saved to ``state_path``, so commits made while
+    nothing was watching are picked up on restart.
+
+    Changed files are re-checked in the ``RepoIndex`` (when given), queued on
+    every subscription and passed to listeners (e.g. a pipeline's ``wake``).
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        index: Optional[RepoIndex] = None,
+        state_path: Optional[str] = None,
+        poll_interval: float = 2.0,
+        worktree: bool = True,
+        git: str = "git",
+    ):
+        """
+        Initialize the feed (the first poll sets the baseline).
+
+        Args:
+            repo_path: Repository root
+            index: File index to keep up to date
+            state_path: JSON file remembering the last processed commit
+            poll_interval: Seconds between polls of the background thread
+            worktree: Also watch uncommitted changes
+            git: git executable
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        self.index = index
+        self.state_path = state_path
+        self.poll_interval = poll_interval
+        self.worktree = worktree
+        self.git = git
+
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, ChangeSubscription] = {}
+        self._listeners: List[Callable[[List[ChangeEvent]], None]] = []
+        self._git_dir: Optional[str] = None
+        self._head: Optional[str] = self._load_state()
+        self._dirty: Optional[Dict[str, Fingerprint]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.polls = 0
+        self.git_calls = 0
+
+    @property
+    def head(self) -> Optional[str]:
+        """Last processed commit."""
+        return self._head
+
+    def subscribe(self, name: str) -> ChangeSubscription:
+        """
+        Get the subscription for a consumer, creating it on first use.
+
+        Args:
+            name: Consumer name (e.g. the agent name)
+
+        Returns:
+            The subscription
+        """
+        with self._lock:
+            if name not in self._subscriptions:
+                self._subscriptions[name] = ChangeSubscription(name)
+            return self._subscriptions[name]
+
+    def add_listener(self, callback: Callable[[List[ChangeEvent]], None]):
+        """
+        Call a function with every non-empty batch of events.
+
+        Args:
+            callback: Called from the polling thread
+        """
+        self._listeners.append(callback)
+
+    def poll(self) -> List[ChangeEvent]:
+        """
+        Check for changes once and publish them.
+
+        Returns:
+            Events found by this poll
+        """
+        with self._lock:
+            self.polls += 1
+            events: "OrderedDict[str, ChangeEvent]" = OrderedDict()
+            resync = False
+
+            head = self._read_head()
+            if head != self._head:
+                if self._head is not None and head is not None:
+                    try:
+                        for event in self._diff([self._head, head], "commit", head):
+                            events[event.path] = event
+                    except GitError as e:
+                        # e.g. the old commit was garbage collected after a rebase
+                        logger.warning("Cannot diff %s..%s: %s", self._head, head, e)
+                        resync = True
+                self._head = head
+                self._save_state()
+
+            if self.worktree and head is not None:
+                for event in self._worktree_changes():
+                    # A file just committed is reported by the commit diff
+                    events.setdefault(event.path, event)
+
+            subscriptions = list(self._subscriptions.values())
+
+        published = list(events.values())
+        if resync:
+            if self.index is not None:
+                self.index.invalidate()
+            for subscription in subscriptions:
+                subscription.resync()
+        elif published:
+            if self.index is not None:
+                self.index.update(e.path for e in published)
+                self.index.update(e.old_path for e in published if e.old_path)
+            for subscription in subscriptions:
+                subscription.push(published)
+        if published or resync:
+            for listener in self._listeners:
+                try:
+                    listener(published)
+                except Exception as e:
+                    logger.error("Change listener failed: %s", e)
+        return published
+
+    def start(self):
+        """Poll in a background thread every ``poll_interval`` seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="git-change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error("Change feed poll failed: %s", e)
+            self._stop.wait(self.poll_interval)
+
+    def _run_git(self, *args: str) -> str:
+        """Run git in the repository and return its output."""
+        self.git_calls += 1
+        try:
+            proc = subprocess.run(
+                [self.git, "-c", "core.quotePath=false", *args],
+                cwd=self.repo_path, capture_output=True, text=True, timeout=60,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise GitError(f"git {args[0]} failed: {e}") from e
+        if proc.returncode != 0:
+            raise GitError(f"git {args[0]} failed: {proc.stderr.strip()}")
+        return proc.stdout
+
+    def _find_git_dir(self) -> Optional[str]:
+        """Locate the git directory (a ``.git`` file points elsewhere in worktrees)."""
+        dot_git = os.path.join(self.repo_path, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        try:
+            with open(dot_git, "r", encoding="utf-8") as f:
+                line = f.read().strip()
+        except OSError:
+            return None
+        if line.startswith("gitdir:"):
+            return os.path.join(self.repo_path, line[len("gitdir:"):].strip())
+        return None
+
+    def _read_head(self) -> Optional[str]:
+        """Resolve HEAD by reading the ref files; fall back to git."""
+        if self._git_dir is None:
+            self._git_dir = self._find_git_dir()
+        try:
+            if self._git_dir is None:
+                raise OSError("no .git directory")
+            with open(os.path.join(self._git_dir, "HEAD"), "r", encoding="utf-8") as f:
+                head = f.read().strip()
+            if not head.startswith("ref:"):
+                return head
+            ref = head[len("ref:"):].strip()
+            for base in self._ref_dirs():
+                try:
+                    with open(os.path.join(base, ref), "r", encoding="utf-8") as f:
+                        return f.read().strip()
+                except OSError:
+                    continue
+            for base in self._ref_dirs():
+                try:
+                    with open(os.path.join(base, "packed-refs"), "r", encoding="utf-8") as f:
+                        for line in f:
+                            parts = line.split()
+                            if len(parts) == 2 and parts[1] == ref:
+                                return parts[0]
+                except OSError:
+                    continue
+            # Branch with no commits yet
+            return None
+        except OSError:
+            try:
+                return self._run_git("rev-parse", "--verify", "-q", "HEAD").strip() or None
+            except GitError:
+                return None
+
+    def _ref_dirs(self) -> List[str]:
+        """Directories holding refs (worktrees share the main repository's refs)."""
+        dirs = [self._git_dir]
+        try:
+            with open(os.path.join(self._git_dir, "commondir"), "r", encoding="utf-8") as f:
+                dirs.append(os.path.join(self._git_dir, f.read().strip()))
+        except OSError:
+            pass
+        return dirs
+
+    def _diff(self, revisions: List[str], source: str, commit: Optional[str],
+              paths: Optional[List[str]] = None) -> List[ChangeEvent]:
+        """Changed files and hunks between revisions (one revision: against the worktree)."""
+        pathspec = ["--", *paths] if paths else []
+        statuses = self._run_git("diff", "--name-status", "-z", "-M", *revisions, *pathspec)
+        events: "OrderedDict[str, ChangeEvent]" = OrderedDict()
+        fields = statuses.split("\0")
+        i = 0
+        while i < len(fields) and fields[i]:
+            code = fields[i][0]
+            if code in "RC":
+                old_path, path = fields[i + 1], fields[i + 2]
+                i += 3
+            else:
+                old_path, path = None, fields[i + 1]
+                i += 2
+            status = {"A": "added", "D": "deleted", "R": "renamed", "C": "added"}.get(
+                code, "modified")
+            events[path] = ChangeEvent(path, status, source, [], commit,
+                                       old_path if code == "R" else None)
+
+        patch = self._run_git("diff", "-U0", "--no-color", "--no-ext-diff", "-M",
+                              *revisions, *pathspec)
+        current = None
+        for line in patch.splitlines():
+            if line.startswith("+++ "):
+                target = line[4:]
+                current = events.get(target[2:]) if target.startswith("b/") else None
+            elif line.startswith("@@") and current is not None:
+                match = _HUNK.match(line)
+                if match:
+                    start = int(match.group(1))
+                    count = int(match.group(2)) if match.group(2) is not None else 1
+                    current.hunks.append((start, count))
+        for event in events.values():
+            if event.status in ("added", "deleted") or not event.hunks:
+                event.hunks = None
+        return list(events.values())
+
+    def _worktree_changes(self) -> List[ChangeEvent]:
+        """Dirty files whose state changed since the last poll."""
+        output = self._run_git("status", "--porcelain=v1", "-z", "--untracked-files=all")
+        dirty: Dict[str, Fingerprint] = {}
+        fields = output.split("\0")
+        i = 0
+        while i < len(fields) and fields[i]:
+            code, path = fields[i][:2], fields[i][3:]
+            # Renames are followed by the old path
+            i += 2 if code[0] in "RC" else 1
+            try:
+                stat = os.stat(os.path.join(self.repo_path, path))
+                dirty[path] = (code, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                dirty[path] = (code, -1, 0)
+
+        previous = self._dirty
+        self._dirty = dirty
+        if previous is None:
+            # Baseline: subscribers start with a full pass anyway
+            return []
+
+        changed = [p for p in dirty if previous.get(p) != dirty[p]]
+        # Files that became clean again (reverted, or committed and reported above)
+        cleaned = [p for p in previous if p not in dirty]
+
+        events = []
+        untracked = [p for p in changed if dirty[p][0] == "??"]
+        tracked = [p for p in changed if dirty[p][0] != "??"]
+        events.extend(ChangeEvent(p, "added", "worktree") for p in untracked)
+        if tracked:
+            found = {e.path: e for e in self._diff(["HEAD"], "worktree", None, tracked)}
+            events.extend(found.get(p) or ChangeEvent(p, "modified", "worktree") for p in tracked)
+        events.extend(ChangeEvent(p, "modified", "worktree") for p in cleaned)
+        return events
+
+    def _load_state(self) -> Optional[str]:
+        """Read the last processed commit."""
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("head")
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self):
+        """Atomically save the last processed commit."""
+        if not self.state_path:
+            return
+        tmp = f"{self.state_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"head": self._head}, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            logger.warning("Cannot save change feed state %s: %s", self.state_path, e)
@@ -0,0 +1,257 @@
+"""Split Python source into function, class and module-level units for analysis."""
+
+import ast
+import hashlib
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+# Rough characters per token for source code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the prompt tokens for a piece of text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count (at least 1)
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class CodeUnit:
+    """One function, class or block of module-level statements."""
+
+    path: str
+    name: str
+    kind: str
+    start_line: int
+    end_line: int
+    source: str
+    dependencies: List[str] = field(default_factory=list)
+
+    @property
+    def hash(self) -> str:
+        """Content hash of the unit (independent of where it sits in the file)."""
+        return hashlib.sha1(f"{self.kind}\0{self.name}\0{self.source}".encode("utf-8")).hexdigest()
+
+    @property
+    def tokens(self) -> int:
+        """Estimated prompt tokens."""
+        return estimate_tokens(self.source)
+
+    @property
+    def label(self) -> str:
+        """Location used in prompts and logs, e.g. ``pkg/mod.py:10-42 parse``."""
+        return f"{self.path}:{self.start_line}-{self.end_line} {self.name}"
+
+
+def _start_line(node: ast.AST) -> int:
+    """First line of a statement, including decorators."""
+    decorators = getattr(node, "decorator_list", None) or []
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def _defined_names(node: ast.stmt) -> Set[str]:
+    """Names a top-level statement binds in the module namespace."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return {(alias.asname or alias.name).split(".")[0] for alias in node.names}
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+            names.add(child.id)
+    return names
+
+
+def _used_names(nodes: Iterable[ast.AST]) -> Set[str]:
+    """Names read anywhere inside the given nodes."""
+    used = set()
+    for node in nodes:
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+                used.add(child.id)
+    return used
+
+
+class PythonChunker:
+    """
+    Split a module into analysis units using its AST.
+
+    Top-level functions and classes become one unit each; consecutive
+    module-level statements (imports, constants, ...) are grouped into one
+    block. A class over the token limit is split into its header and one unit
+    per method, and any unit still over the limit is split into line windows.
+    Each unit lists the module-level names it depends on, so the prompt can
+    say what it uses without including that code.
+    """
+
+    def __init__(self, max_tokens: int = 1500):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_tokens: Largest unit, in estimated tokens
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        self.max_tokens = max_tokens
+
+    def chunk(self, source: str, path: str = "<string>") -> List[CodeUnit]:
+        """
+        Split source into units.
+
+        Args:
+            source: Python source
+            path: File path recorded on the units
+
+        Returns:
+            Units in file order (a file that does not parse is one module unit)
+        """
+        lines = source.splitlines(keepends=True)
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            return self._split(CodeUnit(path, "<module>", "module", 1, len(lines), source))
+
+        module_names: Set[str] = set()
+        for node in tree.body:
+            module_names |= _defined_names(node)
+
+        units: List[CodeUnit] = []
+        block: List[ast.stmt] = []
+
+        def flush_block():
+            if block:
+                start, end = _start_line(block[0]), block[-1].end_lineno
+                units.append(self._unit(path, f"<module:{start}>", "module", start, end,
+                                        lines, block, module_names))
+                block.clear()
+
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                flush_block()
+                units.append(self._unit(path, node.name, "function", _start_line(node),
+                                        node.end_lineno, lines, [node], module_names))
+            elif isinstance(node, ast.ClassDef):
+                flush_block()
+                units.extend(self._class_units(path, node, lines, module_names))
+            else:
+                block.append(node)
+        flush_block()
+
+        result = []
+        for unit in units:
+            result.extend(self._split(unit))
+        return result
+
+    def _unit(self, path: str, name: str, kind: str, start: int, end: int, lines: List[str],
+              nodes: List[ast.AST], module_names: Set[str]) -> CodeUnit:
+        """Build a unit from a line range and the nodes it covers."""
+        own = set()
+        for node in nodes:
+            if isinstance(node, ast.stmt):
+                own |= _defined_names(node)
+        dependencies = sorted((_used_names(nodes) & module_names) - own)
+        return CodeUnit(path, name, kind, start, end, "".join(lines[start - 1:end]),
+                        dependencies)
+
+    def _class_units(self, path: str, node: ast.ClassDef, lines: List[str],
+                     module_names: Set[str]) -> List[CodeUnit]:
+        """One unit for a small class; header plus methods for a large one."""
+        start = _start_line(node)
+        whole = self._unit(path, node.name, "class", start, node.end_lineno, lines, [node],
+                           module_names)
+        methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        if whole.tokens <= self.max_tokens or not methods:
+            return [whole]
+
+        header_end = _start_line(methods[0]) - 1
+        others = [n for n in node.body if n not in methods]
+        units = [self._unit(path, node.name, "class", start, header_end, lines,
+                            node.bases + node.decorator_list + others, module_names)]
+        for method in methods:
+            units.append(self._unit(path, f"{node.name}.{method.name}", "method",
+                                    _start_line(method), method.end_lineno, lines, [method],
+                                    module_names))
+        return units
+
+    def _split(self, unit: CodeUnit) -> List[CodeUnit]:
+        """Split a unit over the token limit into line windows."""
+        if unit.tokens <= self.max_tokens:
+            return [unit]
+
+        budget = self.max_tokens * CHARS_PER_TOKEN
+        parts: List[List[str]] = [[]]
+        size = 0
+        for line in unit.source.splitlines(keepends=True):
+            if parts[-1] and size + len(line) > budget:
+                parts.append([])
+                size = 0
+            # A single line longer than the budget is truncated
+            parts[-1].append(line[:budget])
+            size += len(line[:budget])
+
+        units = []
+        line_no = unit.start_line
+        for i, part in enumerate(parts, 1):
+            units.append(CodeUnit(
+                unit.path, f"{unit.name} (part {i}/{len(parts)})", unit.kind, line_no,
+                line_no + len(part) - 1, "".join(part), unit.dependencies,
+            ))
+            line_no += len(part)
+        return units
+
+
+def pack_units(units: List[CodeUnit], token_budget: int,
+               overhead: int = 20) -> List[List[CodeUnit]]:
+    """
+    Group units into prompts of at most ``token_budget`` tokens, keeping order.
+
+    Args:
+        units: Units to pack
+        token_budget: Token limit per prompt
+        overhead: Tokens counted per unit for its heading
+
+    Returns:
+        Batches of units (a unit larger than the budget gets a batch of its own)
+    """
+    batches: List[List[CodeUnit]] = []
+    current: List[CodeUnit] = []
+    used = 0
+    for unit in units:
+        cost = unit.tokens + overhead
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(unit)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_units(units: List[CodeUnit], header: Optional[str] = None) -> str:
+    """
+    Render units as a prompt.
+
+    Args:
+        units: Units to include
+        header: Instruction placed before the code
+
+    Returns:
+        Prompt text with one fenced section per unit
+    """
+    sections = [header] if header else []
+    for unit in units:
+        section = f"### {unit.label} ({unit.kind})\n"
+        if unit.dependencies:
+            section += f"Uses: {', '.join(unit.dependencies)}\n"
+        section += f"```python\n{unit.source.rstrip()}\n```"
+        sections.append(section)
+    return "\n\n".join(sections)
@@ -1,10 +1,24 @@
 """Continuous agent runner for autonomous operation."""
 
+import logging
 import time
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Union
 import threading
 from datetime import datetime
 from .core.agent import Agent
+from .core.deadline import Deadline
+from .callback_dispatcher import CallbackDispatcher
+from .admission import AdmissionController, ADMISSION_BLOCK, ADMISSION_REJECT
+from .agent_journal import AgentJournal
+from .scheduler import (
+    TaskScheduler,
+    check_priority_class,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    PRIORITY_BACKGROUND,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class ContinuousAgent:
@@ -16,6 +30,11 @@ class ContinuousAgent:
         task_queue: Optional[List[str]] = None,
         interval: int = 60,
         max_iterations: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        admission_policy: str = ADMISSION_REJECT,
+        max_queue_wait: Optional[float] = None,
+        scheduler: Optional[TaskScheduler] = None,
+        journal: Optional[AgentJournal] = None,
     ):
         """
         Initialize continuous agent.
@@ -25,25 +44,196 @@ class ContinuousAgent:
             task_queue: List of tasks to execute (FIFO queue)
             interval: Time between task checks in seconds
             max_iterations: Maximum iterations before stopping (None for infinite)
+            max_queue_depth: Maximum pending tasks (None for unlimited)
+            admission_policy: "reject" or "block" when the queue is full
+            max_queue_wait: Shed new normal and background tasks while the
+                queue wait in seconds exceeds this value (None disables shedding)
+            scheduler: Task scheduler to use (defaults to a new TaskScheduler)
+            journal: Durable log that submitted tasks and results are written
+                to; its pending tasks and history are restored on creation
         """
         self.agent = agent
-        self.task_queue = task_queue or []
+        self.scheduler = scheduler or TaskScheduler()
+        self.journal = journal
+        self._in_flight_key = None
+        self._in_flight_deadline: Optional[Deadline] = None
+        self._in_flight_class = PRIORITY_NORMAL
+        self._queue_cond = threading.Condition()
+        self._wakeup = threading.Event()
+        self.admission = AdmissionController(
+            max_queue_depth=max_queue_depth,
+            policy=admission_policy,
+            max_queue_wait=max_queue_wait,
+        )
         self.interval = interval
         self.max_iterations = max_iterations
         self.is_running = False
         self.iteration_count = 0
         self.results_history: List[Dict[str, Any]] = []
+        self.expired_count = 0
+        # When the task now executing started (None while idle)
+        self._busy_since: Optional[float] = None
         self._thread: Optional[threading.Thread] = None
         self.on_result_callback: Optional[Callable[[str, str], None]] = None
 
-    def add_task(self, task: str):
+        if journal is not None:
+            self._restore(journal)
+        for task in task_queue or []:
+            self._push(task, PRIORITY_NORMAL, "default", None)
+
+    def _restore(self, journal: AgentJournal):
+        """Reload queued tasks and history from the journal."""
+        state = journal.recover()
+        self.results_history = state.history
+        self.iteration_count = state.iteration_count
+        # Tasks interrupted by the restart go first
+        for entry in sorted(state.pending, key=lambda t: not t["requeued"]):
+            try:
+                self._check_task(entry["priority"], entry["tenant"])
+                deadline = entry.get("deadline")
+                deadline = None if deadline is None else Deadline.at(deadline)
+            except (KeyError, TypeError, ValueError) as e:
+                # A bad entry must not stop the agent from ever starting again
+                logger.warning("Dropping unrestorable journal entry %s: %s", entry.get("id"), e)
+                failed = {
+                    "timestamp": datetime.now().isoformat(),
+                    "task": entry.get("task"),
+                    "error": f"Dropped on restore: {e}",
+                    "iteration": self.iteration_count,
+                }
+                self.results_history.append(failed)
+                journal.done(entry["id"], failed, self.iteration_count)
+                continue
+            self.scheduler.push(
+                entry["task"], priority_class=entry["priority"], flow=entry["tenant"],
+                key=entry["id"], deadline=deadline,
+            )
+
+    @staticmethod
+    def _check_task(priority: str, tenant: str):
+        """Reject a task the scheduler could not queue."""
+        check_priority_class(priority)
+        if not isinstance(tenant, str):
+            raise TypeError(f"Tenant must be a string, not {type(tenant).__name__}")
+
+    def _push(self, task: str, priority: str, tenant: str, deadline: Optional[Deadline]):
+        """Queue a submitted task, journaling it first when durable."""
+        # Validate before journaling, or a bad task would fail every restart
+        self._check_task(priority, tenant)
+        key = None
+        if self.journal:
+            key = self.journal.add(task, priority, tenant, deadline and deadline.epoch)
+        self.scheduler.push(task, priority_class=priority, flow=tenant, key=key,
+                            deadline=deadline)
+
+    @property
+    def task_queue(self) -> List[str]:
+        """Pending tasks in dispatch order."""
+        return [entry.task for entry in self.scheduler.pending()]
+
+    def add_task(
+        self,
+        task: str,
+        timeout: Optional[float] = None,
+        priority: str = PRIORITY_NORMAL,
+        tenant: str = "default",
+        deadline: Union[float, Deadline, None] = None,
+    ) -> bool:
         """
-        Add a task to the queue.
+        Add a task to the queue, subject to admission control.
 
         Args:
             task: Task description to add
+            timeout: Maximum seconds to wait for space under the "block" policy
+                (defaults to the controller's block_timeout)
+            priority: "interactive", "normal" or "background"
+            tenant: Flow used for fair sharing between submitters
+            deadline: Seconds the result is wanted for, or a Deadline the
+                caller can cancel; the task is skipped if it expires while
+                queued and its provider request is cut off when it passes
+
+        Returns:
+            True once the task is queued
+
+        Raises:
+            QueueFullError: If the queue is full or shedding load
         """
-        self.task_queue.append(task)
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+
+        with self._queue_cond:
+            depth = len(self.scheduler)
+            if self.admission.is_overloaded(depth, self.scheduler.oldest_wait(), priority):
+                self.admission.reject(depth, overloaded=True)
+
+            if self.admission.is_full(depth):
+                if self.admission.policy != ADMISSION_BLOCK or not self._wait_for_space(timeout):
+                    self.admission.reject(len(self.scheduler))
+
+            self._push(task, priority, tenant, deadline)
+            self.admission.record_admitted()
+
+        # Interactive work should not wait out the polling interval
+        if priority == PRIORITY_INTERACTIVE:
+            self._notify_worker()
+        return True
+
+    def _notify_worker(self):
+        """Wake the run loop before its interval elapses."""
+        self._wakeup.set()
+
+    def _wait_for_space(self, timeout: Optional[float]) -> bool:
+        """Block until the queue has room. Caller must hold the queue condition."""
+        if timeout is None:
+            timeout = self.admission.block_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.admission.is_full(len(self.scheduler)):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._queue_cond.wait(remaining)
+        return True
+
+    def _pop_task(self) -> Optional[str]:
+        """Take the next unexpired task and record how long it waited."""
+        with self._queue_cond:
+            while True:
+                entry = self.scheduler.pop()
+                if entry is None:
+                    return None
+                self.admission.record_wait(entry.wait_time)
+                self._queue_cond.notify_all()
+                # Generated busywork is not journaled and has an automatic key
+                key = entry.key if isinstance(entry.key, str) else None
+                if entry.deadline is not None and entry.deadline.expired:
+                    self._skip_expired(entry.task, key)
+                    continue
+
+                self._in_flight_key = key
+                self._in_flight_deadline = entry.deadline
+                self._in_flight_class = entry.priority_class
+                if self.journal and key:
+                    self.journal.start(key)
+                return entry.task
+
+    def _skip_expired(self, task: str, key: Optional[str]):
+        """Drop a task whose deadline passed while it was queued."""
+        self.expired_count += 1
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "task": task,
+            "error": "Skipped: deadline exceeded before the task started",
+            "iteration": self.iteration_count,
+        }
+        self.results_history.append(entry)
+        if self.journal and key:
+            self.journal.done(key, entry, self.iteration_count)
+
+    def _execute(self, task: str) -> str:
+        """Run the task just popped, passing its deadline to the agent."""
+        if self._in_flight_deadline is None:
+            return self.agent.execute(task)
+        return self.agent.execute(task, deadline=self._in_flight_deadline)
 
     def start(self):
         """Start the continuous agent in a background thread."""
@@ -57,6 +247,7 @@ class ContinuousAgent:
     def stop(self):
         """Stop the continuous agent."""
         self.is_running = False
+        self._wakeup.set()
         if self._thread:
             self._thread.join(timeout=5)
 
@@ -68,43 +259,64 @@ class ContinuousAgent:
                 self.is_running = False
                 break
 
-            # ALWAYS add a new task to keep agent continuously busy (never idle)
-            self._generate_task()
+            # Keep the agent busy with generated work only when nothing is queued
+            if len(self.scheduler):
+                self.admission.record_suppressed()
+            else:
+                self._generate_task()
 
             # Process tasks from queue
-            if self.task_queue:
-                task = self.task_queue.pop(0)
+            task = self._pop_task()
+            if task is not None:
+                self._busy_since = time.monotonic()
                 try:
-                    result = self.agent.execute(task)
-
-                    # Store result
-                    self.results_history.append(
-                        {
-                            "timestamp": datetime.now().isoformat(),
-                            "task": task,
-                            "result": result,
-                            "iteration": self.iteration_count,
-                        }
-                    )
-
-                    # Call callback if set
+                    result = self._execute(task)
+                    self._record_result(task, result)
+
+                    # Call callback if set (a CallbackDispatcher only enqueues here)
                     if self.on_result_callback:
                         self.on_result_callback(task, result)
 
                 except Exception as e:
-                    self.results_history.append(
-                        {
-                            "timestamp": datetime.now().isoformat(),
-                            "task": task,
-                            "error": str(e),
-                            "iteration": self.iteration_count,
-                        }
-                    )
+                    self._record_error(task, e)
 
+                self._busy_since = None
                 self.iteration_count += 1
 
-            # Minimal wait before next iteration (always busy)
-            time.sleep(self.interval)
+            # Minimal wait before next iteration (always busy); interactive
+            # submissions cut the wait short
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def _record_result(self, task: str, result: str):
+        """Store a successful result in the history."""
+        self._record(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "task": task,
+                "result": result,
+                "iteration": self.iteration_count,
+            }
+        )
+
+    def _record_error(self, task: str, error: Exception):
+        """Store a failed task in the history."""
+        self._record(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "task": task,
+                "error": str(error),
+                "iteration": self.iteration_count,
+            }
+        )
+
+    def _record(self, entry: Dict[str, Any]):
+        """Append a history entry and journal the task as finished."""
+        self.results_history.append(entry)
+        if self.journal and self._in_flight_key:
+            self.journal.done(self._in_flight_key, entry, self.iteration_count + 1)
+        self._in_flight_key = None
+        self._in_flight_deadline = None
 
     def _generate_task(self):
         """Generate a new task based on agent type to keep it busy."""
@@ -146,7 +358,14 @@ class ContinuousAgent:
         import random
 
         task = random.choice(tasks)
-        self.task_queue.append(task)
+        with self._queue_cond:
+            self.scheduler.push(task, priority_class=PRIORITY_BACKGROUND)
+
+    @property
+    def busy_for(self) -> float:
+        """Seconds the current task has been executing (0.0 while idle)."""
+        busy_since = self._busy_since
+        return 0.0 if busy_since is None else round(time.monotonic() - busy_since, 1)
 
     def get_results(self) -> List[Dict[str, Any]]:
         """
@@ -164,12 +383,22 @@ class ContinuousAgent:
         Returns:
             Status dictionary
         """
-        return {
+        status = {
             "agent_name": self.agent.config.name,
             "is_running": self.is_running,
             "iteration_count": self.iteration_count,
-            "tasks_pending": len(self.task_queue),
+            "tasks_pending": len(self.scheduler),
             "results_count": len(self.results_history),
+            "tasks_expired": self.expired_count,
+            "busy_for": self.busy_for,
             "max_iterations": self.max_iterations,
             "interval": self.interval,
+            "admission": self.admission.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
         }
+
+        # Report outbox state when results are delivered asynchronously
+        if isinstance(self.on_result_callback, CallbackDispatcher):
+            status["callback_dispatcher"] = self.on_result_callback.get_stats()
+
+        return status
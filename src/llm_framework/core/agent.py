@@ -3,6 +3,7 @@
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field
 from .base_provider import BaseProvider
+from .deadline import Deadline, DeadlineExceeded
 
 
 @dataclass
@@ -32,27 +33,48 @@ class Agent:
         self.provider = provider
         self.conversation_history: List[Dict[str, str]] = []
 
-    def execute(self, task: str, context: Optional[Dict[str, Any]] = None) -> str:
+    def execute(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
         """
         Execute a task autonomously.
 
         Args:
             task: The task description
             context: Optional context information
+            deadline: Deadline for the task; bounds the provider request timeout
 
         Returns:
             The result of the task execution
+
+        Raises:
+            DeadlineExceeded: If the deadline passes before or during generation
         """
-        if not self.provider.is_available():
+        if deadline is None:
+            available = self.provider.is_available()
+        else:
+            deadline.check()
+            # The health check is a request of its own and must not outlive the task
+            available = self.provider.is_available(deadline=deadline)
+            deadline.check()
+
+        if not available:
             raise RuntimeError(f"Provider {self.provider.get_provider_name()} is not available")
 
         # Build the full prompt
         full_prompt = self._build_prompt(task, context)
 
         # Generate response
+        params = dict(self.config.additional_params)
+        if deadline is not None:
+            params["deadline"] = deadline
+
         try:
             response = self.provider.generate(
-                full_prompt, temperature=self.config.temperature, **self.config.additional_params
+                full_prompt, temperature=self.config.temperature, **params
             )
 
             # Store in conversation history
@@ -60,6 +82,8 @@ class Agent:
             self.conversation_history.append({"role": "assistant", "content": response})
 
             return response
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error executing task: {str(e)}") from e
 
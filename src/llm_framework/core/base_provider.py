@@ -3,6 +3,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from .deadline import Deadline
+
 
 class BaseProvider(ABC):
     """Abstract base class for LLM providers."""
@@ -32,10 +34,14 @@ class BaseProvider(ABC):
         """
 
     @abstractmethod
-    def is_available(self) -> bool:
+    def is_available(self, deadline: Optional[Deadline] = None) -> bool:
         """
         Check if the provider is available and configured correctly.
 
+        Args:
+            deadline: Deadline of the task about to run; a network check
+                must not wait past it
+
         Returns:
             True if the provider is available, False otherwise
         """
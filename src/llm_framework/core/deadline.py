@@ -0,0 +1,129 @@
+"""Deadlines and cancellation for task execution."""
+
+import threading
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when a task's deadline passes or it is cancelled."""
+
+
+class Deadline:
+    """
+    Point in time after which a task's result is no longer wanted.
+
+    A deadline is created at submission and handed down through
+    ``Agent.execute`` to the provider, which bounds the timeouts of its
+    health check and its HTTP request by the time remaining. ``cancel``
+    expires it early, e.g. when the caller gives up: the task is skipped if it
+    has not started, and no further request is sent for it. A request already
+    in flight is not interrupted; it ends at its timeout, which was capped by
+    the time remaining when it was sent.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Create a deadline.
+
+        Args:
+            timeout: Seconds from now (None never expires, but can be cancelled)
+        """
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def at(cls, epoch: float) -> "Deadline":
+        """
+        Create a deadline at a wall-clock time (e.g. one persisted across restarts).
+
+        Args:
+            epoch: Expiry as seconds since the epoch
+
+        Returns:
+            The deadline
+        """
+        return cls(epoch - time.time())
+
+    @property
+    def epoch(self) -> Optional[float]:
+        """Expiry as seconds since the epoch (None if it never expires)."""
+        remaining = self.remaining()
+        return None if remaining is None else time.time() + remaining
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left before expiry.
+
+        Returns:
+            Remaining seconds (0.0 once expired or cancelled, None if unbounded)
+        """
+        if self._cancelled.is_set():
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """True once the deadline has passed or was cancelled."""
+        return self.remaining() == 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        """True if ``cancel`` was called."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Expire the deadline now."""
+        self._cancelled.set()
+
+    def check(self):
+        """
+        Raise if the deadline has passed.
+
+        Raises:
+            DeadlineExceeded: If expired or cancelled
+        """
+        if self.cancelled:
+            raise DeadlineExceeded("Task was cancelled")
+        if self.expired:
+            raise DeadlineExceeded("Task deadline exceeded")
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """
+        Timeout for a blocking call: the default capped by the time remaining.
+
+        Args:
+            default: Timeout used when the deadline is further away (None is unbounded)
+
+        Returns:
+            Seconds to wait
+
+        Raises:
+            DeadlineExceeded: If no time remains
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+
+def request_timeout(deadline: Optional[Deadline], default: Optional[float]) -> Optional[float]:
+    """
+    Timeout for a provider request, bounded by the task's deadline if it has one.
+
+    Args:
+        deadline: Deadline of the task being executed, if any
+        default: Provider's own timeout
+
+    Returns:
+        Seconds to wait
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    if deadline is None:
+        return default
+    return deadline.timeout(default)
@@ -0,0 +1,220 @@
+"""Docstring coverage index for a repository, computed with ast in a process pool."""
+
+import ast
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .repo_index import RepoIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MissingDocstring:
+    """A module, class or function without a docstring."""
+
+    path: str
+    symbol: str
+    kind: str
+    start_line: int
+    end_line: int
+    hash: str
+
+
+@dataclass(frozen=True)
+class FileCoverage:
+    """Docstring coverage of one file at one content hash."""
+
+    hash: str
+    symbols: int
+    missing: Tuple[MissingDocstring, ...]
+
+
+def scan_docstrings(path: str, rel_path: str,
+                    include_private: bool = False) -> Tuple[int, List[MissingDocstring]]:
+    """
+    Find the symbols of a Python file that lack a docstring.
+
+    Runs in worker processes, so it only takes and returns picklable values.
+
+    Args:
+        path: File to parse
+        rel_path: Path recorded on the results
+        include_private: Also check names starting with an underscore
+
+    Returns:
+        Number of symbols checked and the undocumented ones (a file that cannot
+        be read or parsed has none)
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        tree = ast.parse(source)
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+        return 0, []
+
+    lines = source.splitlines(keepends=True)
+    missing: List[MissingDocstring] = []
+    symbols = 0
+
+    def check(node, symbol: str, kind: str, start: int, end: int):
+        nonlocal symbols
+        symbols += 1
+        if ast.get_docstring(node, clean=False) is None:
+            # Keyed by the symbol's own source, so edits elsewhere keep its key
+            text = "".join(lines[start - 1:end])
+            digest = hashlib.sha1(f"{kind}\0{symbol}\0{text}".encode("utf-8")).hexdigest()
+            missing.append(MissingDocstring(rel_path, symbol, kind, start, end, digest))
+
+    def visit(body, prefix: str):
+        for node in body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if node.name.startswith("_") and not include_private:
+                continue
+            symbol = f"{prefix}{node.name}"
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            if isinstance(node, ast.ClassDef):
+                check(node, symbol, "class", start, node.end_lineno)
+                visit(node.body, f"{symbol}.")
+            else:
+                check(node, symbol, "function", start, node.end_lineno)
+
+    if tree.body:
+        check(tree, "<module>", "module", 1, len(lines))
+    visit(tree.body, "")
+    return symbols, missing
+
+
+class DocCoverageIndex:
+    """
+    Which modules, classes and functions of a repository lack docstrings.
+
+    Built on a ``RepoIndex``: on refresh only files whose content hash changed
+    are parsed again. Batches of at least ``parallel_threshold`` files are
+    parsed in a process pool (ast parsing is CPU-bound); smaller ones, the
+    usual case after the first scan, are parsed in-process.
+    """
+
+    def __init__(
+        self,
+        index: RepoIndex,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 8,
+        include_private: bool = False,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Initialize the coverage index (files are parsed on the first refresh).
+
+        Args:
+            index: Repository file index
+            max_workers: Worker processes (None for the CPU count)
+            parallel_threshold: Minimum changed files to use the process pool
+            include_private: Also check names starting with an underscore
+            start_method: multiprocessing start method (None for the platform default)
+        """
+        self.index = index
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+        self.include_private = include_private
+        self.start_method = start_method
+
+        self._lock = threading.Lock()
+        self._files: Dict[str, FileCoverage] = {}
+        self._executor: Optional[Executor] = None
+        self.parsed = 0
+
+    def refresh(self) -> int:
+        """
+        Re-parse files added or changed since the last refresh.
+
+        Returns:
+            Number of files parsed
+        """
+        with self._lock:
+            entries = self.index.files(".py")
+            current = {e.rel_path for e in entries}
+            for rel_path in list(self._files):
+                if rel_path not in current:
+                    del self._files[rel_path]
+
+            changed = [e for e in entries
+                       if e.rel_path not in self._files or self._files[e.rel_path].hash != e.hash]
+            if not changed:
+                return 0
+
+            args = [(e.path, e.rel_path, self.include_private) for e in changed]
+            if len(changed) >= self.parallel_threshold:
+                workers = self.max_workers or os.cpu_count() or 1
+                chunksize = max(1, len(args) // (4 * workers))
+                results = self._get_executor().map(scan_docstrings, *zip(*args),
+                                                   chunksize=chunksize)
+            else:
+                results = (scan_docstrings(*a) for a in args)
+
+            for entry, (symbols, missing) in zip(changed, results):
+                self._files[entry.rel_path] = FileCoverage(entry.hash, symbols, tuple(missing))
+            self.parsed += len(changed)
+            logger.debug("Docstring coverage: parsed %d files", len(changed))
+            return len(changed)
+
+    def missing(self, path: Optional[str] = None) -> List[MissingDocstring]:
+        """
+        List undocumented symbols, refreshing first.
+
+        Args:
+            path: Only symbols of this repository-relative file
+
+        Returns:
+            Symbols ordered by file and line
+        """
+        self.refresh()
+        with self._lock:
+            if path is None:
+                files = [self._files[p] for p in sorted(self._files)]
+            else:
+                files = [self._files[path]] if path in self._files else []
+            return [m for f in files for m in f.missing]
+
+    def coverage(self) -> Dict[str, float]:
+        """
+        Summarise coverage, refreshing first.
+
+        Returns:
+            Symbols checked, how many are documented and the documented ratio
+        """
+        self.refresh()
+        with self._lock:
+            symbols = sum(f.symbols for f in self._files.values())
+            undocumented = sum(len(f.missing) for f in self._files.values())
+            files = len(self._files)
+        documented = symbols - undocumented
+        return {
+            "files": files,
+            "symbols": symbols,
+            "documented": documented,
+            "ratio": documented / symbols if symbols else 1.0,
+        }
+
+    def close(self):
+        """Shut down the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _get_executor(self) -> Executor:
+        """Start the process pool on first use. Caller must hold the lock."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+        return self._executor
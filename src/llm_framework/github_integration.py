@@ -1,14 +1,20 @@
 """GitHub integration for agents to communicate with Copilot."""
 
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import requests
 
 
 class GitHubIntegration:
     """Integration with GitHub for agent communication."""
 
-    def __init__(self, repo_owner: str, repo_name: str, token: Optional[str] = None):
+    def __init__(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        token: Optional[str] = None,
+        timeout: float = 10.0,
+    ):
         """
         Initialize GitHub integration.
 
@@ -16,11 +22,13 @@ class GitHubIntegration:
             repo_owner: Repository owner username
             repo_name: Repository name
             token: GitHub personal access token (or use GITHUB_TOKEN env var)
+            timeout: Seconds to wait for each GitHub API request
         """
         self.repo_owner = repo_owner
         self.repo_name = repo_name
         self.token = token or os.getenv("GITHUB_TOKEN")
         self.base_url = "https://api.github.com"
+        self.timeout = timeout
 
     def create_issue(
         self, title: str, body: str, labels: Optional[list] = None
@@ -51,7 +59,7 @@ class GitHubIntegration:
             data["labels"] = labels
 
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -83,7 +91,7 @@ class GitHubIntegration:
         data = {"body": comment}
 
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -146,7 +154,7 @@ class GitHubIntegration:
         data = {"title": title, "body": body, "head": head, "base": base, "draft": draft}
 
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -172,7 +180,7 @@ class GitHubIntegration:
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = requests.get(url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -215,7 +223,7 @@ class GitHubIntegration:
             data["comments"] = comments
 
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -244,7 +252,7 @@ class GitHubIntegration:
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = requests.get(url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -289,7 +297,7 @@ class GitHubIntegration:
             data["commit_message"] = commit_message
 
         try:
-            response = requests.put(url, headers=headers, json=data, timeout=10)
+            response = requests.put(url, headers=headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -318,7 +326,7 @@ class GitHubIntegration:
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = requests.get(url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -347,7 +355,7 @@ class GitHubIntegration:
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = requests.get(url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException:
@@ -375,6 +383,9 @@ class AgentGitHubBridge:
         Args:
             task: The task that was executed
             result: The result from the agent
+
+        Returns:
+            Issue or comment data if successful, None otherwise
         """
         # Format the message
         prompt = (
@@ -386,4 +397,40 @@ class AgentGitHubBridge:
 
         # Send to GitHub
         agent_name = "Autonomous Agent"
-        self.github.send_copilot_prompt(prompt, agent_name, self.issue_number)
+        return self.github.send_copilot_prompt(prompt, agent_name, self.issue_number)
+
+    def deliver_batch(self, items: List[Tuple[str, str]]):
+        """
+        Send several agent results to Copilot as a single message.
+
+        Used by ``CallbackDispatcher`` so a batch of results costs one GitHub
+        request instead of one per result.
+
+        Args:
+            items: List of (task, result) pairs
+
+        Raises:
+            RuntimeError: If GitHub did not accept the message
+        """
+        if len(items) == 1:
+            response = self(*items[0])
+        else:
+            response = self._send_batch(items)
+
+        if response is None and self.github.token:
+            raise RuntimeError("GitHub did not accept the agent results")
+
+    def _send_batch(self, items: List[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        """Format several results into one Copilot prompt and send it."""
+        sections = [
+            f"### Task {i}\n\n**Task:** {task}\n\n**Result:** {result}"
+            for i, (task, result) in enumerate(items, 1)
+        ]
+        prompt = (
+            f"{len(items)} tasks completed:\n\n"
+            + "\n\n".join(sections)
+            + "\n\nPlease review and provide feedback or next steps."
+        )
+
+        agent_name = "Autonomous Agent"
+        return self.github.send_copilot_prompt(prompt, agent_name, self.issue_number)
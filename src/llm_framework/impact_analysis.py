@@ -0,0 +1,401 @@
+"""Test impact analysis: map changed modules to the tests that exercise them."""
+
+import ast
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .repo_index import RepoIndex
+
+logger = logging.getLogger(__name__)
+
+# pytest exit code when a file has no tests
+NO_TESTS_COLLECTED = 5
+
+
+def is_test_file(rel_path: str) -> bool:
+    """
+    Check whether a path follows pytest's default test file naming.
+
+    Args:
+        rel_path: Repository-relative path
+
+    Returns:
+        True for ``test_*.py`` and ``*_test.py`` files
+    """
+    name = rel_path.rsplit("/", 1)[-1]
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _module_names(rel_path: str, source_roots: Iterable[str]) -> List[str]:
+    """Dotted names a file can be imported as, one per source root it is under."""
+    names = []
+    for root in source_roots:
+        prefix = root.strip("/") + "/" if root else ""
+        if not rel_path.startswith(prefix) or not rel_path.endswith(".py"):
+            continue
+        parts = rel_path[len(prefix):-3].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        if parts:
+            names.append(".".join(parts))
+    return names
+
+
+def _imported_names(source: str, module_names: List[str], is_package: bool) -> Set[str]:
+    """
+    Names a module imports, anywhere including inside functions.
+
+    ``import a.b`` gives ``a.b``; ``from a import b`` gives ``a:b``.
+    """
+    tree = ast.parse(source)
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            bases = []
+            if node.level:
+                # Resolve relative imports against every name the file has
+                for name in module_names:
+                    package = name.split(".") if is_package else name.split(".")[:-1]
+                    if node.level - 1 <= len(package):
+                        package = package[:len(package) - (node.level - 1)]
+                        bases.append(".".join(package + ([node.module] if node.module else [])))
+            elif node.module:
+                bases.append(node.module)
+            for base in bases:
+                for alias in node.names:
+                    # "base:name", as name may be a submodule or an attribute of base
+                    imported.add(f"{base}:{alias.name}")
+    return imported
+
+
+class ImportGraph:
+    """
+    Static import graph of a repository's Python files.
+
+    Built on a ``RepoIndex``; a file is parsed again only when its content
+    hash changes. Every file is registered under its dotted name relative to
+    each of ``source_roots``, so ``src/pkg/mod.py`` resolves both as
+    ``src.pkg.mod`` and ``pkg.mod``.
+
+    Importing ``a.b.c`` also runs ``a/__init__.py`` and ``a/b/__init__.py``,
+    so a change to those affects it. That implicit edge is not followed any
+    further: a package ``__init__`` that imports all its submodules would
+    otherwise make every file depend on every other one.
+    """
+
+    def __init__(self, index: RepoIndex, source_roots: Iterable[str] = ("", "src")):
+        """
+        Initialize the graph (files are parsed on the first refresh).
+
+        Args:
+            index: Repository file index
+            source_roots: Directories on ``sys.path`` ('' for the repository root)
+        """
+        self.index = index
+        self.source_roots = tuple(source_roots)
+
+        self._lock = threading.RLock()
+        # rel_path -> (content hash, imported dotted names)
+        self._files: Dict[str, Tuple[str, Set[str]]] = {}
+        self._modules: Dict[str, str] = {}
+        self._deps: Dict[str, Set[str]] = {}
+        self._rdeps: Dict[str, Set[str]] = {}
+        # Importers that only depend on a package because they import below it
+        self._parent_rdeps: Dict[str, Set[str]] = {}
+        self.parsed = 0
+
+    def refresh(self) -> int:
+        """
+        Re-parse files added or changed since the last refresh.
+
+        Returns:
+            Number of files parsed
+        """
+        with self._lock:
+            entries = self.index.files(".py")
+            current = {e.rel_path: e for e in entries}
+            structure_changed = current.keys() != self._files.keys()
+            parsed = 0
+
+            files: Dict[str, Tuple[str, Set[str]]] = {}
+            for rel_path, entry in current.items():
+                old = self._files.get(rel_path)
+                if old is not None and old[0] == entry.hash:
+                    files[rel_path] = old
+                    continue
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        source = f.read()
+                    imports = _imported_names(
+                        source, _module_names(rel_path, self.source_roots),
+                        rel_path.endswith("__init__.py"),
+                    )
+                except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+                    imports = set()
+                files[rel_path] = (entry.hash, imports)
+                parsed += 1
+
+            self._files = files
+            if parsed or structure_changed:
+                self._rebuild()
+            self.parsed += parsed
+            return parsed
+
+    def dependencies(self, rel_path: str) -> Set[str]:
+        """
+        Files a file imports directly, refreshing first.
+
+        Args:
+            rel_path: Repository-relative path
+
+        Returns:
+            Repository-relative paths
+        """
+        self.refresh()
+        with self._lock:
+            return set(self._deps.get(rel_path, ()))
+
+    def dependents(self, rel_paths: Iterable[str]) -> Set[str]:
+        """
+        Files that import any of the given files, directly or transitively.
+
+        Args:
+            rel_paths: Repository-relative paths
+
+        Returns:
+            The given paths plus all files depending on them
+        """
+        self.refresh()
+        with self._lock:
+            found = set(rel_paths)
+            for path in list(found):
+                found |= self._parent_rdeps.get(path, set())
+            stack = list(found)
+            while stack:
+                for importer in self._rdeps.get(stack.pop(), ()):
+                    if importer not in found:
+                        found.add(importer)
+                        stack.append(importer)
+            return found
+
+    def _rebuild(self):
+        """Resolve imported names to files. Caller must hold the lock."""
+        self._modules = {}
+        for rel_path in self._files:
+            for name in _module_names(rel_path, self.source_roots):
+                self._modules[name] = rel_path
+
+        self._deps = {}
+        self._rdeps = {}
+        self._parent_rdeps = {}
+        for rel_path, (_, imports) in self._files.items():
+            explicit, parents = set(), set()
+            for name in imports:
+                base, _, attr = name.partition(":")
+                submodule = f"{base}.{attr}" if base else attr
+                if attr and submodule in self._modules:
+                    base = submodule
+                parts = base.split(".") if base else []
+                resolved = [self._modules.get(".".join(parts[:i])) for i in range(1, len(parts) + 1)]
+                resolved = [t for t in resolved if t is not None and t != rel_path]
+                if resolved:
+                    explicit.add(resolved[-1])
+                    parents.update(resolved[:-1])
+            parents -= explicit
+            self._deps[rel_path] = explicit | parents
+            for target in explicit:
+                self._rdeps.setdefault(target, set()).add(rel_path)
+            for target in parents:
+                self._parent_rdeps.setdefault(target, set()).add(rel_path)
+
+
+def load_coverage_map(db_path: str, repo_path: str) -> Dict[str, Set[str]]:
+    """
+    Read which test files executed each source file from coverage.py data.
+
+    Expects a ``.coverage`` database recorded with per-test contexts (e.g.
+    ``pytest --cov --cov-context=test``). It is read with sqlite3, so the
+    coverage package is not needed.
+
+    Args:
+        db_path: Path of the coverage database
+        repo_path: Repository root, to make paths relative
+
+    Returns:
+        Map of source file to test files, both repository-relative (empty if
+        the file is missing or has no contexts)
+    """
+    if not os.path.exists(db_path):
+        return {}
+    root = os.path.abspath(repo_path)
+    coverage: Dict[str, Set[str]] = {}
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT file.path, context.context FROM line_bits "
+                "JOIN file ON file.id = line_bits.file_id "
+                "JOIN context ON context.id = line_bits.context_id"
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Cannot read coverage data %s: %s", db_path, e)
+        return {}
+
+    for path, context in rows:
+        # pytest-cov contexts look like "tests/test_x.py::test_name|run"
+        test_file = context.split("::", 1)[0]
+        if not is_test_file(test_file):
+            continue
+        if os.path.isabs(path):
+            path = os.path.relpath(path, root)
+        coverage.setdefault(path.replace(os.sep, "/"), set()).add(test_file)
+    return coverage
+
+
+@dataclass
+class TestFileResult:
+    """Outcome of running one test file."""
+
+    __test__ = False
+
+    path: str
+    returncode: int
+    output: str
+    duration: float
+
+    @property
+    def passed(self) -> bool:
+        """True if every test passed (or the file has none)."""
+        return self.returncode in (0, NO_TESTS_COLLECTED)
+
+    def failures(self, limit: int = 3000) -> str:
+        """
+        Extract the failure tracebacks from the pytest output.
+
+        Timings and the summary line are left out, so the same failure gives
+        the same text on every run.
+
+        Args:
+            limit: Maximum characters returned
+
+        Returns:
+            The FAILURES/ERRORS sections (or the whole output if there are none)
+        """
+        lines = self.output.splitlines()
+        start = next((i for i, line in enumerate(lines)
+                      if line.startswith("=") and ("FAILURES" in line or "ERRORS" in line)), 0)
+        end = next((i for i, line in enumerate(lines)
+                    if i > start and line.startswith("=") and "short test summary" in line),
+                   len(lines))
+        text = "\n".join(lines[start:end]).strip()
+        return text[:limit]
+
+
+class ImpactAnalyzer:
+    """
+    Select and run the tests affected by a change.
+
+    A test file is affected when it changed, or when it imports a changed
+    file directly or transitively. Coverage data, when given, adds tests
+    that exercise a file without importing it (e.g. through a subprocess or
+    plugin). Affected files run in parallel, one pytest process each, so the
+    work grows with the size of the change rather than of the suite.
+    """
+
+    def __init__(
+        self,
+        index: RepoIndex,
+        graph: Optional[ImportGraph] = None,
+        coverage_db: Optional[str] = None,
+        test_dirs: Optional[Iterable[str]] = ("tests",),
+        workers: int = 4,
+        timeout: float = 300.0,
+        python: str = sys.executable,
+    ):
+        """
+        Initialize the analyzer.
+
+        Args:
+            index: Repository file index
+            graph: Import graph (built on ``index`` if None)
+            coverage_db: coverage.py database with per-test contexts
+            test_dirs: Directories holding the tests to run (None for anywhere)
+            workers: Test files run at once
+            timeout: Seconds before a test file's run is killed
+            python: Interpreter used to run pytest
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.index = index
+        self.graph = graph or ImportGraph(index)
+        self.coverage_db = coverage_db
+        self.test_dirs = None if test_dirs is None else tuple(d.strip("/") + "/" for d in test_dirs)
+        self.workers = workers
+        self.timeout = timeout
+        self.python = python
+
+    def affected_tests(self, changed: Iterable[str]) -> List[str]:
+        """
+        Find the test files affected by changed files.
+
+        Args:
+            changed: Repository-relative paths of added, changed or removed files
+
+        Returns:
+            Repository-relative test file paths, sorted
+        """
+        changed = set(changed)
+        affected = {p for p in self.graph.dependents(changed) if is_test_file(p)}
+        if self.coverage_db:
+            coverage = load_coverage_map(self.coverage_db, self.index.repo_path)
+            for path in changed:
+                affected |= coverage.get(path, set())
+        if self.test_dirs is not None:
+            affected = {p for p in affected if p.startswith(self.test_dirs)}
+        # Deleted test files cannot run
+        return sorted(p for p in affected if self.index.get(p) is not None)
+
+    def run_tests(self, tests: Iterable[str]) -> List[TestFileResult]:
+        """
+        Run test files in parallel worker processes.
+
+        Args:
+            tests: Repository-relative test file paths
+
+        Returns:
+            One result per file, in the given order
+        """
+        tests = list(tests)
+        if not tests:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(tests))) as pool:
+            return list(pool.map(self._run_file, tests))
+
+    def _run_file(self, rel_path: str) -> TestFileResult:
+        """Run one test file with pytest."""
+        started = time.monotonic()
+        cmd = [self.python, "-m", "pytest", "-q", "--tb=short", "-p", "no:cacheprovider",
+               rel_path]
+        try:
+            proc = subprocess.run(
+                cmd, cwd=self.index.repo_path, capture_output=True, text=True,
+                timeout=self.timeout,
+            )
+            returncode, output = proc.returncode, proc.stdout + proc.stderr
+        except subprocess.TimeoutExpired:
+            returncode, output = -1, f"Timed out after {self.timeout:.0f}s"
+        except OSError as e:
+            returncode, output = -1, f"Could not run pytest: {e}"
+        return TestFileResult(rel_path, returncode, output, time.monotonic() - started)
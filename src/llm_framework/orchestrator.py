@@ -11,6 +11,7 @@ from .agents.research_agent import ResearchAgent
 from .agents.coding_agent import CodingAgent
 from .agents.writing_agent import WritingAgent
 from .config import Config
+from .provider_discovery import CACHE_PATH_ENV, ProbeResult, ProviderDiscovery
 
 
 class AgentOrchestrator:
@@ -27,6 +28,7 @@ class AgentOrchestrator:
         """
         self.providers: Dict[str, BaseProvider] = {}
         self.agents: Dict[str, Agent] = {}
+        self.probe_results: List[ProbeResult] = []
 
         # Initialize configuration
         if config is not None:
@@ -57,45 +59,64 @@ class AgentOrchestrator:
         """
         self.agents[name] = agent
 
-    def setup_default_providers(self):
+    def setup_default_providers(
+        self,
+        timeout: float = 10.0,
+        warmup: bool = False,
+        cache_path: Optional[str] = None,
+        cache_ttl: float = 300.0,
+    ):
         """
         Setup default REAL LLM providers (no mock).
-        Priority: Ollama (local) -> Claude -> OpenAI-compatible -> Intelligent Mock (fallback)
+
+        Ollama, Claude and OpenAI-compatible providers are health-checked
+        concurrently under one overall ``timeout``. Every available one is
+        registered, fastest first, so the first provider is the one with the
+        lowest measured latency. If a cache file is configured, probe results
+        are cached there for ``cache_ttl`` seconds, unless no real provider
+        was available; the Intelligent Mock is the fallback then.
 
         Uses configuration from config file if available, with environment variables
         taking precedence.
+
+        Args:
+            timeout: Seconds all probes together may take
+            warmup: Rank by a timed one-token request (a real, possibly paid,
+                call per provider) instead of the health check
+            cache_path: File for cached probe results (defaults to the
+                LLM_PROVIDER_CACHE environment variable; caching is disabled
+                if neither is set)
+            cache_ttl: Seconds cached probe results stay valid
         """
-        # Try Ollama first (local, no API key needed, REAL LLM)
-        try:
-            ollama_config = self.config.get_provider_config("ollama")
-            ollama = OllamaProvider(**ollama_config)
-            if ollama.is_available():
-                self.add_provider("ollama", ollama)
-                return  # Found real provider, done
-        except Exception:
-            pass
+        configs = {"ollama": self.config.get_provider_config("ollama")}
+        candidates = {"ollama": lambda: OllamaProvider(**configs["ollama"])}
 
-        # Try Claude API (check config or env var)
+        # Claude API (check config or env var)
         anthropic_config = self.config.get_provider_config("anthropic")
         if anthropic_config.get("api_key") or os.getenv("ANTHROPIC_API_KEY"):
-            try:
-                claude = ClaudeProvider(**anthropic_config)
-                if claude.is_available():
-                    self.add_provider("claude", claude)
-                    return  # Found real provider, done
-            except Exception:
-                pass
-
-        # Try OpenAI-compatible API (check config or env var)
+            configs["claude"] = dict(anthropic_config, env_key=os.getenv("ANTHROPIC_API_KEY"))
+            candidates["claude"] = lambda: ClaudeProvider(**anthropic_config)
+
+        # OpenAI-compatible API (check config or env var)
         openai_config = self.config.get_provider_config("openai")
         if openai_config.get("api_key") or os.getenv("OPENAI_API_KEY"):
-            try:
-                openai = OpenAICompatibleProvider(**openai_config)
-                if openai.is_available():
-                    self.add_provider("openai", openai)
-                    return  # Found real provider, done
-            except Exception:
-                pass
+            configs["openai"] = dict(openai_config, env_key=os.getenv("OPENAI_API_KEY"))
+            candidates["openai"] = lambda: OpenAICompatibleProvider(**openai_config)
+
+        discovery = ProviderDiscovery(
+            candidates,
+            configs=configs,
+            timeout=timeout,
+            warmup=warmup,
+            cache_path=cache_path or os.getenv(CACHE_PATH_ENV),
+            cache_ttl=cache_ttl,
+        )
+        self.probe_results = discovery.discover()
+        for result in self.probe_results:
+            if result.available and result.name in discovery.providers:
+                self.add_provider(result.name, discovery.providers[result.name])
+        if self.providers:
+            return  # Found real providers, done
 
         # Fallback to intelligent mock (for testing/demo when no real LLM available)
         # This provides contextual responses, not random data
@@ -0,0 +1,216 @@
+"""Concurrent LLM provider discovery, ranked by measured latency and cached on disk."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from .core.base_provider import BaseProvider
+from .core.deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROMPT = "Reply with OK."
+
+# Probe results are only cached when a path is configured
+CACHE_PATH_ENV = "LLM_PROVIDER_CACHE"
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of probing one provider."""
+
+    name: str
+    available: bool
+    latency: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _fingerprint(configs: Dict[str, Dict[str, Any]]) -> str:
+    """Hash provider configuration, so cached results are dropped when it changes."""
+    safe = {}
+    for name, config in configs.items():
+        safe[name] = {
+            # Keys are hashed, never written to the cache
+            k: hashlib.sha1(str(v).encode()).hexdigest() if "key" in k.lower() else v
+            for k, v in config.items()
+        }
+    return hashlib.sha1(json.dumps(safe, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ProviderDiscovery:
+    """
+    Probe candidate providers concurrently and rank them by latency.
+
+    Every candidate is built and checked with ``is_available`` on its own
+    thread; the check's round trip is the measured latency. With ``warmup``
+    a one-token request is then timed instead, as a best effort: a slow or
+    failing warm-up keeps the health-check latency and never makes a
+    provider unavailable. All probes share one ``timeout``; a candidate whose
+    check is still running when it expires is reported as unavailable.
+    When a ``cache_path`` is given, results with at least one available
+    provider are cached there for ``cache_ttl`` seconds, keyed by the
+    candidates' configuration, so repeated runs skip the network entirely.
+    The cache decides which provider is trusted, so it should live in a
+    directory only the user can write to; a file owned by another user is
+    ignored.
+    """
+
+    def __init__(
+        self,
+        candidates: Dict[str, Callable[[], BaseProvider]],
+        configs: Optional[Dict[str, Dict[str, Any]]] = None,
+        timeout: float = 10.0,
+        warmup: bool = False,
+        cache_path: Optional[str] = None,
+        cache_ttl: float = 300.0,
+    ):
+        """
+        Initialize discovery.
+
+        Args:
+            candidates: Factory per provider name
+            configs: Configuration per provider name (part of the cache key)
+            timeout: Seconds all probes together may take
+            warmup: Also time a one-token request (a real, possibly paid, call)
+            cache_path: JSON file for probe results (None disables the cache)
+            cache_ttl: Seconds cached results stay valid
+        """
+        self.candidates = dict(candidates)
+        self.configs = configs or {}
+        self.timeout = timeout
+        self.warmup = warmup
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+
+        self.providers: Dict[str, BaseProvider] = {}
+        self.from_cache = False
+        self._results: Dict[str, ProbeResult] = {}
+        self._lock = threading.Lock()
+
+    def discover(self) -> List[ProbeResult]:
+        """
+        Probe (or load cached results for) every candidate.
+
+        Returns:
+            Available providers fastest first, then unavailable ones
+        """
+        cached = self._load_cache()
+        if cached is not None:
+            self.from_cache = True
+            for result in cached:
+                if result.available:
+                    try:
+                        self.providers[result.name] = self.candidates[result.name]()
+                    except Exception as e:
+                        result.available, result.error = False, str(e)
+            return self._rank(cached)
+
+        self.from_cache = False
+        deadline = Deadline(self.timeout)
+        self._results = {
+            name: ProbeResult(name, False, error=f"timed out after {self.timeout}s")
+            for name in self.candidates
+        }
+        # Not a context manager: a hung probe must not hold up startup
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.candidates)),
+                                      thread_name_prefix="provider-probe")
+        futures = [
+            executor.submit(self._probe, name, factory, deadline)
+            for name, factory in self.candidates.items()
+        ]
+        wait(futures, timeout=deadline.remaining())
+        executor.shutdown(wait=False)
+
+        # Late probes may still update their result; report the state now
+        with self._lock:
+            ranked = self._rank([replace(r) for r in self._results.values()])
+        if any(r.available for r in ranked):
+            self._save_cache(ranked)
+        return ranked
+
+    def _probe(self, name: str, factory: Callable[[], BaseProvider], deadline: Deadline):
+        """Check and time one provider, updating its result as it goes."""
+        result = self._results[name]
+        try:
+            provider = factory()
+            started = time.monotonic()
+            available = provider.is_available()
+            latency = time.monotonic() - started
+        except Exception as e:
+            with self._lock:
+                result.error = str(e) or type(e).__name__
+            return
+
+        with self._lock:
+            if deadline.expired:
+                return
+            if not available:
+                result.error = "not available"
+                return
+            result.available, result.latency, result.error = True, latency, None
+            self.providers[name] = provider
+        logger.debug("Provider %s answered its health check in %.3fs", name, latency)
+
+        if not self.warmup:
+            return
+        try:
+            started = time.monotonic()
+            provider.generate(WARMUP_PROMPT, max_tokens=1, temperature=0.0, deadline=deadline)
+            latency = time.monotonic() - started
+        except Exception as e:
+            logger.debug("Warm-up of provider %s failed: %s", name, e)
+            return
+        with self._lock:
+            if not deadline.expired:
+                result.latency = latency
+
+    @staticmethod
+    def _rank(results: List[ProbeResult]) -> List[ProbeResult]:
+        return sorted(results, key=lambda r: (not r.available, r.latency or 0.0))
+
+    def _cache_key(self) -> str:
+        return _fingerprint({
+            name: dict(self.configs.get(name, {}), warmup=self.warmup)
+            for name in sorted(self.candidates)
+        })
+
+    def _load_cache(self) -> Optional[List[ProbeResult]]:
+        """Read fresh cached results for the current configuration."""
+        if not self.cache_path or self.cache_ttl <= 0:
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                if hasattr(os, "getuid") and os.fstat(f.fileno()).st_uid != os.getuid():
+                    logger.warning("Ignoring provider cache %s owned by another user",
+                                   self.cache_path)
+                    return None
+                data = json.load(f)
+            if data.get("key") != self._cache_key() or \
+                    time.time() - data.get("created", 0) > self.cache_ttl:
+                return None
+            return [ProbeResult(**r) for r in data["results"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_cache(self, results: List[ProbeResult]):
+        """Atomically write results."""
+        if not self.cache_path or self.cache_ttl <= 0:
+            return
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "key": self._cache_key(),
+                    "created": time.time(),
+                    "results": [asdict(r) for r in results],
+                }, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning("Cannot write provider cache %s: %s", self.cache_path, e)
@@ -3,6 +3,7 @@
 import os
 from typing import Optional
 from ..core.base_provider import BaseProvider
+from ..core.deadline import Deadline, DeadlineExceeded
 
 
 class ClaudeProvider(BaseProvider):
@@ -43,11 +44,16 @@ class ClaudeProvider(BaseProvider):
 
         Args:
             prompt: The input prompt
-            **kwargs: Additional generation parameters (temperature, max_tokens, etc.)
+            **kwargs: Additional generation parameters (temperature, max_tokens,
+                deadline, etc.)
 
         Returns:
             The generated text response
+
+        Raises:
+            DeadlineExceeded: If the task's deadline passes before the response
         """
+        deadline = kwargs.get("deadline")
         client = self._get_client()
         if not client:
             raise RuntimeError("Claude provider is not properly configured with an API key")
@@ -57,20 +63,31 @@ class ClaudeProvider(BaseProvider):
             temperature = kwargs.get("temperature", 0.7)
             max_tokens = kwargs.get("max_tokens", 1024)
 
+            request = {}
+            timeout = deadline.timeout() if deadline is not None else None
+            if timeout is not None:
+                request["timeout"] = timeout
+
             response = client.messages.create(
                 model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 messages=[{"role": "user", "content": prompt}],
+                **request,
             )
 
             return response.content[0].text
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("Task deadline exceeded waiting for Claude") from e
             raise RuntimeError(f"Error generating response from Claude: {str(e)}") from e
 
-    def is_available(self) -> bool:
+    def is_available(self, deadline: Optional[Deadline] = None) -> bool:
         """
-        Check if Claude provider is available.
+        Check if Claude provider is available (no network call, so the
+        deadline is not needed).
 
         Returns:
             True if API key is configured, False otherwise
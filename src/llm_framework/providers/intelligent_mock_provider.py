@@ -3,7 +3,10 @@ Intelligent mock provider that generates contextual responses.
 Used ONLY when no real LLM is available (testing/demo).
 """
 
+from typing import Optional
+
 from ..core.base_provider import BaseProvider
+from ..core.deadline import Deadline
 
 
 class IntelligentMockProvider(BaseProvider):
@@ -211,7 +214,7 @@ def test_divide_numbers_zero_division():
 
 A good README answers: What, Why, How, and Who."""
 
-    def is_available(self) -> bool:
+    def is_available(self, deadline: Optional[Deadline] = None) -> bool:
         """Always available as fallback."""
         return True
 
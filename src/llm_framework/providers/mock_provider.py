@@ -1,6 +1,9 @@
 """Mock LLM provider for testing and demonstration without external dependencies."""
 
+from typing import Optional
+
 from ..core.base_provider import BaseProvider
+from ..core.deadline import Deadline
 
 
 class MockLLMProvider(BaseProvider):
@@ -90,7 +93,7 @@ class MockLLMProvider(BaseProvider):
             return " ".join(topic_words)
         return "the subject at hand"
 
-    def is_available(self) -> bool:
+    def is_available(self, deadline: Optional[Deadline] = None) -> bool:
         """
         Check if the provider is available.
 
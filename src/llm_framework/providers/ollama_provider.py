@@ -3,37 +3,58 @@
 import os
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 from ..core.base_provider import BaseProvider
+from ..core.deadline import Deadline, DeadlineExceeded, request_timeout
 
 
 class OllamaProvider(BaseProvider):
     """Provider for Ollama local LLM models."""
 
-    def __init__(self, model: str = "qwen2.5:0.5b", base_url: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        model: str = "qwen2.5:0.5b",
+        base_url: Optional[str] = None,
+        pool_size: int = 10,
+        **kwargs,
+    ):
         """
         Initialize Ollama provider.
 
         Args:
             model: Ollama model name to use
             base_url: Ollama server URL (or use OLLAMA_BASE_URL env var)
+            pool_size: Maximum pooled HTTP connections shared by all callers
             **kwargs: Additional configuration
         """
         super().__init__(None, **kwargs)
         self.model = model
         self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+        # Keep-alive connections reused across agents sharing this provider
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def generate(self, prompt: str, **kwargs) -> str:
         """
         Generate a response using Ollama.
 
         Args:
             prompt: The input prompt
-            **kwargs: Additional generation parameters (temperature, etc.)
+            **kwargs: Additional generation parameters (temperature, deadline, etc.)
 
         Returns:
             The generated text response
+
+        Raises:
+            DeadlineExceeded: If the task's deadline passes before the response
         """
-        if not self.is_available():
+        deadline = kwargs.get("deadline")
+        if not self.is_available(deadline):
+            if deadline is not None:
+                deadline.check()
             raise RuntimeError("Ollama server is not available")
 
         try:
@@ -41,7 +62,7 @@ class OllamaProvider(BaseProvider):
             temperature = kwargs.get("temperature", 0.7)
             max_tokens = kwargs.get("max_tokens", 150)  # Reduced for CPU performance
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
@@ -52,24 +73,32 @@ class OllamaProvider(BaseProvider):
                         "num_predict": max_tokens,
                     },
                 },
-                timeout=60,  # Increased for CPU
+                timeout=request_timeout(deadline, 60),  # Increased for CPU
             )
 
             response.raise_for_status()
             result = response.json()
             return result.get("response", "")
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("Task deadline exceeded waiting for Ollama") from e
+            raise RuntimeError(f"Error generating response from Ollama: {str(e)}") from e
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Error generating response from Ollama: {str(e)}") from e
 
-    def is_available(self) -> bool:
+    def is_available(self, deadline: Optional[Deadline] = None) -> bool:
         """
         Check if Ollama server is available.
 
+        Args:
+            deadline: Deadline of the task about to run (caps the check's timeout)
+
         Returns:
             True if server is reachable, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags",
+                                        timeout=request_timeout(deadline, 5))
             return response.status_code == 200
         except Exception:
             return False
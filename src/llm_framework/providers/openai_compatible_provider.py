@@ -3,7 +3,9 @@
 import os
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 from ..core.base_provider import BaseProvider
+from ..core.deadline import Deadline, DeadlineExceeded, request_timeout
 
 
 class OpenAICompatibleProvider(BaseProvider):
@@ -17,6 +19,7 @@ class OpenAICompatibleProvider(BaseProvider):
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         model: str = "gpt-3.5-turbo",
+        pool_size: int = 10,
         **kwargs,
     ):
         """
@@ -26,24 +29,38 @@ class OpenAICompatibleProvider(BaseProvider):
             api_key: API key (or use OPENAI_API_KEY env var)
             base_url: API base URL (or use OPENAI_BASE_URL env var)
             model: Model name to use
+            pool_size: Maximum pooled HTTP connections shared by all callers
             **kwargs: Additional configuration
         """
         super().__init__(api_key or os.getenv("OPENAI_API_KEY"), **kwargs)
         self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
         self.model = model
 
+        # Keep-alive connections reused across agents sharing this provider
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def generate(self, prompt: str, **kwargs) -> str:
         """
         Generate a response using OpenAI-compatible API.
 
         Args:
             prompt: The input prompt
-            **kwargs: Additional generation parameters (temperature, max_tokens, etc.)
+            **kwargs: Additional generation parameters (temperature, max_tokens,
+                deadline, etc.)
 
         Returns:
             The generated text response
+
+        Raises:
+            DeadlineExceeded: If the task's deadline passes before the response
         """
-        if not self.is_available():
+        deadline = kwargs.get("deadline")
+        if not self.is_available(deadline):
+            if deadline is not None:
+                deadline.check()
             raise RuntimeError("OpenAI-compatible provider is not properly configured")
 
         try:
@@ -64,8 +81,11 @@ class OpenAICompatibleProvider(BaseProvider):
                 "max_tokens": max_tokens,
             }
 
-            response = requests.post(
-                f"{self.base_url}/chat/completions", headers=headers, json=data, timeout=30
+            response = self.session.post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=data,
+                timeout=request_timeout(deadline, 30),
             )
 
             response.raise_for_status()
@@ -73,13 +93,20 @@ class OpenAICompatibleProvider(BaseProvider):
 
             return result["choices"][0]["message"]["content"]
 
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("Task deadline exceeded waiting for the API") from e
+            raise RuntimeError(f"Error generating response: {str(e)}") from e
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Error generating response: {str(e)}") from e
 
-    def is_available(self) -> bool:
+    def is_available(self, deadline: Optional[Deadline] = None) -> bool:
         """
         Check if the provider is available (REQUIRES API KEY).
 
+        Args:
+            deadline: Deadline of the task about to run (caps the check's timeout)
+
         Returns:
             True if API key is set and API is reachable, False otherwise
         """
@@ -94,7 +121,8 @@ class OpenAICompatibleProvider(BaseProvider):
             # Try to reach the API
             headers = {"Authorization": f"Bearer {self.api_key}"}
 
-            response = requests.get(f"{self.base_url}/models", headers=headers, timeout=5)
+            response = self.session.get(f"{self.base_url}/models", headers=headers,
+                                        timeout=request_timeout(deadline, 5))
             return response.status_code in [200, 401]  # 401 means auth required but API is up
         except Exception:
             return False
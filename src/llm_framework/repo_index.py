@@ -0,0 +1,409 @@
+"""Incremental, in-process index of repository files shared by autonomous agents."""
+
+import fnmatch
+import hashlib
+import logging
+import os
+import re
+import stat as stat_module
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Never indexed, with or without a .gitignore
+DEFAULT_EXCLUDES = (".git", "__pycache__", "venv", ".venv", "node_modules")
+
+_HASH_CHUNK = 1 << 16
+
+_indexes: Dict[str, "RepoIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """One indexed file."""
+
+    path: str
+    rel_path: str
+    size: int
+    mtime_ns: int
+    hash: str
+
+
+def blob_hash(path: str, size: int) -> str:
+    """
+    Hash a file the way git hashes a blob, so keys match ``git hash-object``.
+
+    Args:
+        path: File to hash
+        size: File size from stat (part of the git blob header)
+
+    Returns:
+        Hex SHA-1 of the blob
+    """
+    digest = hashlib.sha1(f"blob {size}\0".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _translate_pattern(pattern: str) -> str:
+    """Translate a gitignore glob into a regex body."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                # fnmatch already translates character classes, including [!...]
+                parts.append(fnmatch.translate(pattern[i:end + 1])[4:-3])
+                i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+class IgnoreRules:
+    """
+    Gitignore matching for one directory tree.
+
+    Supports comments, ``!`` negation, directory-only patterns (trailing
+    ``/``), anchored patterns and ``**``. Rules from nested ``.gitignore``
+    files apply below their directory, and the last matching rule wins.
+    """
+
+    def __init__(self):
+        self._rules: List[Tuple[str, Pattern, bool, bool]] = []
+
+    def add_file(self, gitignore_path: str, base: str):
+        """
+        Load rules from a .gitignore file.
+
+        Args:
+            gitignore_path: Path of the file
+            base: Directory of the file relative to the root ('' for the root)
+        """
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            self.add(line, base)
+
+    def add(self, line: str, base: str = ""):
+        """
+        Add one gitignore line.
+
+        Args:
+            line: Pattern line
+            base: Directory the pattern is relative to
+        """
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            return
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.strip("/") if dir_only else line
+        if not line:
+            return
+
+        # A slash anywhere but the end anchors the pattern to its directory
+        anchored = "/" in line
+        body = _translate_pattern(line.lstrip("/"))
+        if not anchored:
+            body = "(?:.*/)?" + body
+        self._rules.append((base, re.compile(body + r"\Z"), negate, dir_only))
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check a path against the rules.
+
+        Args:
+            rel_path: Path relative to the root, '/'-separated
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the path is ignored
+        """
+        ignored = False
+        for base, regex, negate, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                candidate = rel_path[len(base) + 1:]
+            else:
+                candidate = rel_path
+            if regex.match(candidate):
+                ignored = not negate
+        return ignored
+
+
+class RepoIndex:
+    """
+    Index of the files in a repository, refreshed incrementally.
+
+    The tree is walked with ``os.scandir`` in-process. A file is re-hashed only
+    when its size or mtime changed, so a refresh of an unchanged tree costs one
+    stat per file and no reads. Refreshes are throttled to ``refresh_interval``
+    so several agents sharing the index walk the tree once per cycle; callers
+    that know what changed can call ``invalidate`` or ``update`` instead. With
+    ``refresh_interval=None`` the tree is walked only once (or when forced or
+    invalidated), and changes must come through ``update``.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        refresh_interval: Optional[float] = 5.0,
+        excludes: Iterable[str] = DEFAULT_EXCLUDES,
+    ):
+        """
+        Initialize the index (the tree is walked on the first refresh).
+
+        Args:
+            repo_path: Repository root
+            refresh_interval: Minimum seconds between automatic refreshes
+                (None disables them after the first)
+            excludes: Directory and file names never indexed
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        self.refresh_interval = refresh_interval
+        self.excludes = frozenset(excludes)
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, FileEntry] = {}
+        self._last_refresh = 0.0
+        self._dirty: set = set()
+        self.generation = 0
+        self.refreshes = 0
+        self.hashed = 0
+
+    @classmethod
+    def shared(cls, repo_path: str) -> "RepoIndex":
+        """
+        Get the process-wide index for a repository.
+
+        Args:
+            repo_path: Repository root
+
+        Returns:
+            The index shared by every caller using the same root
+        """
+        key = os.path.abspath(repo_path)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = cls(key)
+            return index
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Bring the index up to date with the file system.
+
+        Args:
+            force: Refresh even if the last refresh was recent
+
+        Returns:
+            Number of files added, changed or removed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and not self._dirty and self._last_refresh and (
+                    self.refresh_interval is None
+                    or now - self._last_refresh < self.refresh_interval):
+                return 0
+
+            seen: Dict[str, FileEntry] = {}
+            changes = 0
+            if os.path.isdir(self.repo_path):
+                changes = self._walk(self.repo_path, "", IgnoreRules(), seen)
+            changes += len(self._entries.keys() - seen.keys())
+
+            self._entries = seen
+            self._dirty.clear()
+            self._last_refresh = time.monotonic()
+            self.refreshes += 1
+            if changes:
+                self.generation += 1
+                logger.debug("Indexed %s: %d files, %d changed",
+                             self.repo_path, len(seen), changes)
+            return changes
+
+    def invalidate(self, paths: Optional[Iterable[str]] = None):
+        """
+        Mark files as changed so the next refresh re-checks them immediately.
+
+        Args:
+            paths: Absolute or repository-relative paths (None marks everything)
+        """
+        with self._lock:
+            if paths is None:
+                self._last_refresh = 0.0
+                return
+            for path in paths:
+                self._dirty.add(self._relative(path))
+
+    def update(self, paths: Iterable[str]) -> int:
+        """
+        Re-check specific files now, without walking the tree.
+
+        Used by callers that know exactly what changed (e.g. from git). Files
+        that no longer exist are removed; .gitignore rules are not applied,
+        only ``excludes``.
+
+        Args:
+            paths: Absolute or repository-relative paths
+
+        Returns:
+            Number of files added, changed or removed
+        """
+        with self._lock:
+            changes = 0
+            for path in paths:
+                rel = self._relative(path)
+                if rel.startswith("../") or self.excludes.intersection(rel.split("/")):
+                    continue
+                self._dirty.discard(rel)
+                old = self._entries.get(rel)
+                full_path = os.path.join(self.repo_path, rel)
+                try:
+                    stat = os.stat(full_path, follow_symlinks=False)
+                    if not stat_module.S_ISREG(stat.st_mode):
+                        raise FileNotFoundError(full_path)
+                    if old is not None and old.size == stat.st_size \
+                            and old.mtime_ns == stat.st_mtime_ns:
+                        continue
+                    digest = blob_hash(full_path, stat.st_size)
+                except OSError:
+                    if self._entries.pop(rel, None) is not None:
+                        changes += 1
+                    continue
+                self.hashed += 1
+                self._entries[rel] = FileEntry(full_path, rel, stat.st_size,
+                                               stat.st_mtime_ns, digest)
+                if old is None or old.hash != digest:
+                    changes += 1
+            if changes:
+                self.generation += 1
+            return changes
+
+    def files(self, suffix: Optional[str] = None, under: Optional[str] = None) -> List[FileEntry]:
+        """
+        List indexed files, refreshing first if the index is stale.
+
+        Args:
+            suffix: Only files ending with this (e.g. ".py")
+            under: Only files below this repository-relative directory
+
+        Returns:
+            Entries sorted by relative path
+        """
+        self.refresh()
+        prefix = under.strip("/") + "/" if under else ""
+        with self._lock:
+            entries = [
+                e for rel, e in self._entries.items()
+                if (suffix is None or rel.endswith(suffix)) and rel.startswith(prefix)
+            ]
+        return sorted(entries, key=lambda e: e.rel_path)
+
+    def get(self, path: str) -> Optional[FileEntry]:
+        """
+        Look up one file, refreshing first if the index is stale.
+
+        Args:
+            path: Absolute or repository-relative path
+
+        Returns:
+            The entry, or None if the file is not indexed
+        """
+        self.refresh()
+        with self._lock:
+            return self._entries.get(self._relative(path))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _relative(self, path: str) -> str:
+        """Repository-relative, '/'-separated form of a path."""
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.repo_path)
+        return path.replace(os.sep, "/")
+
+    def _walk(self, directory: str, rel_dir: str, rules: IgnoreRules,
+              seen: Dict[str, FileEntry]) -> int:
+        """Index one directory recursively and return the number of changed files."""
+        gitignore = os.path.join(directory, ".gitignore")
+        if os.path.isfile(gitignore):
+            rules.add_file(gitignore, rel_dir)
+
+        changes = 0
+        try:
+            with os.scandir(directory) as it:
+                dir_entries = list(it)
+        except OSError as e:
+            logger.debug("Cannot list %s: %s", directory, e)
+            return 0
+
+        for dir_entry in dir_entries:
+            if dir_entry.name in self.excludes:
+                continue
+            rel = f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+            try:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    if not rules.is_ignored(rel, True):
+                        changes += self._walk(dir_entry.path, rel, rules, seen)
+                    continue
+                if not dir_entry.is_file(follow_symlinks=False) or rules.is_ignored(rel, False):
+                    continue
+                stat = dir_entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            old = self._entries.get(rel)
+            if old is not None and rel not in self._dirty and old.size == stat.st_size \
+                    and old.mtime_ns == stat.st_mtime_ns:
+                seen[rel] = old
+                continue
+
+            try:
+                digest = blob_hash(dir_entry.path, stat.st_size)
+            except OSError:
+                continue
+            self.hashed += 1
+            entry = FileEntry(dir_entry.path, rel, stat.st_size, stat.st_mtime_ns, digest)
+            seen[rel] = entry
+            if old is None or old.hash != entry.hash:
+                changes += 1
+        return changes
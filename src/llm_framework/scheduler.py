@@ -0,0 +1,345 @@
+"""Priority-class scheduler with weighted fair queuing across task flows."""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .core.deadline import Deadline
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BACKGROUND = "background"
+
+# Highest priority first
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND)
+
+
+def check_priority_class(priority_class: str):
+    """
+    Reject an unknown priority class.
+
+    Args:
+        priority_class: Class name to check
+
+    Raises:
+        ValueError: If the class is not one of PRIORITY_CLASSES
+    """
+    if priority_class not in PRIORITY_CLASSES:
+        raise ValueError(
+            f"Unknown priority class '{priority_class}'. "
+            f"Use one of: {', '.join(PRIORITY_CLASSES)}"
+        )
+
+
+def priority_class_for(priority: int) -> str:
+    """
+    Map a numeric task priority onto a priority class.
+
+    Args:
+        priority: Numeric priority (higher is more urgent)
+
+    Returns:
+        "interactive" for positive, "background" for negative, otherwise "normal"
+    """
+    if priority > 0:
+        return PRIORITY_INTERACTIVE
+    if priority < 0:
+        return PRIORITY_BACKGROUND
+    return PRIORITY_NORMAL
+
+
+@dataclass
+class ScheduledTask:
+    """A task waiting in the scheduler."""
+
+    task: Any
+    priority_class: str
+    flow: str
+    cost: float
+    key: Hashable
+    enqueued_at: float
+    start_tag: float = 0.0
+    finish_tag: float = 0.0
+    seq: int = 0
+    deadline: Optional[Deadline] = None
+    done: bool = field(default=False, repr=False)
+
+    @property
+    def wait_time(self) -> float:
+        """Seconds since the task was queued."""
+        return time.monotonic() - self.enqueued_at
+
+
+class TaskScheduler:
+    """
+    Schedule tasks by priority class, then fairly across flows.
+
+    Classes are served in strict order (interactive, normal, background). Within
+    a class, flows such as agent types or tenants share capacity by weight using
+    weighted fair queuing: each task gets a virtual finish tag and the smallest
+    tag runs next, so a flow with a deep backlog cannot monopolise the class.
+
+    Starvation protection: a task that has waited longer than ``starvation_age``
+    is served ahead of higher classes, oldest first.
+    """
+
+    def __init__(
+        self,
+        flow_weights: Optional[Dict[str, float]] = None,
+        starvation_age: Optional[float] = 60.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            flow_weights: Relative share per flow name (unlisted flows get 1.0)
+            starvation_age: Seconds after which any waiting task is promoted
+                (None disables promotion)
+        """
+        self.flow_weights = dict(flow_weights or {})
+        self.starvation_age = starvation_age
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._heaps: Dict[str, List[Tuple[float, int, ScheduledTask]]] = {
+            cls: [] for cls in PRIORITY_CLASSES
+        }
+        # Arrival order per class, used to find the oldest task for promotion
+        self._arrivals: Dict[str, Deque[ScheduledTask]] = {
+            cls: deque() for cls in PRIORITY_CLASSES
+        }
+        self._virtual_time: Dict[str, float] = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+        self._by_key: Dict[Hashable, ScheduledTask] = {}
+        self._count = 0
+
+        self.dispatched: Dict[str, int] = {cls: 0 for cls in PRIORITY_CLASSES}
+        self.promoted = 0
+
+    def push(
+        self,
+        task: Any,
+        priority_class: str = PRIORITY_NORMAL,
+        flow: str = "default",
+        cost: float = 1.0,
+        key: Optional[Hashable] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ScheduledTask:
+        """
+        Queue a task.
+
+        Args:
+            task: The task payload
+            priority_class: "interactive", "normal" or "background"
+            flow: Flow the task belongs to (agent type, tenant, ...)
+            cost: Relative cost used for fair sharing
+            key: Optional unique key used by ``discard`` and ``__contains__``
+                (defaults to ``("auto", n)``); a queued task with the same
+                key is replaced
+            deadline: Deadline carried with the task for whoever pops it
+
+        Returns:
+            The scheduled entry
+        """
+        check_priority_class(priority_class)
+
+        with self._lock:
+            seq = next(self._seq)
+            weight = self.flow_weights.get(flow, 1.0)
+            start = max(
+                self._virtual_time[priority_class],
+                self._last_finish.get((priority_class, flow), 0.0),
+            )
+            entry = ScheduledTask(
+                task=task,
+                priority_class=priority_class,
+                flow=flow,
+                cost=cost,
+                # Namespaced so it never collides with a caller's own keys
+                key=("auto", seq) if key is None else key,
+                enqueued_at=time.monotonic(),
+                start_tag=start,
+                finish_tag=start + cost / weight,
+                seq=seq,
+                deadline=deadline,
+            )
+            self._last_finish[(priority_class, flow)] = entry.finish_tag
+
+            heapq.heappush(self._heaps[priority_class], (entry.finish_tag, seq, entry))
+            self._arrivals[priority_class].append(entry)
+            replaced = self._by_key.get(entry.key)
+            if replaced is not None:
+                # Its heap entry is skipped lazily once marked done
+                replaced.done = True
+            else:
+                self._count += 1
+            self._by_key[entry.key] = entry
+            return entry
+
+    def pop(self) -> Optional[ScheduledTask]:
+        """
+        Remove and return the next task to run.
+
+        Returns:
+            The next scheduled entry, or None if the scheduler is empty
+        """
+        with self._lock:
+            entry = self._pop_starved()
+            if entry is None:
+                for cls in PRIORITY_CLASSES:
+                    entry = self._pop_heap(cls)
+                    if entry is not None:
+                        break
+            if entry is None:
+                return None
+
+            entry.done = True
+            del self._by_key[entry.key]
+            self._count -= 1
+            self._virtual_time[entry.priority_class] = max(
+                self._virtual_time[entry.priority_class], entry.start_tag
+            )
+            self.dispatched[entry.priority_class] += 1
+            return entry
+
+    def discard(self, key: Hashable) -> bool:
+        """
+        Remove a queued task by key.
+
+        Args:
+            key: Key given to ``push``
+
+        Returns:
+            True if a task was removed
+        """
+        with self._lock:
+            entry = self._by_key.pop(key, None)
+            if entry is None:
+                return False
+            entry.done = True
+            self._count -= 1
+            return True
+
+    def pending(self) -> List[ScheduledTask]:
+        """
+        List queued tasks in approximate dispatch order.
+
+        Returns:
+            Entries ordered by priority class, then finish tag
+        """
+        with self._lock:
+            rank = {cls: i for i, cls in enumerate(PRIORITY_CLASSES)}
+            entries = [e for e in self._by_key.values() if not e.done]
+        return sorted(entries, key=lambda e: (rank[e.priority_class], e.finish_tag, e.seq))
+
+    def next_class(self) -> Optional[str]:
+        """
+        Priority class of the task ``pop`` would return now.
+
+        Returns:
+            The class, or None if the scheduler is empty
+        """
+        with self._lock:
+            starved = self._find_starved()
+            if starved is not None:
+                return starved.priority_class
+            for cls in PRIORITY_CLASSES:
+                heap = self._heaps[cls]
+                while heap and heap[0][2].done:
+                    heapq.heappop(heap)
+                if heap:
+                    return cls
+        return None
+
+    def oldest_wait(self) -> float:
+        """Age in seconds of the oldest queued task."""
+        with self._lock:
+            oldest = [self._head(cls) for cls in PRIORITY_CLASSES]
+        ages = [e.wait_time for e in oldest if e is not None]
+        return max(ages, default=0.0)
+
+    def count(self, priority_class: Optional[str] = None) -> int:
+        """
+        Count queued tasks.
+
+        Args:
+            priority_class: Restrict the count to one class
+
+        Returns:
+            Number of queued tasks
+        """
+        if priority_class is None:
+            return self._count
+        with self._lock:
+            return sum(
+                1
+                for e in self._by_key.values()
+                if e.priority_class == priority_class and not e.done
+            )
+
+    def keys(self) -> Iterable[Hashable]:
+        """Keys of all queued tasks."""
+        with self._lock:
+            return list(self._by_key.keys())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth per class and dispatch counters.
+
+        Returns:
+            Dictionary of scheduler statistics
+        """
+        return {
+            "pending": {cls: self.count(cls) for cls in PRIORITY_CLASSES},
+            "dispatched": dict(self.dispatched),
+            "promoted": self.promoted,
+            "oldest_wait": round(self.oldest_wait(), 3),
+        }
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._by_key
+
+    def _head(self, cls: str) -> Optional[ScheduledTask]:
+        """Oldest live entry of a class. Caller must hold the lock."""
+        arrivals = self._arrivals[cls]
+        while arrivals and arrivals[0].done:
+            arrivals.popleft()
+        return arrivals[0] if arrivals else None
+
+    def _pop_heap(self, cls: str) -> Optional[ScheduledTask]:
+        """Pop the smallest finish tag of a class. Caller must hold the lock."""
+        heap = self._heaps[cls]
+        while heap:
+            _, _, entry = heapq.heappop(heap)
+            if not entry.done:
+                return entry
+        return None
+
+    def _find_starved(self) -> Optional[ScheduledTask]:
+        """Oldest task past the starvation age. Caller must hold the lock."""
+        if self.starvation_age is None:
+            return None
+
+        starved = None
+        for cls in PRIORITY_CLASSES[1:]:
+            head = self._head(cls)
+            if head is not None and head.wait_time > self.starvation_age:
+                if starved is None or head.enqueued_at < starved.enqueued_at:
+                    starved = head
+        return starved
+
+    def _pop_starved(self) -> Optional[ScheduledTask]:
+        """Pop the oldest task past the starvation age. Caller must hold the lock."""
+        starved = self._find_starved()
+        if starved is not None:
+            # Its heap entry is skipped lazily once marked done
+            self.promoted += 1
+        return starved
@@ -0,0 +1,526 @@
+"""Multi-process sharded runner for continuous agents."""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .agent_journal import AgentJournal
+from .continuous_agent import ContinuousAgent
+from .core.agent import Agent
+
+logger = logging.getLogger(__name__)
+
+# Rejected-task errors kept for inspection
+MAX_ERRORS = 1000
+
+# Seconds the supervisor sleeps between polls of idle shard event queues
+EVENT_POLL_INTERVAL = 0.05
+
+AgentFactory = Callable[[List[str]], Dict[str, Agent]]
+
+
+def default_agent_factory(agent_names: List[str]) -> Dict[str, Agent]:
+    """
+    Build agents inside a shard process using the default orchestrator setup.
+
+    Args:
+        agent_names: Names of the agents this shard hosts
+
+    Returns:
+        Mapping of agent name to Agent
+    """
+    from .orchestrator import AgentOrchestrator
+
+    orchestrator = AgentOrchestrator()
+    orchestrator.setup_default_providers()
+    orchestrator.setup_default_agents()
+    return {
+        name: orchestrator.get_agent(name)
+        for name in agent_names
+        if orchestrator.get_agent(name) is not None
+    }
+
+
+def _shard_main(
+    shard_id: int,
+    agent_names: List[str],
+    agent_factory: AgentFactory,
+    agent_kwargs: Dict[str, Any],
+    task_queue,
+    event_queue,
+    heartbeat_interval: float,
+    state_dir: Optional[str] = None,
+):
+    """
+    Entry point of a shard worker process.
+
+    Runs one ContinuousAgent per assigned agent, forwards results to the
+    supervisor and reports status on every heartbeat. With ``state_dir``
+    each agent journals its queue there, so a restarted shard resumes it.
+    """
+    agents = agent_factory(agent_names)
+    continuous_agents: Dict[str, ContinuousAgent] = {}
+    journals: List[AgentJournal] = []
+
+    for name, agent in agents.items():
+        kwargs = dict(agent_kwargs)
+        if state_dir:
+            journal = AgentJournal(os.path.join(state_dir, f"{name}.wal"))
+            journals.append(journal)
+            kwargs["journal"] = journal
+        cont_agent = ContinuousAgent(agent, **kwargs)
+
+        def forward(task, result, name=name):
+            event_queue.put(("result", shard_id, name, task, result))
+
+        cont_agent.on_result_callback = forward
+        cont_agent.start()
+        continuous_agents[name] = cont_agent
+
+    def heartbeat():
+        statuses = {name: a.get_status() for name, a in continuous_agents.items()}
+        event_queue.put(("heartbeat", shard_id, statuses))
+
+    heartbeat()
+    last_heartbeat = time.monotonic()
+    running = True
+    while running:
+        timeout = max(0.0, heartbeat_interval - (time.monotonic() - last_heartbeat))
+        try:
+            command = task_queue.get(timeout=timeout)
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            if command[0] == "stop":
+                running = False
+            elif command[0] == "task":
+                _, name, task, kwargs = command
+                cont_agent = continuous_agents.get(name)
+                if cont_agent is None:
+                    event_queue.put(("error", shard_id, name, task, f"Unknown agent: {name}"))
+                else:
+                    try:
+                        cont_agent.add_task(task, **kwargs)
+                    except Exception as e:
+                        event_queue.put(("error", shard_id, name, task, str(e)))
+
+        if time.monotonic() - last_heartbeat >= heartbeat_interval:
+            heartbeat()
+            last_heartbeat = time.monotonic()
+
+    for cont_agent in continuous_agents.values():
+        cont_agent.stop()
+    for journal in journals:
+        journal.close()
+    heartbeat()
+
+
+class _Shard:
+    """Supervisor-side record of one worker process."""
+
+    def __init__(self, shard_id: int, agent_names: List[str], task_queue, event_queue):
+        self.shard_id = shard_id
+        self.agent_names = agent_names
+        self.process = None
+        self.task_queue = task_queue
+        self.event_queue = event_queue
+        self.last_heartbeat = 0.0
+        self.statuses: Dict[str, Dict[str, Any]] = {}
+        self.restarts = 0
+
+
+class ShardAgentProxy:
+    """
+    Stand-in for a ContinuousAgent that lives in a shard process.
+
+    Exposes the same is_running/start/stop/add_task/get_status surface, so
+    code written for in-process agents can monitor sharded ones.
+    """
+
+    def __init__(self, runner: "ShardedAgentRunner", name: str):
+        self.runner = runner
+        self.name = name
+
+    @property
+    def is_running(self) -> bool:
+        """True while the hosting shard is alive and the agent reports running."""
+        return self.runner.is_agent_running(self.name)
+
+    def start(self):
+        """Ensure the hosting shard is running."""
+        self.runner.ensure_shard(self.runner.shard_for(self.name))
+
+    def stop(self):
+        """Agents stop with their shard; see ShardedAgentRunner.stop."""
+
+    def add_task(self, task: str, **kwargs) -> bool:
+        """Send a task to the agent's shard."""
+        return self.runner.add_task(self.name, task, **kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Latest status reported by the shard."""
+        return self.runner.get_agent_status(self.name)
+
+
+class ShardedAgentRunner:
+    """
+    Spread continuous agents across a pool of worker processes.
+
+    Each shard process builds its own providers and agents with
+    ``agent_factory`` and runs them as ordinary ContinuousAgents, so CPU-bound
+    work no longer shares one GIL. A supervisor thread in the parent collects
+    results and heartbeats over multiprocessing queues and restarts shards that
+    exit, stop sending heartbeats, or host an agent stuck on one task for more
+    than ``task_timeout`` (each heartbeat reports how long every agent has
+    been busy). Each shard has its own task and event queues, both replaced
+    on restart. Tasks can be added before ``start``; tasks a restarted shard
+    had not yet picked up are re-sent, and tasks already queued inside a shard
+    that dies are lost with it unless ``state_dir`` is set.
+    """
+
+    def __init__(
+        self,
+        agent_names: List[str],
+        num_shards: int = 2,
+        agent_factory: AgentFactory = default_agent_factory,
+        agent_kwargs: Optional[Dict[str, Any]] = None,
+        heartbeat_interval: float = 2.0,
+        heartbeat_timeout: float = 30.0,
+        max_restarts: int = 100,
+        start_method: Optional[str] = None,
+        task_timeout: Optional[float] = 600.0,
+        state_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            agent_names: Names of the agents to host
+            num_shards: Number of worker processes
+            agent_factory: Picklable callable building agents inside a shard
+            agent_kwargs: Keyword arguments for each ContinuousAgent
+            heartbeat_interval: Seconds between shard status reports
+            heartbeat_timeout: Restart a shard after this many silent seconds
+            max_restarts: Total restarts allowed across all shards
+            start_method: multiprocessing start method (None for the platform default)
+            task_timeout: Restart a shard whose agent has run one task this many
+                seconds (None disables the check)
+            state_dir: Directory for per-agent queue journals (None keeps
+                queues in memory only)
+        """
+        self.agent_names = list(agent_names)
+        self.num_shards = max(1, min(num_shards, len(self.agent_names) or 1))
+        self.agent_factory = agent_factory
+        self.agent_kwargs = agent_kwargs or {}
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_restarts = max_restarts
+        self.task_timeout = task_timeout
+        self.state_dir = state_dir
+        self.on_result_callback: Optional[Callable[[str, str], None]] = None
+
+        self._ctx = multiprocessing.get_context(start_method)
+        # One event queue per shard: a shard killed mid-write can only
+        # corrupt its own queue, which is replaced on restart
+        self._shards = [
+            _Shard(i, self.agent_names[i :: self.num_shards], self._ctx.Queue(), self._ctx.Queue())
+            for i in range(self.num_shards)
+        ]
+        self._lock = threading.RLock()
+        self._supervisor: Optional[threading.Thread] = None
+        self.is_running = False
+        self.restart_count = 0
+        self.errors: Deque[Dict[str, Any]] = deque(maxlen=MAX_ERRORS)
+
+    def shard_for(self, agent_name: str) -> int:
+        """
+        Find the shard hosting an agent.
+
+        Args:
+            agent_name: Agent name
+
+        Returns:
+            Shard index
+        """
+        return self.agent_names.index(agent_name) % self.num_shards
+
+    def agents(self) -> List[ShardAgentProxy]:
+        """Proxies for every hosted agent."""
+        return [ShardAgentProxy(self, name) for name in self.agent_names]
+
+    def start(self):
+        """Start every shard and the supervisor thread."""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+            for shard in self._shards:
+                self._spawn(shard)
+
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Stop every shard gracefully, terminating any that do not exit in time.
+
+        Args:
+            timeout: Maximum seconds to wait per shard
+        """
+        with self._lock:
+            self.is_running = False
+            shards = list(self._shards)
+
+        for shard in shards:
+            if shard.process and shard.process.is_alive():
+                shard.task_queue.put(("stop",))
+        for shard in shards:
+            if shard.process:
+                shard.process.join(timeout)
+                if shard.process.is_alive():
+                    shard.process.terminate()
+                    shard.process.join(1)
+
+        if self._supervisor:
+            self._supervisor.join(timeout=self.heartbeat_interval + 1)
+        self._drain_events()
+
+    def add_task(self, agent_name: str, task: str, **kwargs) -> bool:
+        """
+        Route a task to the shard hosting an agent.
+
+        Args:
+            agent_name: Agent to run the task
+            task: Task description
+            **kwargs: Passed to ContinuousAgent.add_task (priority, tenant, ...)
+
+        Returns:
+            True once the task is sent to the shard
+        """
+        shard = self._shards[self.shard_for(agent_name)]
+        shard.task_queue.put(("task", agent_name, task, kwargs))
+        return True
+
+    def ensure_shard(self, shard_id: int):
+        """Restart a shard if its process is not alive."""
+        with self._lock:
+            shard = self._shards[shard_id]
+            if self.is_running and not (shard.process and shard.process.is_alive()):
+                self._restart(shard, "process not running")
+
+    def is_agent_running(self, agent_name: str) -> bool:
+        """True while the agent's shard is alive and the agent reports running."""
+        shard = self._shards[self.shard_for(agent_name)]
+        alive = shard.process is not None and shard.process.is_alive()
+        return alive and shard.statuses.get(agent_name, {}).get("is_running", alive)
+
+    def get_agent_status(self, agent_name: str) -> Dict[str, Any]:
+        """
+        Latest ContinuousAgent status reported for an agent.
+
+        Args:
+            agent_name: Agent name
+
+        Returns:
+            Status dictionary in ContinuousAgent.get_status() shape
+        """
+        shard = self._shards[self.shard_for(agent_name)]
+        status = dict(shard.statuses.get(agent_name) or self._empty_status(agent_name))
+        status["is_running"] = self.is_agent_running(agent_name)
+        status["shard"] = shard.shard_id
+        return status
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Aggregate status across shards.
+
+        Returns:
+            Totals in ContinuousAgent.get_status() terms, per-agent statuses and
+            per-shard health
+        """
+        agents = {name: self.get_agent_status(name) for name in self.agent_names}
+        now = time.monotonic()
+        shards = []
+        for shard in self._shards:
+            alive = shard.process is not None and shard.process.is_alive()
+            shards.append(
+                {
+                    "shard_id": shard.shard_id,
+                    "pid": shard.process.pid if shard.process else None,
+                    "alive": alive,
+                    "heartbeat_age": round(now - shard.last_heartbeat, 1)
+                    if shard.last_heartbeat
+                    else None,
+                    "restarts": shard.restarts,
+                    "agents": shard.agent_names,
+                }
+            )
+
+        return {
+            "is_running": self.is_running,
+            "iteration_count": sum(s["iteration_count"] for s in agents.values()),
+            "tasks_pending": sum(s["tasks_pending"] for s in agents.values()),
+            "results_count": sum(s["results_count"] for s in agents.values()),
+            "restart_count": self.restart_count,
+            "agents": agents,
+            "shards": shards,
+        }
+
+    def _empty_status(self, agent_name: str) -> Dict[str, Any]:
+        """Status placeholder before the first heartbeat."""
+        return {
+            "agent_name": agent_name,
+            "is_running": False,
+            "iteration_count": 0,
+            "tasks_pending": 0,
+            "results_count": 0,
+            "busy_for": 0.0,
+            "max_iterations": self.agent_kwargs.get("max_iterations"),
+            "interval": self.agent_kwargs.get("interval", 60),
+        }
+
+    def _spawn(self, shard: _Shard):
+        """Start a shard process. Caller holds the lock."""
+        shard.process = self._ctx.Process(
+            target=_shard_main,
+            args=(
+                shard.shard_id,
+                shard.agent_names,
+                self.agent_factory,
+                self.agent_kwargs,
+                shard.task_queue,
+                shard.event_queue,
+                self.heartbeat_interval,
+                self.state_dir,
+            ),
+            name=f"agent-shard-{shard.shard_id}",
+            daemon=True,
+        )
+        shard.process.start()
+        shard.last_heartbeat = time.monotonic()
+        logger.info("Started shard %d (pid %d): %s", shard.shard_id, shard.process.pid,
+                    ", ".join(shard.agent_names))
+
+    def _restart(self, shard: _Shard, reason: str):
+        """Replace a failed shard process. Caller holds the lock."""
+        if self.restart_count >= self.max_restarts:
+            logger.error("Max restart limit (%d) reached; shard %d stays down",
+                         self.max_restarts, shard.shard_id)
+            return
+
+        logger.warning("Restarting shard %d: %s", shard.shard_id, reason)
+        if shard.process and shard.process.is_alive():
+            # Collect what it sent while it could still finish writing
+            self._drain_shard(shard)
+            shard.process.terminate()
+            shard.process.join(1)
+        self.restart_count += 1
+        shard.restarts += 1
+        shard.statuses = {}
+        # A killed process may hold either queue's lock, so start clean
+        undelivered = self._take_undelivered(shard)
+        shard.task_queue = self._ctx.Queue()
+        shard.event_queue = self._ctx.Queue()
+        for command in undelivered:
+            shard.task_queue.put(command)
+        self._spawn(shard)
+
+    def _take_undelivered(self, shard: _Shard) -> List[tuple]:
+        """Read tasks the old process never picked up from its task queue."""
+        undelivered = []
+        while True:
+            try:
+                # Recent puts may still be in this process's feeder thread
+                command = shard.task_queue.get(timeout=EVENT_POLL_INTERVAL)
+            except queue.Empty:
+                break
+            except Exception as e:
+                # The killed reader may have left a partial message behind
+                self.errors.append({"agent": None, "task": None,
+                                    "error": f"Shard {shard.shard_id} task queue lost: {e}"})
+                logger.error("Shard %d task queue unreadable after restart; "
+                             "remaining queued tasks are lost: %s", shard.shard_id, e)
+                break
+            if command[0] == "task":
+                undelivered.append(command)
+        if undelivered:
+            logger.warning("Re-sending %d task(s) not yet delivered to shard %d",
+                           len(undelivered), shard.shard_id)
+        return undelivered
+
+    def _supervise(self):
+        """Collect events and restart unhealthy shards."""
+        while self.is_running:
+            self._drain_events(timeout=min(1.0, self.heartbeat_interval))
+
+            with self._lock:
+                if not self.is_running:
+                    break
+                now = time.monotonic()
+                for shard in self._shards:
+                    if not shard.process.is_alive():
+                        self._restart(shard, f"exit code {shard.process.exitcode}")
+                    elif now - shard.last_heartbeat > self.heartbeat_timeout:
+                        self._restart(shard, "heartbeat timeout")
+                    else:
+                        stuck = self._stuck_agent(shard, now)
+                        if stuck is not None:
+                            self._restart(shard, f"agent {stuck} stuck on one task")
+
+    def _stuck_agent(self, shard: _Shard, now: float) -> Optional[str]:
+        """Name of an agent busy with one task past ``task_timeout``, if any."""
+        if self.task_timeout is None:
+            return None
+        for name, status in shard.statuses.items():
+            busy_for = status.get("busy_for") or 0.0
+            # The task has kept running since the heartbeat reported it
+            if busy_for and busy_for + now - shard.last_heartbeat > self.task_timeout:
+                return name
+        return None
+
+    def _drain_events(self, timeout: float = 0.0):
+        """Handle every queued event, waiting up to timeout for the first one."""
+        deadline = time.monotonic() + timeout
+        while True:
+            handled = sum(self._drain_shard(shard) for shard in self._shards)
+            remaining = deadline - time.monotonic()
+            if handled or remaining <= 0:
+                return
+            time.sleep(min(EVENT_POLL_INTERVAL, remaining))
+
+    def _drain_shard(self, shard: _Shard) -> int:
+        """Handle every event queued by one shard without waiting."""
+        handled = 0
+        while True:
+            try:
+                event = shard.event_queue.get(block=False)
+            except queue.Empty:
+                return handled
+            self._handle_event(event)
+            handled += 1
+
+    def _handle_event(self, event):
+        """Apply one event from a shard."""
+        kind, shard_id = event[0], event[1]
+        shard = self._shards[shard_id]
+
+        if kind == "heartbeat":
+            shard.last_heartbeat = time.monotonic()
+            shard.statuses = event[2]
+        elif kind == "result":
+            _, _, name, task, result = event
+            if self.on_result_callback:
+                try:
+                    self.on_result_callback(task, result)
+                except Exception as e:
+                    logger.error("Result callback failed for %s: %s", name, e)
+        elif kind == "error":
+            _, _, name, task, error = event
+            self.errors.append({"agent": name, "task": task, "error": error})
+            logger.warning("Shard %d rejected task for %s: %s", shard_id, name, error)
@@ -0,0 +1,163 @@
+"""Wake idle queue workers when tasks are submitted, using Unix datagram sockets."""
+
+import itertools
+import logging
+import os
+import socket
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SOCKET_SUFFIX = ".sock"
+
+_listener_ids = itertools.count()
+
+
+def notify_listeners(directory: str, message: bytes = b"task") -> int:
+    """
+    Send a wakeup datagram to every listener registered in a directory.
+
+    Sockets left behind by workers that exited are removed. Failures never
+    propagate: submitters must not fail because a worker is gone, and workers
+    fall back to polling anyway.
+
+    Args:
+        directory: Listener directory shared by submitters and workers
+        message: Payload delivered to each listener
+
+    Returns:
+        Number of listeners notified
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return 0
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(SOCKET_SUFFIX)]
+    except FileNotFoundError:
+        return 0
+    if not names:
+        return 0
+
+    notified = 0
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sender.setblocking(False)
+    try:
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                sender.sendto(message, path)
+                notified += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody is bound to it any more
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                # Listener's buffer is full, so it already has a pending wakeup
+                notified += 1
+            except OSError as e:
+                logger.debug("Could not notify %s: %s", path, e)
+    finally:
+        sender.close()
+    return notified
+
+
+class QueueListener:
+    """
+    Block until a task is submitted, without touching the queue while idle.
+
+    Each listener binds a Unix datagram socket in a shared directory;
+    ``notify_listeners`` sends one datagram to each of them. Waiting is a single
+    blocking ``recv`` with the fallback poll interval as its timeout, so an idle
+    worker does no I/O and wakes within milliseconds of a submission. Where Unix
+    sockets are unavailable the listener degrades to sleeping for the timeout.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Register a listener.
+
+        Args:
+            directory: Listener directory shared with submitters (created if missing)
+        """
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._sock: Optional[socket.socket] = None
+        self.wakeups = 0
+
+        if not hasattr(socket, "AF_UNIX"):
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}-{next(_listener_ids)}{SOCKET_SUFFIX}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+            sock.bind(path)
+        except OSError as e:
+            sock.close()
+            logger.warning("Queue notifications unavailable, polling instead: %s", e)
+            return
+        self.path = path
+        self._sock = sock
+
+    @property
+    def is_push(self) -> bool:
+        """True if wakeups are delivered by notification rather than polling."""
+        return self._sock is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a notification.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if woken by a notification, False if the timeout elapsed
+        """
+        if self._sock is None:
+            time.sleep(timeout if timeout is not None else 1.0)
+            return False
+
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.recv(64)
+        except socket.timeout:
+            return False
+
+        # Collapse a burst of submissions into one wakeup
+        self._sock.setblocking(False)
+        try:
+            while True:
+                self._sock.recv(64)
+        except (BlockingIOError, InterruptedError):
+            pass
+        self.wakeups += 1
+        return True
+
+    def wake(self):
+        """Wake this listener (e.g. from a signal handler during shutdown)."""
+        if self._sock is not None:
+            try:
+                self._sock.sendto(b"wake", self.path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Unregister the listener."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "QueueListener":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
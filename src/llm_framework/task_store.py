@@ -0,0 +1,926 @@
+"""Transactional task queue storage backed by SQLite in WAL mode."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .scheduler import PRIORITY_CLASSES, priority_class_for
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_type TEXT NOT NULL,
+    task TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    priority_class TEXT NOT NULL DEFAULT 'normal',
+    class_rank INTEGER NOT NULL DEFAULT 1,
+    tenant TEXT NOT NULL DEFAULT 'default',
+    status TEXT NOT NULL DEFAULT 'pending',
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    result TEXT,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    dedup_key TEXT,
+    duplicate_of INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim
+    ON tasks (agent_type, status, class_rank, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status
+    ON tasks (status, submitted_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Duplicates store no result of their own; they read the original's
+TASK_COLUMNS = (
+    "id, agent_type, task, priority, priority_class, tenant, status, "
+    "submitted_at, started_at, completed_at, "
+    "COALESCE(result, (SELECT o.result FROM tasks o WHERE o.id = tasks.duplicate_of)) AS result, "
+    "worker_id, lease_expires_at, attempts, last_error, dedup_key, duplicate_of"
+)
+
+# Columns added after the first schema version, created on open if missing
+ADDED_COLUMNS = (
+    ("worker_id", "TEXT"),
+    ("lease_expires_at", "REAL"),
+    ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+    ("last_error", "TEXT"),
+    ("dedup_key", "TEXT"),
+    ("duplicate_of", "INTEGER"),
+)
+
+# Original-task lookups run on every deduplicated insert. Without the hint
+# SQLite prefers idx_tasks_duplicate_of (every original has duplicate_of
+# NULL), which scans all originals and makes inserts O(n).
+FIND_ACTIVE_ORIGINAL = (
+    "SELECT id, status FROM tasks INDEXED BY idx_tasks_dedup WHERE dedup_key = ? "
+    "AND status IN ('pending', 'in-progress') AND duplicate_of IS NULL "
+    "ORDER BY id LIMIT 1"
+)
+FIND_FRESH_ORIGINAL = (
+    "SELECT id, status FROM tasks INDEXED BY idx_tasks_dedup WHERE dedup_key = ? "
+    "AND status = 'completed' AND duplicate_of IS NULL AND completed_at >= ? "
+    "ORDER BY id DESC LIMIT 1"
+)
+
+STATUS_PENDING = "pending"
+STATUS_IN_PROGRESS = "in-progress"
+STATUS_COMPLETED = "completed"
+STATUS_DEAD = "dead"
+STATUS_DUPLICATE = "duplicate"
+
+
+# Full-text index over task and result text, kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE tasks_fts USING fts5(task, result, content='tasks', content_rowid='id');
+CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, task, result) VALUES (new.id, new.task, new.result);
+END;
+CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, task, result)
+        VALUES ('delete', old.id, old.task, old.result);
+END;
+CREATE TRIGGER tasks_fts_update AFTER UPDATE OF task, result ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, task, result)
+        VALUES ('delete', old.id, old.task, old.result);
+    INSERT INTO tasks_fts (rowid, task, result) VALUES (new.id, new.task, new.result);
+END;
+INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
+"""
+
+
+def content_key(agent_type: str, task: str) -> str:
+    """
+    Deduplication key for a task's content.
+
+    Args:
+        agent_type: Agent type
+        task: Task text
+
+    Returns:
+        SHA-256 hex digest of the agent type and task text
+    """
+    return hashlib.sha256(f"{agent_type}\0{task}".encode("utf-8")).hexdigest()
+
+
+class SQLiteTaskStore:
+    """
+    Task queue stored in a SQLite database.
+
+    Every operation touches only the rows it needs through indexes, instead of
+    rewriting the whole queue. Claims run in an immediate transaction, so two
+    workers can never take the same task, and AUTOINCREMENT ids are never
+    reused. WAL mode lets readers proceed while a writer commits.
+
+    A claim is a lease: it records the worker and an expiry time. Workers renew
+    the lease while they run a long task. Tasks whose lease expires, because the
+    worker crashed or hung, go back to pending on the next claim; after
+    ``max_attempts`` claims they are moved to the "dead" (dead-letter) status
+    instead.
+
+    Tasks may carry a deduplication key (an idempotency key or ``content_key``).
+    A task whose key matches a pending or running task is stored with status
+    "duplicate" and completed together with that original, sharing its result;
+    one whose key matches a task completed within ``fresh_for`` seconds is
+    completed immediately from the stored result.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        busy_timeout: float = 30.0,
+        lease_duration: float = 300.0,
+        max_attempts: int = 3,
+    ):
+        """
+        Open (and create if needed) a task database.
+
+        Args:
+            path: Database file path
+            busy_timeout: Seconds to wait for a competing writer's lock
+            lease_duration: Default seconds a claim is held without renewal
+            max_attempts: Claims allowed before a task is dead-lettered
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.lease_duration = lease_duration
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._add_missing_columns(conn)
+        self.has_fts = self._create_fts(conn)
+
+    def _add_missing_columns(self, conn: sqlite3.Connection):
+        """Upgrade databases created by earlier versions and index added columns."""
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)")}
+        for name, definition in ADDED_COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {name} {definition}")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (status, lease_expires_at)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_dedup ON tasks (dedup_key, status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_duplicate_of ON tasks (duplicate_of)")
+        # Fair claims: flows per agent type and the head of each flow
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_flow "
+            "ON tasks (agent_type, status, tenant, class_rank, priority DESC, id)"
+        )
+        # Newest-first result pages by status, optionally per agent type
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_history ON tasks (status, id)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_agent_history ON tasks (agent_type, status, id)"
+        )
+
+    def _create_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the full-text index if SQLite has FTS5; returns availability."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            conn.executescript(f"BEGIN IMMEDIATE;{FTS_SCHEMA}COMMIT;")
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if "already exists" in str(e):
+                # Another process created it first
+                return True
+            if "fts5" not in str(e):
+                raise
+            logger.warning("SQLite lacks FTS5; result search falls back to LIKE")
+            return False
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run statements in one immediate (write-locked) transaction.
+
+        Yields:
+            The thread's connection
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def add(
+        self,
+        agent_type: str,
+        task: str,
+        priority: int = 0,
+        priority_class: Optional[str] = None,
+        tenant: str = "default",
+        dedup_key: Optional[str] = None,
+        fresh_for: Optional[float] = None,
+    ) -> int:
+        """
+        Insert a pending task.
+
+        Args:
+            agent_type: Agent type that should run the task
+            task: Task description
+            priority: Numeric priority (higher first)
+            priority_class: "interactive", "normal" or "background"
+                (derived from priority when omitted)
+            tenant: Submitter used for fair scheduling
+            dedup_key: Idempotency key or ``content_key`` (None disables dedup)
+            fresh_for: Seconds a completed result with the same key may be
+                reused (None never reuses completed results)
+
+        Returns:
+            The new task id
+        """
+        task_entry = {
+            "agent_type": agent_type,
+            "task": task,
+            "priority": priority,
+            "priority_class": priority_class,
+            "tenant": tenant,
+            "dedup_key": dedup_key,
+        }
+        return self.add_many([task_entry], fresh_for=fresh_for)[0]
+
+    def add_many(
+        self, tasks: Iterable[Dict[str, Any]], fresh_for: Optional[float] = None
+    ) -> List[int]:
+        """
+        Insert several pending tasks in one transaction.
+
+        Args:
+            tasks: Dictionaries with ``agent_type`` and ``task`` and optionally
+                ``priority``, ``priority_class``, ``tenant`` and ``dedup_key``
+            fresh_for: Seconds a completed result with the same key may be reused
+
+        Returns:
+            The new task ids, in input order
+        """
+        now = datetime.now()
+        ids = []
+        with self.transaction() as conn:
+            for t in tasks:
+                ids.append(self._insert(conn, t, now, fresh_for))
+        return ids
+
+    def _insert(
+        self,
+        conn: sqlite3.Connection,
+        t: Dict[str, Any],
+        now: datetime,
+        fresh_for: Optional[float],
+    ) -> int:
+        """Insert one task inside an open transaction, collapsing duplicates."""
+        priority = t.get("priority", 0)
+        priority_class = t.get("priority_class") or priority_class_for(priority)
+        class_rank = PRIORITY_CLASSES.index(priority_class)
+        dedup_key = t.get("dedup_key")
+
+        status, original, completed_at = STATUS_PENDING, None, None
+        if dedup_key is not None:
+            original = self._find_original(conn, dedup_key, now, fresh_for)
+            if original is not None:
+                if original["status"] == STATUS_COMPLETED:
+                    status, completed_at = STATUS_COMPLETED, now.isoformat()
+                else:
+                    status = STATUS_DUPLICATE
+                    # The shared execution runs at the most urgent requested priority
+                    conn.execute(
+                        "UPDATE tasks SET priority = MAX(priority, ?), "
+                        "priority_class = CASE WHEN class_rank > ? THEN ? ELSE priority_class END, "
+                        "class_rank = MIN(class_rank, ?) WHERE id = ? AND status = 'pending'",
+                        (priority, class_rank, priority_class, class_rank, original["id"]),
+                    )
+                self._increment(conn, "deduplicated")
+
+        cursor = conn.execute(
+            "INSERT INTO tasks (agent_type, task, priority, priority_class, class_rank, "
+            "tenant, status, submitted_at, completed_at, dedup_key, duplicate_of) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                t["agent_type"],
+                t["task"],
+                priority,
+                priority_class,
+                class_rank,
+                t.get("tenant") or "default",
+                status,
+                now.isoformat(),
+                completed_at,
+                dedup_key,
+                original["id"] if original is not None else None,
+            ),
+        )
+        return cursor.lastrowid
+
+    def _find_original(
+        self,
+        conn: sqlite3.Connection,
+        dedup_key: str,
+        now: datetime,
+        fresh_for: Optional[float],
+    ) -> Optional[sqlite3.Row]:
+        """Find the task a new submission with this key should share."""
+        row = conn.execute(FIND_ACTIVE_ORIGINAL, (dedup_key,)).fetchone()
+        if row is not None or fresh_for is None:
+            return row
+
+        cutoff = datetime.fromtimestamp(now.timestamp() - fresh_for).isoformat()
+        return conn.execute(FIND_FRESH_ORIGINAL, (dedup_key, cutoff)).fetchone()
+
+    def claim(
+        self,
+        agent_type: str,
+        worker_id: Optional[str] = None,
+        lease: Optional[float] = None,
+        tenant: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically lease the most urgent pending task of an agent type.
+
+        Args:
+            agent_type: Agent type to claim for
+            worker_id: Identifier of the claiming worker
+            lease: Lease duration in seconds (defaults to ``lease_duration``)
+            tenant: Only claim this tenant's tasks
+
+        Returns:
+            The claimed task, or None if none is pending
+        """
+        with self.transaction() as conn:
+            self._requeue_expired(conn)
+            ids = self._pending_ids(conn, agent_type, 1, tenant)
+            if not ids:
+                return None
+            return self._mark_started(conn, ids[0], worker_id, lease)
+
+    def claim_batch(
+        self,
+        agent_type: str,
+        n: int,
+        worker_id: Optional[str] = None,
+        lease: Optional[float] = None,
+        tenant: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Atomically lease up to ``n`` pending tasks of an agent type.
+
+        Tasks are taken in the same order as ``claim`` and share one lease.
+
+        Args:
+            agent_type: Agent type to claim for
+            n: Maximum number of tasks
+            worker_id: Identifier of the claiming worker
+            lease: Lease duration in seconds (defaults to ``lease_duration``)
+            tenant: Only claim this tenant's tasks
+
+        Returns:
+            The claimed tasks in dispatch order (empty if none are pending)
+        """
+        with self.transaction() as conn:
+            self._requeue_expired(conn)
+            ids = self._pending_ids(conn, agent_type, n, tenant)
+            if not ids:
+                return []
+
+            marks = ", ".join("?" * len(ids))
+            conn.execute(
+                "UPDATE tasks SET status = 'in-progress', started_at = ?, worker_id = ?, "
+                f"lease_expires_at = ?, attempts = attempts + 1 WHERE id IN ({marks})",
+                (datetime.now().isoformat(), worker_id, self._expiry(lease), *ids),
+            )
+            return [self._fetch(conn, task_id) for task_id in ids]
+
+    def _pending_ids(
+        self,
+        conn: sqlite3.Connection,
+        agent_type: str,
+        n: int,
+        tenant: Optional[str],
+    ) -> List[int]:
+        """Ids of the ``n`` most urgent pending tasks, optionally of one tenant."""
+        if tenant is None:
+            rows = conn.execute(
+                "SELECT id FROM tasks WHERE agent_type = ? AND status = 'pending' "
+                "ORDER BY class_rank, priority DESC, id LIMIT ?",
+                (agent_type, n),
+            )
+        else:
+            rows = conn.execute(
+                "SELECT id FROM tasks WHERE agent_type = ? AND status = 'pending' "
+                "AND tenant = ? ORDER BY class_rank, priority DESC, id LIMIT ?",
+                (agent_type, tenant, n),
+            )
+        return [row["id"] for row in rows]
+
+    def pending_flows(self, agent_types: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        List the (agent type, tenant) pairs that have pending tasks.
+
+        Walks the flow index one tenant at a time, so the cost grows with the
+        number of flows rather than the number of pending tasks.
+
+        Args:
+            agent_types: Agent types to look at
+
+        Returns:
+            One dictionary per flow with ``agent_type``, ``tenant`` and the
+            ``priority_class`` of its most urgent pending task
+        """
+        conn = self._connect()
+        flows = []
+        for agent_type in agent_types:
+            row = conn.execute(
+                "SELECT tenant, priority_class FROM tasks "
+                "WHERE agent_type = ? AND status = 'pending' "
+                "ORDER BY tenant, class_rank, priority DESC, id LIMIT 1",
+                (agent_type,),
+            ).fetchone()
+            while row is not None:
+                flows.append({"agent_type": agent_type, **dict(row)})
+                row = conn.execute(
+                    "SELECT tenant, priority_class FROM tasks "
+                    "WHERE agent_type = ? AND status = 'pending' AND tenant > ? "
+                    "ORDER BY tenant, class_rank, priority DESC, id LIMIT 1",
+                    (agent_type, row["tenant"]),
+                ).fetchone()
+        return flows
+
+    def claim_id(
+        self,
+        task_id: int,
+        worker_id: Optional[str] = None,
+        lease: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically lease a specific task if it is still pending.
+
+        Args:
+            task_id: Task to claim
+            worker_id: Identifier of the claiming worker
+            lease: Lease duration in seconds (defaults to ``lease_duration``)
+
+        Returns:
+            The claimed task, or None if it is no longer pending
+        """
+        with self.transaction() as conn:
+            return self._mark_started(conn, task_id, worker_id, lease)
+
+    def _mark_started(
+        self,
+        conn: sqlite3.Connection,
+        task_id: int,
+        worker_id: Optional[str],
+        lease: Optional[float],
+    ) -> Optional[Dict[str, Any]]:
+        """Move a pending task to in-progress inside an open transaction."""
+        cursor = conn.execute(
+            "UPDATE tasks SET status = 'in-progress', started_at = ?, worker_id = ?, "
+            "lease_expires_at = ?, attempts = attempts + 1 "
+            "WHERE id = ? AND status = 'pending'",
+            (datetime.now().isoformat(), worker_id, self._expiry(lease), task_id),
+        )
+        if cursor.rowcount == 0:
+            return None
+        return self._fetch(conn, task_id)
+
+    def _expiry(self, lease: Optional[float]) -> float:
+        """Lease expiry timestamp for a lease starting now."""
+        return time.time() + (self.lease_duration if lease is None else lease)
+
+    def renew(self, task_id: int, worker_id: Optional[str], lease: Optional[float] = None) -> bool:
+        """
+        Extend a lease held by a worker.
+
+        Args:
+            task_id: Leased task
+            worker_id: Worker that holds the lease
+            lease: New lease duration in seconds from now
+
+        Returns:
+            False if the worker no longer holds the task (the lease expired and
+            the task was re-queued or claimed by someone else)
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires_at = ? "
+                "WHERE id = ? AND status = 'in-progress' AND worker_id IS ?",
+                (self._expiry(lease), task_id, worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, task_id: int, result: str, worker_id: Optional[str] = None) -> bool:
+        """
+        Mark a leased task completed with its result.
+
+        Args:
+            task_id: Task id
+            result: Result text
+            worker_id: Worker that holds the lease
+
+        Returns:
+            False if the worker no longer holds the task
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'completed', result = ?, completed_at = ?, "
+                "lease_expires_at = NULL "
+                "WHERE id = ? AND status = 'in-progress' AND worker_id IS ?",
+                (result, datetime.now().isoformat(), task_id, worker_id),
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            # Fan the result out to duplicates submitted while it ran
+            conn.execute(
+                "UPDATE tasks SET status = 'completed', completed_at = ? "
+                "WHERE duplicate_of = ? AND status = 'duplicate'",
+                (datetime.now().isoformat(), task_id),
+            )
+            return True
+
+    def fail(self, task_id: int, error: str, worker_id: Optional[str] = None) -> Optional[str]:
+        """
+        Give up a leased task after an error.
+
+        The task returns to pending for another attempt, or is dead-lettered
+        once it has been claimed ``max_attempts`` times.
+
+        Args:
+            task_id: Task id
+            error: Error description, kept in ``last_error``
+            worker_id: Worker that holds the lease
+
+        Returns:
+            The task's new status, or None if the worker no longer holds it
+        """
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM tasks "
+                "WHERE id = ? AND status = 'in-progress' AND worker_id IS ?",
+                (task_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return None
+
+            status = STATUS_DEAD if row["attempts"] >= self.max_attempts else STATUS_PENDING
+            conn.execute(
+                "UPDATE tasks SET status = ?, last_error = ?, worker_id = NULL, "
+                "lease_expires_at = NULL WHERE id = ?",
+                (status, error, task_id),
+            )
+            if status == STATUS_DEAD:
+                self._dead_letter_duplicates(conn)
+            return status
+
+    def requeue_expired(self) -> int:
+        """
+        Release every task whose lease has expired.
+
+        Returns:
+            Number of tasks re-queued or dead-lettered
+        """
+        with self.transaction() as conn:
+            return self._requeue_expired(conn)
+
+    def _requeue_expired(self, conn: sqlite3.Connection) -> int:
+        """Release expired leases inside an open transaction."""
+        now = time.time()
+        dead = conn.execute(
+            "UPDATE tasks SET status = 'dead', last_error = 'lease expired', "
+            "worker_id = NULL, lease_expires_at = NULL "
+            "WHERE status = 'in-progress' AND lease_expires_at < ? AND attempts >= ?",
+            (now, self.max_attempts),
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE tasks SET status = 'pending', last_error = 'lease expired', "
+            "worker_id = NULL, lease_expires_at = NULL "
+            "WHERE status = 'in-progress' AND lease_expires_at < ?",
+            (now,),
+        ).rowcount
+        if dead:
+            self._dead_letter_duplicates(conn)
+        return dead + requeued
+
+    def _dead_letter_duplicates(self, conn: sqlite3.Connection):
+        """Dead-letter duplicates whose original was dead-lettered."""
+        conn.execute(
+            "UPDATE tasks SET status = 'dead', last_error = ("
+            "SELECT o.last_error FROM tasks o WHERE o.id = tasks.duplicate_of) "
+            "WHERE status = 'duplicate' AND duplicate_of IN "
+            "(SELECT id FROM tasks WHERE status = 'dead')"
+        )
+
+    def retry(self, task_id: int) -> bool:
+        """
+        Move a dead-lettered task back to pending with a fresh attempt count.
+
+        Args:
+            task_id: Task id
+
+        Returns:
+            False if the task is not dead-lettered
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0 "
+                "WHERE id = ? AND status = 'dead' AND duplicate_of IS NULL",
+                (task_id,),
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            conn.execute(
+                "UPDATE tasks SET status = 'duplicate' WHERE duplicate_of = ? AND status = 'dead'",
+                (task_id,),
+            )
+            return True
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one task.
+
+        Args:
+            task_id: Task id
+
+        Returns:
+            Task dictionary, or None if it does not exist
+        """
+        return self._fetch(self._connect(), task_id)
+
+    def _fetch(self, conn: sqlite3.Connection, task_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch one task on a given connection."""
+        row = conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_tasks(
+        self,
+        status: Optional[str] = None,
+        agent_types: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        List tasks in id order.
+
+        Args:
+            status: Only tasks in this status
+            agent_types: Only tasks for these agent types
+
+        Returns:
+            List of task dictionaries
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if agent_types is not None:
+            agent_types = list(agent_types)
+            clauses.append(f"agent_type IN ({', '.join('?' * len(agent_types))})")
+            params.extend(agent_types)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks{where} ORDER BY id", params
+        )
+        return [dict(row) for row in rows]
+
+    def search(
+        self,
+        status: Optional[str] = STATUS_COMPLETED,
+        agent_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: int = 20,
+        before_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Page through tasks, newest first.
+
+        Pages are keyset-paginated: pass the smallest id of one page as
+        ``before_id`` to get the next, so deep pages cost the same as the first.
+
+        Args:
+            status: Only tasks in this status (None for any)
+            agent_type: Only tasks for this agent type
+            since: Only tasks completed (or, for unfinished tasks, submitted)
+                at or after this ISO timestamp
+            until: Only tasks completed or submitted before this ISO timestamp
+            text: Words that must appear in the task or result text
+            limit: Page size
+            before_id: Only tasks with a smaller id
+
+        Returns:
+            Up to ``limit`` task dictionaries in descending id order
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if agent_type is not None:
+            clauses.append("agent_type = ?")
+            params.append(agent_type)
+        if since is not None:
+            clauses.append("COALESCE(completed_at, submitted_at) >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("COALESCE(completed_at, submitted_at) < ?")
+            params.append(until)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if text:
+            if self.has_fts:
+                # Quote each word so user input is never parsed as FTS syntax
+                query = " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+                clauses.append("id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+                params.append(query)
+            else:
+                for word in text.split():
+                    clauses.append("(task LIKE ? OR result LIKE ?)")
+                    params.extend([f"%{word}%"] * 2)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks{where} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, status: Optional[str] = None, agent_type: Optional[str] = None) -> int:
+        """
+        Count tasks.
+
+        Args:
+            status: Only tasks in this status
+            agent_type: Only tasks for this agent type
+
+        Returns:
+            Number of matching tasks
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if agent_type is not None:
+            clauses.append("agent_type = ?")
+            params.append(agent_type)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._connect().execute(f"SELECT COUNT(*) FROM tasks{where}", params).fetchone()[0]
+
+    def count_by_agent(self, status: str) -> Dict[str, int]:
+        """
+        Count tasks in a status per agent type.
+
+        Args:
+            status: Task status
+
+        Returns:
+            Mapping of agent type to count
+        """
+        rows = self._connect().execute(
+            "SELECT agent_type, COUNT(*) FROM tasks WHERE status = ? GROUP BY agent_type",
+            (status,),
+        )
+        return {agent_type: n for agent_type, n in rows}
+
+    def oldest_submitted(
+        self, status: str = "pending", agent_type: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Submission time of the oldest task in a status.
+
+        Args:
+            status: Task status
+            agent_type: Only tasks for this agent type
+
+        Returns:
+            ISO timestamp, or None if there are no such tasks
+        """
+        if agent_type is None:
+            row = self._connect().execute(
+                "SELECT MIN(submitted_at) FROM tasks WHERE status = ?", (status,)
+            ).fetchone()
+        else:
+            row = self._connect().execute(
+                "SELECT MIN(submitted_at) FROM tasks WHERE status = ? AND agent_type = ?",
+                (status, agent_type),
+            ).fetchone()
+        return row[0]
+
+    def increment_counter(self, name: str, amount: int = 1):
+        """
+        Increment a named counter.
+
+        Args:
+            name: Counter name
+            amount: Amount to add
+        """
+        with self.transaction() as conn:
+            self._increment(conn, name, amount)
+
+    def _increment(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        """Increment a counter inside an open transaction."""
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get_counters(self) -> Dict[str, int]:
+        """
+        Get all counters.
+
+        Returns:
+            Mapping of counter name to value
+        """
+        return dict(self._connect().execute("SELECT name, value FROM counters").fetchall())
+
+    def import_json(self, queue_file: str) -> int:
+        """
+        Import tasks from a legacy JSON queue file in one transaction.
+
+        Original ids are not kept; imported tasks get fresh ids. In-progress
+        tasks have no recorded owner, so they get a default lease and are
+        re-queued if no worker completes them before it expires.
+
+        Args:
+            queue_file: Path of the JSON queue written by earlier versions
+
+        Returns:
+            Number of tasks imported
+        """
+        with open(queue_file, "r", encoding="utf-8") as f:
+            tasks = json.load(f)
+
+        lease_expiry = self._expiry(None)
+        with self.transaction() as conn:
+            for t in tasks:
+                priority = t.get("priority", 0)
+                priority_class = t.get("priority_class") or priority_class_for(priority)
+                status = t.get("status", STATUS_PENDING)
+                conn.execute(
+                    "INSERT INTO tasks (agent_type, task, priority, priority_class, class_rank, "
+                    "tenant, status, submitted_at, started_at, completed_at, result, "
+                    "lease_expires_at, attempts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        t["agent_type"],
+                        t["task"],
+                        priority,
+                        priority_class,
+                        PRIORITY_CLASSES.index(priority_class),
+                        t.get("tenant", "default"),
+                        status,
+                        t.get("submitted_at") or datetime.now().isoformat(),
+                        t.get("started_at"),
+                        t.get("completed_at"),
+                        t.get("result"),
+                        lease_expiry if status == STATUS_IN_PROGRESS else None,
+                        1 if status == STATUS_IN_PROGRESS else 0,
+                    ),
+                )
+        return len(tasks)
@@ -0,0 +1,281 @@
+"""Append-only JSONL work log with buffered writes, rotation and a streaming reader."""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkLogWriter:
+    """
+    Append work-log entries as JSON lines.
+
+    Each entry costs one buffered write, however long the log grows. Buffered
+    lines are flushed every ``flush_every`` entries and on ``close``, and a
+    timer flushes whatever is still buffered ``flush_interval`` seconds after
+    the previous flush, so a quiet agent's last entries reach the file too.
+    When the file exceeds ``max_bytes`` or has been written to for ``max_age``
+    seconds it is rotated like ``logging.handlers.RotatingFileHandler``:
+    ``log`` becomes ``log.1`` (``log.1.gz`` when compressing), older files
+    shift up and only ``backups`` are kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = 10 * 1024 * 1024,
+        max_age: Optional[float] = 24 * 3600,
+        backups: int = 5,
+        compress: bool = False,
+        flush_every: int = 50,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Initialize the writer (the file is opened on the first append).
+
+        Args:
+            path: Log file path
+            max_bytes: Rotate once the file reaches this size (None disables)
+            max_age: Rotate once the file has been written to for this many
+                seconds (None disables)
+            backups: Rotated files kept
+            compress: Gzip rotated files
+            flush_every: Entries buffered before a flush
+            flush_interval: Maximum seconds an entry stays buffered
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.compress = compress
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._pending = 0
+        self._last_flush = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self.rotations = 0
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Add one entry.
+
+        Args:
+            entry: JSON-serialisable entry
+        """
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._open()
+            elif self._should_rotate():
+                self._rotate()
+                self._open()
+
+            self._file.write(line)
+            self._size += len(line.encode("utf-8"))
+            self._pending += 1
+            wait = self.flush_interval - (time.monotonic() - self._last_flush)
+            if self._pending >= self.flush_every or wait <= 0:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write buffered entries to the file."""
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+
+    def close(self):
+        """Flush and close the file."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+                self._file = None
+
+    def _timed_flush(self):
+        """Flush entries left buffered since the last flush (timer thread)."""
+        with self._lock:
+            self._timer = None
+            if self._file is not None and self._pending:
+                self._flush()
+
+    def _open(self):
+        """Open the log for appending. Caller must hold the lock."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._opened_at = time.monotonic()
+        self._last_flush = self._opened_at
+
+    def _flush(self):
+        """Flush buffered lines. Caller must hold the lock."""
+        self._file.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _should_rotate(self) -> bool:
+        """Check the size and age limits. Caller must hold the lock."""
+        if self.max_bytes is not None and self._size >= self.max_bytes:
+            return True
+        return self.max_age is not None and self._size > 0 and \
+            time.monotonic() - self._opened_at >= self.max_age
+
+    def _rotate(self):
+        """Close the current file and shift the backups. Caller must hold the lock."""
+        self._flush()
+        self._file.close()
+        self._file = None
+
+        for ext in (".gz", ""):
+            oldest = f"{self.path}.{self.backups}{ext}"
+            if os.path.exists(oldest):
+                os.remove(oldest)
+        for i in range(self.backups - 1, 0, -1):
+            for ext in (".gz", ""):
+                source = f"{self.path}.{i}{ext}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{i + 1}{ext}")
+
+        if self.backups < 1:
+            os.remove(self.path)
+        elif self.compress:
+            with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                for chunk in iter(lambda: src.read(1 << 16), b""):
+                    dst.write(chunk)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, f"{self.path}.1")
+        self.rotations += 1
+
+
+def log_files(path: str) -> List[str]:
+    """
+    List a log's files, oldest first (rotated backups, then the current file).
+
+    Args:
+        path: Current log file path
+
+    Returns:
+        Existing file paths
+    """
+    rotated = []
+    directory = os.path.dirname(os.path.abspath(path))
+    prefix = os.path.basename(path) + "."
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        number = name[len(prefix):].split(".", 1)[0]
+        if number.isdigit():
+            rotated.append((int(number), os.path.join(directory, name)))
+
+    files = [p for _, p in sorted(rotated, reverse=True)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def _open_log(path: str):
+    """Open a current or rotated log file for reading."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def read_work_log(path: str, include_rotated: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Stream entries, oldest first, without loading the log into memory.
+
+    Args:
+        path: Current log file path
+        include_rotated: Also read rotated backups
+
+    Yields:
+        Entries (a partially written last line is skipped)
+    """
+    files = log_files(path) if include_rotated else [p for p in [path] if os.path.exists(path)]
+    for file_path in files:
+        with _open_log(file_path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def tail_work_log(path: str, n: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get the last entries of a log.
+
+    Only the end of the current file is read; rotated files are read (newest
+    first) only when the current file holds fewer than ``n`` entries.
+
+    Args:
+        path: Current log file path
+        n: Number of entries
+
+    Returns:
+        Up to ``n`` entries, oldest first
+    """
+    entries: List[Dict[str, Any]] = []
+    for file_path in reversed(log_files(path)):
+        needed = n - len(entries)
+        if needed <= 0:
+            break
+        wanted = needed
+        while True:
+            lines = _last_lines(file_path, wanted)
+            parsed = []
+            for line in lines:
+                try:
+                    parsed.append(json.loads(line))
+                except ValueError:
+                    continue
+            # Unparseable lines (e.g. a torn last write) mean reading further back
+            if len(parsed) >= needed or len(lines) < wanted:
+                break
+            wanted *= 2
+        entries = parsed[-needed:] + entries
+    return entries
+
+
+def _last_lines(path: str, n: int, block_size: int = 8192) -> List[str]:
+    """Read the last ``n`` lines of a file by seeking backwards from its end."""
+    if n <= 0:
+        return []
+    if path.endswith(".gz"):
+        with _open_log(path) as f:
+            return list(deque(f, maxlen=n))
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0 and data.count(b"\n") <= n:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-n:]
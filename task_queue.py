@@ -1,121 +1,561 @@
 #!/usr/bin/env python3
 """
-Simple file-based task queue that YOU can add tasks to.
+Simple task queue that YOU can add tasks to.
 Agents pull from this queue and process YOUR tasks.
+
+Tasks live in a SQLite database in WAL mode (DB_FILE), so adding, claiming
+and completing a task are indexed single-row transactions that are safe
+with several processes. A claim is a lease owned by one worker: workers renew
+it while running long tasks, and tasks whose lease expires are re-queued
+until MAX_ATTEMPTS, then dead-lettered. Submitting a task wakes idle
+workers through a Unix datagram socket (see listen()); workers still poll
+every POLL_INTERVAL seconds to pick up expired leases.
+
+Queues from the old JSON file can be imported with
+`python task_queue.py migrate`.
 """
 import json
 import os
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, Iterable, Iterator, List, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from llm_framework.admission import QueueFullError
+from llm_framework.scheduler import TaskScheduler
+from llm_framework.task_notify import QueueListener, notify_listeners
+from llm_framework.task_store import SQLiteTaskStore, content_key
 
 QUEUE_FILE = '/tmp/agent_task_queue.json'
-RESULTS_FILE = '/tmp/agent_task_results.json'
+DB_FILE = os.getenv('AGENT_TASK_QUEUE_DB', '/tmp/agent_task_queue.db')
 
-def load_queue() -> List[Dict]:
-    """Load task queue from file"""
-    if not os.path.exists(QUEUE_FILE):
-        return []
-    try:
-        with open(QUEUE_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+# Admission control (0 disables the limit)
+MAX_QUEUE_DEPTH = int(os.getenv('AGENT_TASK_QUEUE_MAX_DEPTH', '0'))
+MAX_QUEUE_WAIT = float(os.getenv('AGENT_TASK_QUEUE_MAX_WAIT', '0'))
+
+# Leases: seconds a claim is held without renewal, claims before dead-lettering
+LEASE_DURATION = float(os.getenv('AGENT_TASK_QUEUE_LEASE', '300'))
+MAX_ATTEMPTS = int(os.getenv('AGENT_TASK_QUEUE_MAX_ATTEMPTS', '3'))
 
-def save_queue(queue: List[Dict]):
-    """Save task queue to file"""
-    with open(QUEUE_FILE, 'w') as f:
-        json.dump(queue, f, indent=2)
+# Seconds a completed result answers an identical resubmission (0 disables reuse)
+DEDUP_WINDOW = float(os.getenv('AGENT_TASK_QUEUE_DEDUP_WINDOW', '3600'))
+
+# Seconds idle workers wait between fallback polls when no wakeup arrives
+POLL_INTERVAL = float(os.getenv('AGENT_TASK_QUEUE_POLL', '30'))
+
+# Fair-claim retries when other workers keep draining the picked flows
+FAIR_CLAIM_ATTEMPTS = 5
+
+_stores: Dict[str, SQLiteTaskStore] = {}
+
+def _store() -> SQLiteTaskStore:
+    """Task store for the current DB_FILE"""
+    if DB_FILE not in _stores:
+        _stores[DB_FILE] = SQLiteTaskStore(DB_FILE, lease_duration=LEASE_DURATION,
+                                           max_attempts=MAX_ATTEMPTS)
+    return _stores[DB_FILE]
+
+def notify_dir() -> str:
+    """Directory where idle workers register for wakeups"""
+    return os.getenv('AGENT_TASK_QUEUE_NOTIFY_DIR') or f"{DB_FILE}.notify"
+
+def listen() -> QueueListener:
+    """Register for a wakeup whenever a task becomes pending"""
+    return QueueListener(notify_dir())
+
+def _notify_workers():
+    """Wake idle workers after tasks became pending"""
+    notify_listeners(notify_dir())
+
+def load_queue() -> List[Dict]:
+    """Load all tasks in id order"""
+    return _store().list_tasks()
 
 def load_results() -> List[Dict]:
-    """Load completed results"""
-    if not os.path.exists(RESULTS_FILE):
-        return []
-    try:
-        with open(RESULTS_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+    """Load all completed results (use search_results for large histories)"""
+    return _store().list_tasks(status='completed')
 
-def save_results(results: List[Dict]):
-    """Save completed results"""
-    with open(RESULTS_FILE, 'w') as f:
-        json.dump(results, f, indent=2)
+def _parse_time(value: Optional[str]) -> Optional[str]:
+    """
+    Turn an ISO timestamp or a relative age such as '30m', '2h' or '7d'
+    into an ISO timestamp.
+    """
+    if not value:
+        return None
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if value[-1] in units and value[:-1].isdigit():
+        seconds = int(value[:-1]) * units[value[-1]]
+        return datetime.fromtimestamp(time.time() - seconds).isoformat()
+    return datetime.fromisoformat(value).isoformat()
+
+def search_results(agent_type: Optional[str] = None, since: Optional[str] = None,
+                   until: Optional[str] = None, grep: Optional[str] = None,
+                   status: Optional[str] = 'completed', limit: int = 20,
+                   before_id: Optional[int] = None) -> List[Dict]:
+    """
+    Page through results, newest first, using indexes and full-text search.
+    
+    Args:
+        agent_type: Only this agent type
+        since: ISO timestamp or age ('30m', '2h', '7d') of the oldest result
+        until: ISO timestamp or age of the newest result (exclusive)
+        grep: Words that must appear in the task or result
+        status: Task status ('completed' by default, None for any)
+        limit: Page size
+        before_id: Continue after a page whose smallest id this is
+    
+    Returns:
+        Up to limit tasks in descending id order
+    """
+    return _store().search(status=status, agent_type=agent_type,
+                           since=_parse_time(since), until=_parse_time(until),
+                           text=grep, limit=limit, before_id=before_id)
 
-def add_task(agent_type: str, task: str, priority: int = 0) -> int:
+def migrate_json_queue(queue_file: Optional[str] = None) -> int:
+    """
+    Import tasks from the JSON queue file used by earlier versions.
+    
+    Args:
+        queue_file: JSON queue path (defaults to QUEUE_FILE)
+    
+    Returns:
+        Number of tasks imported
+    """
+    return _store().import_json(queue_file or QUEUE_FILE)
+
+def _wait_since(timestamp: Optional[str]) -> float:
+    """Seconds elapsed since an ISO timestamp"""
+    if not timestamp:
+        return 0.0
+    return (datetime.now() - datetime.fromisoformat(timestamp)).total_seconds()
+
+def _check_depth(store: SQLiteTaskStore, count: int = 1):
+    """
+    Apply the depth limit to tasks about to be queued.
+    
+    Raises:
+        QueueFullError: If the tasks would exceed MAX_QUEUE_DEPTH
+    """
+    if not MAX_QUEUE_DEPTH:
+        return
+    depth = store.count(status='pending')
+    if depth + count > MAX_QUEUE_DEPTH:
+        store.increment_counter('rejected', count)
+        raise QueueFullError(
+            f"Queue full: {depth} pending tasks (limit {MAX_QUEUE_DEPTH})",
+            reason='queue_full'
+        )
+
+def _check_wait(store: SQLiteTaskStore, agent_type: str, count: int = 1):
+    """
+    Shed tasks while the oldest pending task of their type waits too long.
+    
+    Raises:
+        QueueFullError: If the wait exceeds MAX_QUEUE_WAIT
+    """
+    if not MAX_QUEUE_WAIT:
+        return
+    oldest_wait = _wait_since(store.oldest_submitted('pending', agent_type))
+    if oldest_wait > MAX_QUEUE_WAIT:
+        store.increment_counter('shed', count)
+        raise QueueFullError(
+            f"Queue overloaded: oldest {agent_type} task has waited "
+            f"{oldest_wait:.0f}s (limit {MAX_QUEUE_WAIT:.0f}s)",
+            reason='overloaded'
+        )
+
+def _check_admission(store: SQLiteTaskStore, agent_type: str, priority: int):
+    """
+    Apply depth limit and wait-time load shedding.
+    
+    Positive-priority tasks are never shed, only rejected at the depth limit.
+    
+    Raises:
+        QueueFullError: If the task may not be queued
+    """
+    _check_depth(store)
+    if priority <= 0:
+        _check_wait(store, agent_type)
+
+def _dedup_key(agent_type: str, task: str, idempotency_key: Optional[str],
+               dedup: bool) -> Optional[str]:
+    """Key used to collapse identical submissions (None disables dedup)"""
+    if idempotency_key:
+        return f"key:{agent_type}:{idempotency_key}"
+    return content_key(agent_type, task) if dedup else None
+
+def add_task(agent_type: str, task: str, priority: int = 0,
+             block: bool = False, timeout: Optional[float] = None,
+             priority_class: Optional[str] = None, tenant: str = 'default',
+             idempotency_key: Optional[str] = None, dedup: bool = True) -> int:
     """
     Add a task to the queue for an agent to process.
     
+    A task identical to one that is pending or running (same agent type and
+    text, or same idempotency key) shares that execution and its result. One
+    identical to a task completed within DEDUP_WINDOW is answered from the
+    stored result without running again.
+    
     Args:
         agent_type: 'research', 'coding', or 'writing'
         task: The task description
         priority: Higher priority tasks are processed first (default 0)
+        block: Wait for space instead of failing when the queue is full
+        timeout: Maximum seconds to wait when blocking (None waits forever)
+        priority_class: 'interactive', 'normal' or 'background'
+            (derived from priority when omitted)
+        tenant: Submitter the task is fairly scheduled under
+        idempotency_key: Caller-chosen key identifying retries of one request
+        dedup: Collapse tasks with identical text (False forces a fresh run)
     
     Returns:
         Task ID
+    
+    Raises:
+        QueueFullError: If admission control refuses the task
     """
-    queue = load_queue()
-    task_id = len(queue) + 1
-    
-    task_entry = {
-        'id': task_id,
-        'agent_type': agent_type,
-        'task': task,
-        'priority': priority,
-        'status': 'pending',
-        'submitted_at': datetime.now().isoformat(),
-        'result': None,
-        'completed_at': None
-    }
+    store = _store()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            _check_admission(store, agent_type, priority)
+            break
+        except QueueFullError as e:
+            expired = deadline is not None and time.monotonic() >= deadline
+            if not block or e.reason != 'queue_full' or expired:
+                raise
+        time.sleep(1)
     
-    queue.append(task_entry)
-    save_queue(queue)
+    task_id = store.add(agent_type, task, priority=priority,
+                        priority_class=priority_class, tenant=tenant,
+                        dedup_key=_dedup_key(agent_type, task, idempotency_key, dedup),
+                        fresh_for=DEDUP_WINDOW or None)
     
-    print(f"✓ Task #{task_id} added to queue for {agent_type} agent")
+    entry = store.get(task_id)
+    if entry['duplicate_of'] is None:
+        _notify_workers()
+        print(f"✓ Task #{task_id} added to queue for {agent_type} agent")
+    elif entry['status'] == 'completed':
+        print(f"✓ Task #{task_id} answered from earlier result of task #{entry['duplicate_of']}")
+    else:
+        print(f"✓ Task #{task_id} will share the result of task #{entry['duplicate_of']}")
     print(f"  Task: {task}")
     return task_id
 
-def get_next_task(agent_type: str) -> Optional[Dict]:
-    """Get the next pending task for a specific agent type"""
-    queue = load_queue()
+def add_tasks(tasks: Iterable[Dict], batch_size: int = 1000, dedup: bool = True) -> int:
+    """
+    Add many tasks, committing once per batch.
     
-    # Filter for this agent type and pending status
-    pending_tasks = [t for t in queue 
-                    if t['agent_type'] == agent_type 
-                    and t['status'] == 'pending']
+    The input is consumed lazily, so a generator of any length is queued in
+    constant memory. Admission control is applied to each batch as a whole.
     
-    if not pending_tasks:
-        return None
+    Args:
+        tasks: Dictionaries with 'agent_type' and 'task' and optionally
+            'priority', 'priority_class', 'tenant' and 'idempotency_key'
+        batch_size: Tasks per transaction
+        dedup: Collapse tasks with identical text, as in add_task
     
-    # Sort by priority (highest first)
-    pending_tasks.sort(key=lambda x: x['priority'], reverse=True)
+    Returns:
+        Number of tasks added
     
-    # Mark as in-progress
-    task = pending_tasks[0]
-    for t in queue:
-        if t['id'] == task['id']:
-            t['status'] = 'in-progress'
-            break
+    Raises:
+        QueueFullError: If admission control refuses a batch (earlier
+            batches stay queued)
+    """
+    store = _store()
+    iterator = iter(tasks)
+    added = 0
+    while True:
+        # Copy each task so the caller's dictionaries are left untouched
+        batch = [dict(t) for t in islice(iterator, batch_size)]
+        if not batch:
+            return added
+        
+        _check_depth(store, len(batch))
+        sheddable: Dict[str, int] = {}
+        for t in batch:
+            if t.get('priority', 0) <= 0:
+                sheddable[t['agent_type']] = sheddable.get(t['agent_type'], 0) + 1
+        for agent_type, count in sheddable.items():
+            _check_wait(store, agent_type, count)
+        
+        for t in batch:
+            t['dedup_key'] = _dedup_key(t['agent_type'], t['task'],
+                                        t.pop('idempotency_key', None), dedup)
+        store.add_many(batch, fresh_for=DEDUP_WINDOW or None)
+        _notify_workers()
+        added += len(batch)
+
+def read_jsonl_tasks(lines: Iterable[str], agent_type: Optional[str] = None,
+                     tenant: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Parse tasks from JSON Lines, one object per line.
+    
+    A line's text comes from 'task', or else from 'title' and 'body' (the
+    format of request backlogs). 'idempotency_key', or a backlog's
+    'request_id', makes re-importing the same file safe. Blank lines are
+    skipped.
     
-    save_queue(queue)
-    return task
+    Args:
+        lines: Lines of JSONL (a file object is read incrementally)
+        agent_type: Agent type for lines that do not name one
+        tenant: Tenant for lines that do not name one
+    
+    Yields:
+        Task dictionaries for add_tasks
+    
+    Raises:
+        ValueError: If a line has no agent type or no task text
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        
+        record = json.loads(line)
+        text = record.get('task') or '\n\n'.join(
+            part for part in (record.get('title'), record.get('body')) if part
+        )
+        task_agent = record.get('agent_type') or agent_type
+        if not text or not task_agent:
+            raise ValueError(f"Line {number}: needs 'task' (or 'title'/'body') and 'agent_type'")
+        
+        task = {'agent_type': task_agent, 'task': text,
+                'priority': record.get('priority', 0),
+                'tenant': record.get('tenant') or tenant or 'default'}
+        if record.get('priority_class'):
+            task['priority_class'] = record['priority_class']
+        key = record.get('idempotency_key') or record.get('request_id')
+        if key:
+            task['idempotency_key'] = str(key)
+        yield task
 
-def complete_task(task_id: int, result: str):
-    """Mark a task as completed with its result"""
-    queue = load_queue()
-    results = load_results()
+def default_worker_id() -> str:
+    """Worker identifier unique across hosts and processes: '<host>:<pid>'"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def get_next_task(agent_type: str, worker_id: Optional[str] = None,
+                  lease: Optional[float] = None) -> Optional[Dict]:
+    """
+    Lease the next pending task for a specific agent type.
     
-    for task in queue:
-        if task['id'] == task_id:
-            task['status'] = 'completed'
-            task['result'] = result
-            task['completed_at'] = datetime.now().isoformat()
-            
-            # Add to results
-            results.append(task.copy())
-            break
+    Args:
+        agent_type: Agent type to claim for
+        worker_id: Worker that will own the lease
+        lease: Lease duration in seconds (default LEASE_DURATION)
+    
+    Returns:
+        The claimed task, or None if nothing is pending
+    """
+    return _store().claim(agent_type, worker_id=worker_id, lease=lease)
+
+def claim_batch(agent_type: str, n: int, worker_id: Optional[str] = None,
+                lease: Optional[float] = None) -> List[Dict]:
+    """
+    Lease up to n pending tasks for an agent type in one transaction.
+    
+    Args:
+        agent_type: Agent type to claim for
+        n: Maximum number of tasks (e.g. free worker slots)
+        worker_id: Worker that will own the leases
+        lease: Lease duration in seconds (default LEASE_DURATION)
+    
+    Returns:
+        Claimed tasks in dispatch order
+    """
+    return _store().claim_batch(agent_type, n, worker_id=worker_id, lease=lease)
+
+def renew_lease(task_id: int, worker_id: Optional[str] = None,
+                lease: Optional[float] = None) -> bool:
+    """Extend a lease; returns False if the worker has lost the task"""
+    return _store().renew(task_id, worker_id, lease)
+
+@contextmanager
+def lease_heartbeat(task_id: int, worker_id: Optional[str] = None,
+                    lease: Optional[float] = None):
+    """
+    Keep renewing a lease in the background while a task runs.
+    
+    The lease is renewed every third of its duration, so one missed
+    renewal does not lose the task.
+    
+    Args:
+        task_id: Leased task
+        worker_id: Worker that owns the lease
+        lease: Lease duration in seconds (default LEASE_DURATION)
+    """
+    duration = LEASE_DURATION if lease is None else lease
+    stop = threading.Event()
+    
+    def renew():
+        while not stop.wait(duration / 3):
+            if not renew_lease(task_id, worker_id, duration):
+                return
+    
+    thread = threading.Thread(target=renew, name=f"lease-{task_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+def task_flow(task: Dict) -> str:
+    """Fair-queuing flow of a task: '<agent_type>/<tenant>'"""
+    return f"{task['agent_type']}/{task.get('tenant', 'default')}"
+
+def get_next_fair_task(agent_types: List[str], scheduler: TaskScheduler,
+                       worker_id: Optional[str] = None,
+                       lease: Optional[float] = None) -> Optional[Dict]:
+    """
+    Claim the next task across several agent types using a shared scheduler.
+    
+    Picks by priority class and then weighted fair share across agent types
+    and tenants (see get_next_fair_tasks). The scheduler instance must be
+    kept between calls so fairness carries over.
+    
+    Args:
+        agent_types: Agent types this worker can serve
+        scheduler: Scheduler holding fair-queuing state
+        worker_id: Worker that will own the lease
+        lease: Lease duration in seconds (default LEASE_DURATION)
+    
+    Returns:
+        The claimed task, or None if nothing is pending
+    """
+    tasks = get_next_fair_tasks(agent_types, scheduler, 1, worker_id=worker_id, lease=lease)
+    return tasks[0] if tasks else None
+
+def get_next_fair_tasks(agent_types: List[str], scheduler: TaskScheduler, n: int,
+                        worker_id: Optional[str] = None,
+                        lease: Optional[float] = None) -> List[Dict]:
+    """
+    Claim up to n tasks across several agent types using a shared scheduler.
+    
+    The scheduler holds one entry per flow ('<agent_type>/<tenant>' with
+    pending tasks) at the priority class of the flow's most urgent task, not
+    one entry per task. Flows are read from an index, each pick is claimed
+    as the head of its flow, and a served flow rejoins the scheduler for the
+    next pick, so a claim costs a few indexed queries however deep the
+    queue is.
+    
+    Args:
+        agent_types: Agent types this worker can serve
+        scheduler: Scheduler holding fair-queuing state
+        n: Maximum number of tasks (e.g. free worker slots)
+        worker_id: Worker that will own the leases
+        lease: Lease duration in seconds (default LEASE_DURATION)
     
-    save_queue(queue)
-    save_results(results)
+    Returns:
+        Claimed tasks (empty if nothing is pending, or if other workers won
+        every pick FAIR_CLAIM_ATTEMPTS times in a row)
+    """
+    if n < 1:
+        return []
+    store = _store()
+    store.requeue_expired()
+    
+    # Another worker may drain a flow between the sync and our claim
+    for _ in range(FAIR_CLAIM_ATTEMPTS):
+        flows = {task_flow(f): f for f in store.pending_flows(agent_types)}
+        if not flows:
+            for key in scheduler.keys():
+                scheduler.discard(key)
+            return []
+        
+        # Drop drained flows and flows whose most urgent class changed
+        for entry in scheduler.pending():
+            flow = flows.get(entry.key)
+            if flow is None or flow['priority_class'] != entry.priority_class:
+                scheduler.discard(entry.key)
+        for name, flow in flows.items():
+            if name not in scheduler:
+                scheduler.push(flow, priority_class=flow['priority_class'], flow=name, key=name)
+        
+        picks: Dict[str, int] = {}
+        for _ in range(n):
+            entry = scheduler.pop()
+            if entry is None:
+                break
+            picks[entry.key] = picks.get(entry.key, 0) + 1
+            # The flow likely has more tasks; let it compete for the next pick
+            scheduler.push(entry.task, priority_class=entry.priority_class,
+                           flow=entry.flow, key=entry.key)
+        
+        claimed = []
+        for name, count in picks.items():
+            flow = flows[name]
+            claimed.extend(store.claim_batch(flow['agent_type'], count, worker_id=worker_id,
+                                             lease=lease, tenant=flow['tenant']))
+        if claimed:
+            return claimed
+    return []
+
+def complete_task(task_id: int, result: str, worker_id: Optional[str] = None) -> bool:
+    """
+    Mark a leased task as completed with its result.
+    
+    Returns:
+        False if the lease was lost and the result was discarded
+    """
+    return _store().complete(task_id, result, worker_id=worker_id)
+
+def fail_task(task_id: int, error: str, worker_id: Optional[str] = None) -> Optional[str]:
+    """
+    Release a leased task after an error.
+    
+    Returns:
+        'pending' if it will be retried, 'dead' if it was dead-lettered,
+        None if the lease was lost
+    """
+    status = _store().fail(task_id, error, worker_id=worker_id)
+    if status == 'pending':
+        _notify_workers()
+    return status
+
+def retry_task(task_id: int) -> bool:
+    """Move a dead-lettered task back to the queue"""
+    if not _store().retry(task_id):
+        return False
+    _notify_workers()
+    return True
+
+def get_status() -> Dict[str, Any]:
+    """Get queue depth per agent type and admission counters"""
+    store = _store()
+    counters = store.get_counters()
+    
+    return {
+        'tasks_pending': store.count(status='pending'),
+        'tasks_in_progress': store.count(status='in-progress'),
+        'tasks_dead': store.count(status='dead'),
+        'pending_by_agent': store.count_by_agent('pending'),
+        'oldest_pending_wait': round(_wait_since(store.oldest_submitted('pending')), 1),
+        'max_queue_depth': MAX_QUEUE_DEPTH or None,
+        'max_queue_wait': MAX_QUEUE_WAIT or None,
+        'rejected': counters.get('rejected', 0),
+        'shed': counters.get('shed', 0),
+        'deduplicated': counters.get('deduplicated', 0),
+    }
+
+def view_status():
+    """Print queue depth and admission counters"""
+    status = get_status()
+    print(f"Pending:     {status['tasks_pending']}")
+    print(f"In progress: {status['tasks_in_progress']}")
+    print(f"Dead:        {status['tasks_dead']}")
+    for agent_type, count in sorted(status['pending_by_agent'].items()):
+        print(f"  {agent_type}: {count}")
+    print(f"Oldest wait: {status['oldest_pending_wait']}s")
+    print(f"Rejected:    {status['rejected']}")
+    print(f"Shed:        {status['shed']}")
+    print(f"Deduped:     {status['deduplicated']}")
 
 def view_queue():
     """View all tasks in queue"""
@@ -133,41 +573,59 @@ def view_queue():
         print(f"ID: {task['id']}")
         print(f"Agent: {task['agent_type']}")
         print(f"Status: {task['status']}")
-        print(f"Priority: {task['priority']}")
+        print(f"Priority: {task['priority']} ({task.get('priority_class', 'normal')})")
         print(f"Task: {task['task']}")
         print(f"Submitted: {task['submitted_at']}")
+        if task['worker_id']:
+            print(f"Worker: {task['worker_id']} (attempt {task['attempts']})")
+        if task['last_error']:
+            print(f"Last error: {task['last_error']}")
         if task['result']:
             print(f"Result: {task['result'][:100]}...")
         print(f"{'-'*80}\n")
 
-def view_results():
-    """View completed tasks"""
-    results = load_results()
+def view_results(limit: int = 20, **filters):
+    """
+    View one page of results, newest first.
+    
+    Args:
+        limit: Page size
+        **filters: Passed to search_results (agent_type, since, until,
+            grep, status, before_id)
+    """
+    results = search_results(limit=limit, **filters)
     
     if not results:
-        print("No completed tasks yet")
+        print("No matching results")
         return
     
     print(f"\n{'='*80}")
-    print("COMPLETED TASKS")
+    print("RESULTS")
     print(f"{'='*80}\n")
     
     for task in results:
         print(f"ID: {task['id']}")
         print(f"Agent: {task['agent_type']}")
+        print(f"Status: {task['status']}")
         print(f"Task: {task['task']}")
         print(f"Completed: {task['completed_at']}")
         print(f"\nResult:\n{task['result']}\n")
         print(f"{'='*80}\n")
+    
+    if len(results) == limit:
+        print(f"More results: add --before {results[-1]['id']}")
 
 if __name__ == '__main__':
-    import sys
-    
     if len(sys.argv) < 2:
         print("Usage:")
         print("  Add task:     python task_queue.py add <agent_type> <task>")
         print("  View queue:   python task_queue.py queue")
-        print("  View results: python task_queue.py results")
+        print("  View results: python task_queue.py results [--agent TYPE] [--since 2h|ISO]")
+        print("                [--until 2h|ISO] [--grep WORDS] [--status S|any] [--limit N] [--before ID]")
+        print("  View status:  python task_queue.py status")
+        print("  Import JSON:  python task_queue.py migrate [queue_file]")
+        print("  Retry dead:   python task_queue.py retry <task_id>")
+        print("  Bulk add:     python task_queue.py import <file.jsonl|-> [--agent TYPE] [--tenant NAME]")
         print("\nAgent types: research, coding, writing")
         sys.exit(1)
     
@@ -176,11 +634,60 @@ if __name__ == '__main__':
     if cmd == 'add' and len(sys.argv) >= 4:
         agent_type = sys.argv[2]
         task = ' '.join(sys.argv[3:])
-        add_task(agent_type, task)
+        try:
+            add_task(agent_type, task)
+        except QueueFullError as e:
+            print(f"✗ Task rejected: {e}")
+            sys.exit(2)
     elif cmd == 'queue':
         view_queue()
     elif cmd == 'results':
-        view_results()
+        import argparse
+        parser = argparse.ArgumentParser(prog='task_queue.py results')
+        parser.add_argument('--agent', help='Only this agent type')
+        parser.add_argument('--since', help="Oldest result: ISO time or age like 30m, 2h, 7d")
+        parser.add_argument('--until', help='Newest result (exclusive): ISO time or age')
+        parser.add_argument('--grep', help='Words to find in task or result text')
+        parser.add_argument('--status', default='completed', help="Task status, or 'any'")
+        parser.add_argument('--limit', type=int, default=20, help='Page size (default: 20)')
+        parser.add_argument('--before', type=int, help='Show results older than this task id')
+        args = parser.parse_args(sys.argv[2:])
+        view_results(limit=args.limit, agent_type=args.agent, since=args.since,
+                     until=args.until, grep=args.grep,
+                     status=None if args.status == 'any' else args.status,
+                     before_id=args.before)
+    elif cmd == 'status':
+        view_status()
+    elif cmd == 'retry' and len(sys.argv) >= 3:
+        task_id = int(sys.argv[2])
+        if retry_task(task_id):
+            print(f"✓ Task #{task_id} re-queued")
+        else:
+            print(f"✗ Task #{task_id} is not dead-lettered")
+            sys.exit(1)
+    elif cmd == 'import' and len(sys.argv) >= 3:
+        import argparse
+        parser = argparse.ArgumentParser(prog='task_queue.py import')
+        parser.add_argument('source', help="JSONL file, or '-' for stdin")
+        parser.add_argument('--agent', help="Agent type for lines without 'agent_type'")
+        parser.add_argument('--tenant', help="Tenant for lines without 'tenant'")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        args = parser.parse_args(sys.argv[2:])
+        
+        source = sys.stdin if args.source == '-' else open(args.source, 'r', encoding='utf-8')
+        try:
+            count = add_tasks(read_jsonl_tasks(source, args.agent, args.tenant),
+                              batch_size=args.batch_size)
+        except (QueueFullError, ValueError) as e:
+            print(f"✗ Import stopped: {e}")
+            sys.exit(2)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(f"✓ Added {count} tasks")
+    elif cmd == 'migrate':
+        count = migrate_json_queue(sys.argv[2] if len(sys.argv) >= 3 else None)
+        print(f"✓ Imported {count} tasks into {DB_FILE}")
     else:
         print("Invalid command")
         sys.exit(1)
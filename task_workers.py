@@ -0,0 +1,294 @@
+"""
+Worker pools that drain the task queue, one pool per agent type.
+
+Each pool runs its own worker threads, so a slow coding generation never
+holds up research or writing tasks. Pools are woken by queue notifications
+(see task_queue.listen) and stop gracefully: they stop claiming, then let
+in-flight tasks finish.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from llm_framework.core.agent import Agent
+from llm_framework.scheduler import TaskScheduler
+from task_queue import (
+    get_next_fair_tasks,
+    complete_task,
+    fail_task,
+    lease_heartbeat,
+    default_worker_id,
+    POLL_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Samples kept for latency percentiles
+LATENCY_WINDOW = 1000
+
+def _percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile of a sample list (0.0 when empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _wait_seconds(task: Dict) -> float:
+    """Seconds between submission and claim of a task"""
+    submitted = datetime.fromisoformat(task['submitted_at'])
+    started = datetime.fromisoformat(task['started_at'])
+    return max(0.0, (started - submitted).total_seconds())
+
+class WorkerPool:
+    """
+    Threads executing queued tasks for one agent type.
+
+    Within the pool, tasks are claimed through a fair scheduler so priority
+    classes and tenant fairness still apply. A thread that finds no claimed
+    task waiting claims enough for every free thread in one pass and wakes
+    the others. Each thread holds its own lease identity, renewed while the
+    agent generates, and its own copy of the agent, whose conversation
+    history is cleared after every task.
+    """
+
+    def __init__(self, agent_type: str, agent: Any, concurrency: int = 1,
+                 worker_id: Optional[str] = None, lease: Optional[float] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            agent_type: Agent type whose tasks this pool runs
+            agent: Agent used to execute tasks (an ``Agent`` is copied per
+                thread, sharing its provider; other objects are shared)
+            concurrency: Number of worker threads
+            worker_id: Prefix for lease owners (default '<host>:<pid>')
+            lease: Lease duration in seconds (default LEASE_DURATION)
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency for '{agent_type}' must be at least 1")
+
+        self.agent_type = agent_type
+        self.agent = agent
+        self.concurrency = concurrency
+        self.worker_id = worker_id or default_worker_id()
+        self.lease = lease
+        self.scheduler = TaskScheduler(starvation_age=300)
+
+        self.is_running = False
+        self._threads = []
+        self._claim_lock = threading.Lock()
+        # Claimed for free threads but not yet picked up
+        self._claimed: Deque[Dict] = deque()
+        self._wakeup = threading.Condition()
+        self._pending_wakeup = False
+
+        self._stats_lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._exec_times: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._wait_times: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.in_flight = 0
+        # Claimed for this pool and not finished: buffered, picked up or running
+        self._reserved = 0
+        self.completed = 0
+        self.failed = 0
+        self.lost = 0
+
+    def start(self):
+        """Start the worker threads"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._run, args=(f"{self.worker_id}/{self.agent_type}-{i}",),
+                             name=f"{self.agent_type}-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop claiming tasks and wait for in-flight tasks to finish.
+
+        Args:
+            timeout: Maximum seconds to wait for all threads (None waits forever)
+        """
+        self.is_running = False
+        self.notify()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            thread.join(remaining)
+
+    def notify(self):
+        """Wake idle workers because tasks may be pending"""
+        with self._wakeup:
+            self._pending_wakeup = True
+            self._wakeup.notify_all()
+
+    def _idle(self):
+        """Block until notified or the fallback poll interval passes"""
+        with self._wakeup:
+            if not self._pending_wakeup and self.is_running:
+                self._wakeup.wait(POLL_INTERVAL)
+            self._pending_wakeup = False
+
+    def _claim(self, worker_id: str) -> Optional[Dict]:
+        """Take a task claimed earlier, or claim one per free thread"""
+        with self._claim_lock:
+            if self._claimed:
+                return self._claimed.popleft()
+            if not self.is_running:
+                return None
+
+            # Never lease more than the threads can start at once; a task left
+            # waiting in the buffer has no lease heartbeat
+            with self._stats_lock:
+                free = max(1, self.concurrency - self._reserved)
+            tasks = get_next_fair_tasks([self.agent_type], self.scheduler, free,
+                                        worker_id=worker_id, lease=self.lease)
+            if not tasks:
+                return None
+            with self._stats_lock:
+                self._reserved += len(tasks)
+            self._claimed.extend(tasks[1:])
+        if len(tasks) > 1:
+            self.notify()
+        return tasks[0]
+
+    def _new_agent(self) -> Any:
+        """Agent for one worker thread"""
+        if isinstance(self.agent, Agent):
+            return Agent(self.agent.config, self.agent.provider)
+        return self.agent
+
+    def _run(self, worker_id: str):
+        """Worker thread loop"""
+        agent = self._new_agent()
+        # Tasks claimed for this pool are run even when stopping
+        while self.is_running or self._claimed:
+            try:
+                task_entry = self._claim(worker_id)
+            except Exception as e:
+                logger.error(f"[{self.agent_type}] Claim failed: {e}")
+                task_entry = None
+
+            if task_entry is None:
+                if self.is_running:
+                    self._idle()
+                continue
+
+            self._execute(agent, task_entry, worker_id)
+
+    def _execute(self, agent: Any, task_entry: Dict, worker_id: str):
+        """Run one claimed task and record its outcome"""
+        task_id = task_entry['id']
+        # Tasks claimed in a batch are leased to the thread that claimed them
+        worker_id = task_entry.get('worker_id') or worker_id
+        logger.info(f"[{self.agent_type}] Processing Task #{task_id}: {task_entry['task']}")
+
+        with self._stats_lock:
+            self.in_flight += 1
+            self._wait_times.append(_wait_seconds(task_entry))
+
+        start = time.monotonic()
+        try:
+            # Renew the lease while the LLM generates
+            with lease_heartbeat(task_id, worker_id, self.lease):
+                result = agent.execute(task_entry['task'])
+
+            if complete_task(task_id, result, worker_id=worker_id):
+                outcome = 'completed'
+                logger.info(f"[{self.agent_type}] ✓ Task #{task_id} COMPLETED "
+                            f"({len(result)} chars)")
+                logger.info(f"{result[:500]}...")
+            else:
+                outcome = 'lost'
+                logger.warning(f"[{self.agent_type}] ✗ Task #{task_id} lease lost; "
+                               f"result discarded")
+
+        except Exception as e:
+            outcome = 'failed'
+            error_msg = f"Error: {str(e)}"
+            status = fail_task(task_id, error_msg, worker_id=worker_id)
+            retry = "dead-lettered" if status == 'dead' else "will retry"
+            logger.error(f"[{self.agent_type}] ✗ Task #{task_id} FAILED ({retry}): {error_msg}")
+
+        if isinstance(agent, Agent):
+            # Tasks are independent; history would only grow
+            agent.reset_conversation()
+
+        with self._stats_lock:
+            self.in_flight -= 1
+            self._reserved -= 1
+            self._exec_times.append(time.monotonic() - start)
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get throughput and latency statistics.
+
+        Returns:
+            Counters, tasks per minute since start, and execution and
+            queue-wait latency (average, p50, p95) over recent tasks
+        """
+        with self._stats_lock:
+            exec_times = list(self._exec_times)
+            wait_times = list(self._wait_times)
+            finished = self.completed + self.failed + self.lost
+            stats = {
+                'agent_type': self.agent_type,
+                'concurrency': self.concurrency,
+                'is_running': self.is_running,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'lost': self.lost,
+            }
+
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        stats['throughput_per_min'] = round(finished / elapsed * 60, 2) if elapsed else 0.0
+        stats['latency'] = {
+            'avg': round(sum(exec_times) / len(exec_times), 3) if exec_times else 0.0,
+            'p50': round(_percentile(exec_times, 0.5), 3),
+            'p95': round(_percentile(exec_times, 0.95), 3),
+        }
+        stats['queue_wait'] = {
+            'avg': round(sum(wait_times) / len(wait_times), 3) if wait_times else 0.0,
+            'p95': round(_percentile(wait_times, 0.95), 3),
+        }
+        return stats
+
+def parse_concurrency(spec: str, agent_types, default: int = 1) -> Dict[str, int]:
+    """
+    Parse per-pool concurrency such as 'coding=4,research=2'.
+
+    Args:
+        spec: Comma-separated agent_type=threads pairs (may be empty)
+        agent_types: Known agent types
+        default: Threads for agent types not listed
+
+    Returns:
+        Mapping of every agent type to its thread count
+
+    Raises:
+        ValueError: On malformed entries or unknown agent types
+    """
+    concurrency = {agent_type: default for agent_type in agent_types}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        agent_type, sep, count = item.partition('=')
+        if not sep or not count.strip().isdigit():
+            raise ValueError(f"Invalid concurrency '{item}', expected agent_type=threads")
+        if agent_type.strip() not in concurrency:
+            raise ValueError(f"Unknown agent type '{agent_type.strip()}' in concurrency")
+        concurrency[agent_type.strip()] = int(count)
+    return concurrency
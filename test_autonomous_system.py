@@ -9,7 +9,6 @@ This test PROVES the agents are working by:
 """
 import sys
 import os
-import json
 import time
 import shutil
 import tempfile
@@ -25,6 +24,7 @@ from llm_framework.autonomous_agent import (
     DocumentationAgent,
     IssueMonitorAgent
 )
+from llm_framework.work_log import WorkLogWriter, read_work_log
 
 
 def create_test_repo(path: str):
@@ -76,17 +76,16 @@ def unsafe_function(user_input):
         f.write("def test_example():\n    assert True\n")
 
 
-def verify_work_was_done(agent_name: str, expected_keywords: list) -> bool:
-    """Verify that an agent actually did work by checking its log."""
-    log_file = f'/tmp/autonomous_{agent_name}_log.json'
+def verify_work_was_done(log_dir: str, agent_name: str, expected_keywords: list) -> bool:
+    """Verify that an agent actually did work by checking this run's log."""
+    log_file = os.path.join(log_dir, f'autonomous_{agent_name}_log.jsonl')
     
     if not os.path.exists(log_file):
         print(f"  ❌ {agent_name}: No log file found")
         return False
     
     try:
-        with open(log_file, 'r') as f:
-            log = json.load(f)
+        log = list(read_work_log(log_file))
     except Exception as e:
         print(f"  ❌ {agent_name}: Error reading log: {e}")
         return False
@@ -165,7 +164,12 @@ def main():
         IssueMonitorAgent(orch.get_agent('research'), test_repo),
     ]
     
+    # A fresh log directory, so entries from earlier runs cannot pass the check
+    log_dir = tempfile.mkdtemp(prefix='autonomous_logs_')
     for agent in autonomous_agents:
+        agent.log_writer = WorkLogWriter(
+            os.path.join(log_dir, f'autonomous_{agent.name}_log.jsonl')
+        )
         print(f"   - {agent.name}")
     print()
     
@@ -194,25 +198,29 @@ def main():
     print(f"   Runtime: {time.time() - start_time:.1f}s")
     print()
     
+    # Flush buffered work-log entries before reading them back
+    for agent in autonomous_agents:
+        agent.close()
+    
     # Verify results
     print("🔍 Verifying results...")
     print()
     
     results = {
         'code_analysis': verify_work_was_done(
-            'code_analysis',
+            log_dir, 'code_analysis',
             ['code', 'function', 'improve', 'bug', 'error', 'security', 'should']
         ),
         'documentation': verify_work_was_done(
-            'documentation',
+            log_dir, 'documentation',
             ['document', 'docstring', 'comment', 'explain', 'describe', 'should']
         ),
         'test_monitor': verify_work_was_done(
-            'test_monitor',
+            log_dir, 'test_monitor',
             ['test', 'coverage', 'assert', 'verify', 'check']
         ),
         'issue_monitor': verify_work_was_done(
-            'issue_monitor',
+            log_dir, 'issue_monitor',
             ['readme', 'improve', 'documentation', 'should', 'add']
         ),
     }
@@ -243,7 +251,7 @@ def main():
     print()
     print("Work logs saved to:")
     for agent_name in results.keys():
-        log_file = f'/tmp/autonomous_{agent_name}_log.json'
+        log_file = os.path.join(log_dir, f'autonomous_{agent_name}_log.jsonl')
         if os.path.exists(log_file):
             print(f"  - {log_file}")
     
@@ -0,0 +1,132 @@
+"""Tests for admission control and load shedding."""
+
+import threading
+import time
+
+import pytest
+from src.llm_framework.admission import AdmissionController, QueueFullError
+from src.llm_framework.continuous_agent import ContinuousAgent
+from src.llm_framework.core.agent import Agent, AgentConfig
+from tests.test_base_provider import MockProvider
+
+
+def make_agent(**kwargs):
+    """Create a continuous agent around the mock provider."""
+    agent = Agent(AgentConfig(name="Test"), MockProvider())
+    return ContinuousAgent(agent, **kwargs)
+
+
+def test_controller_depth_limit():
+    """Test the depth limit check."""
+    controller = AdmissionController(max_queue_depth=2)
+
+    assert controller.is_full(1) is False
+    assert controller.is_full(2) is True
+    assert AdmissionController().is_full(10_000) is False
+
+
+def test_controller_overload_uses_measured_wait():
+    """Test that shedding is driven by measured queue wait."""
+    controller = AdmissionController(max_queue_wait=1.0)
+
+    controller.record_wait(0.5)
+    assert controller.is_overloaded(depth=3) is False
+
+    controller.record_wait(10.0)
+    assert controller.is_overloaded(depth=3) is True
+    # An empty queue is never overloaded, so shedding cannot stick
+    assert controller.is_overloaded(depth=0) is False
+
+
+def test_controller_shedding_ends_with_the_slow_spell():
+    """Test that a stale average neither outlives the backlog nor sticks forever."""
+    controller = AdmissionController(max_queue_wait=0.05)
+    controller.record_wait(10.0)
+    assert controller.is_overloaded(depth=1) is True
+
+    # A drained queue resets the average
+    assert controller.is_overloaded(depth=0) is False
+    assert controller.is_overloaded(depth=1) is False
+
+    # Without new samples the average decays
+    controller.record_wait(0.2)
+    assert controller.is_overloaded(depth=1) is True
+    time.sleep(0.2)
+    assert controller.is_overloaded(depth=1) is False
+    # ...but a task still waiting keeps the queue overloaded
+    assert controller.is_overloaded(depth=1, oldest_wait=1.0) is True
+
+
+def test_controller_invalid_policy():
+    """Test that unknown policies are rejected."""
+    with pytest.raises(ValueError, match="Unknown admission policy"):
+        AdmissionController(policy="maybe")
+
+
+def test_add_task_rejects_when_full():
+    """Test that add_task raises once the queue is full."""
+    cont_agent = make_agent(max_queue_depth=2)
+    cont_agent.add_task("Task 1")
+    cont_agent.add_task("Task 2")
+
+    with pytest.raises(QueueFullError) as exc_info:
+        cont_agent.add_task("Task 3")
+
+    assert exc_info.value.reason == "queue_full"
+    status = cont_agent.get_status()
+    assert status["tasks_pending"] == 2
+    assert status["admission"]["rejected"] == 1
+
+
+def test_add_task_blocks_until_space():
+    """Test that the block policy waits for the worker to free a slot."""
+    cont_agent = make_agent(max_queue_depth=1, admission_policy="block")
+    cont_agent.add_task("Task 1")
+
+    threading.Timer(0.1, cont_agent._pop_task).start()
+    start = time.monotonic()
+    assert cont_agent.add_task("Task 2", timeout=2) is True
+    assert time.monotonic() - start >= 0.05
+    assert cont_agent.task_queue == ["Task 2"]
+
+    with pytest.raises(QueueFullError):
+        cont_agent.add_task("Task 3", timeout=0.05)
+
+
+def test_add_task_sheds_on_queue_wait():
+    """Test that new tasks are shed while queue wait is too high."""
+    cont_agent = make_agent(max_queue_wait=0.01)
+    cont_agent.add_task("Task 1")
+    time.sleep(0.05)
+
+    with pytest.raises(QueueFullError) as exc_info:
+        cont_agent.add_task("Task 2")
+
+    assert exc_info.value.reason == "overloaded"
+    assert cont_agent.get_status()["admission"]["shed"] == 1
+
+
+def test_interactive_tasks_are_not_shed():
+    """Test that shedding only refuses normal and background tasks."""
+    cont_agent = make_agent(max_queue_wait=0.01)
+    cont_agent.add_task("Task 1")
+    time.sleep(0.05)
+
+    assert cont_agent.add_task("Urgent", priority="interactive") is True
+    with pytest.raises(QueueFullError):
+        cont_agent.add_task("Task 2", priority="background")
+
+
+def test_generated_tasks_suppressed_while_work_queued():
+    """Test that busywork is only generated when the queue is empty."""
+    cont_agent = make_agent(interval=0.01, max_iterations=3)
+    cont_agent.add_task("Task 1")
+    cont_agent.add_task("Task 2")
+
+    cont_agent.start()
+    time.sleep(0.5)
+    cont_agent.stop()
+
+    results = cont_agent.get_results()
+    assert [r["task"] for r in results[:2]] == ["Task 1", "Task 2"]
+    assert cont_agent.get_status()["admission"]["background_suppressed"] >= 2
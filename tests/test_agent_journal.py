@@ -0,0 +1,135 @@
+"""Tests for the durable ContinuousAgent journal."""
+
+import time
+
+import pytest
+
+from src.llm_framework.agent_journal import AgentJournal
+from src.llm_framework.continuous_agent import ContinuousAgent
+from src.llm_framework.core.agent import Agent, AgentConfig
+from tests.test_base_provider import MockProvider
+
+
+def test_journal_recovers_pending_tasks(tmp_path):
+    """Test that queued tasks and history survive a crash."""
+    path = str(tmp_path / "agent.wal")
+    journal = AgentJournal(path)
+    journal.recover()
+    first = journal.add("Task 1", "normal", "default")
+    journal.add("Task 2", "high", "team-a")
+    journal.start(first)
+    journal.done(first, {"task": "Task 1", "result": "ok"}, 1)
+    # No close(): simulate the process dying
+
+    state = AgentJournal(path).recover()
+
+    assert [t["task"] for t in state.pending] == ["Task 2"]
+    assert state.pending[0]["priority"] == "high"
+    assert state.pending[0]["tenant"] == "team-a"
+    assert state.history == [{"task": "Task 1", "result": "ok"}]
+    assert state.iteration_count == 1
+
+
+def test_journal_requeues_in_flight_task_once(tmp_path):
+    """Test that an interrupted task is re-queued once, then abandoned."""
+    path = str(tmp_path / "agent.wal")
+    journal = AgentJournal(path)
+    journal.recover()
+    task_id = journal.add("Crashy task", "normal", "default")
+    journal.start(task_id)
+
+    journal = AgentJournal(path)
+    state = journal.recover()
+    assert state.requeued == 1
+    assert state.pending[0]["requeued"] is True
+
+    # Recovering again without running it must not re-queue a second time
+    journal = AgentJournal(path)
+    state = journal.recover()
+    assert state.requeued == 0
+    assert len(state.pending) == 1
+
+    journal.start(task_id)
+    state = AgentJournal(path).recover()
+    assert state.pending == []
+    assert state.abandoned == 1
+    assert state.history[-1]["task"] == "Crashy task"
+    assert "error" in state.history[-1]
+
+
+def test_journal_snapshot_compacts_log(tmp_path):
+    """Test that snapshots truncate the log without losing state."""
+    path = str(tmp_path / "agent.wal")
+    journal = AgentJournal(path, snapshot_every=10, history_limit=5)
+    journal.recover()
+    for i in range(20):
+        task_id = journal.add(f"Task {i}", "normal", "default")
+        journal.start(task_id)
+        journal.done(task_id, {"task": f"Task {i}", "result": str(i)}, i + 1)
+
+    with open(path) as f:
+        assert len(f.readlines()) < 10
+
+    state = AgentJournal(path).recover()
+    assert state.pending == []
+    assert [h["result"] for h in state.history] == ["15", "16", "17", "18", "19"]
+    assert state.iteration_count == 20
+
+
+def test_journal_ignores_torn_last_record(tmp_path):
+    """Test that a partially written record from a crash is skipped."""
+    path = str(tmp_path / "agent.wal")
+    journal = AgentJournal(path)
+    journal.recover()
+    journal.add("Task 1", "normal", "default")
+    with open(path, "a") as f:
+        f.write('{"op": "add", "id": "j2", "ta')
+
+    state = AgentJournal(path).recover()
+
+    assert [t["task"] for t in state.pending] == ["Task 1"]
+
+
+def test_continuous_agent_resumes_from_journal(tmp_path):
+    """Test that a restarted agent runs tasks queued before the restart."""
+    path = str(tmp_path / "agent.wal")
+    agent = Agent(AgentConfig(name="Test"), MockProvider())
+
+    first = ContinuousAgent(agent, interval=0.1, journal=AgentJournal(path))
+    first.add_task("Task 1")
+    first.add_task("Task 2")
+    assert first.task_queue == ["Task 1", "Task 2"]
+
+    second = ContinuousAgent(agent, interval=0.1, max_iterations=2, journal=AgentJournal(path))
+    assert second.task_queue == ["Task 1", "Task 2"]
+
+    second.start()
+    time.sleep(1)
+    second.stop()
+    second.journal.close()
+
+    third = ContinuousAgent(agent, journal=AgentJournal(path))
+    assert third.task_queue == []
+    assert [r["task"] for r in third.get_results()] == ["Task 1", "Task 2"]
+    assert third.iteration_count == 2
+
+
+def test_invalid_task_is_not_journaled(tmp_path):
+    """Test that a rejected task or a bad journal entry never blocks a restart."""
+    path = str(tmp_path / "agent.wal")
+    agent = Agent(AgentConfig(name="Test"), MockProvider())
+
+    first = ContinuousAgent(agent, journal=AgentJournal(path))
+    with pytest.raises(ValueError):
+        first.add_task("Bad class", priority="urgent")
+    first.add_task("Good")
+    # A journal written by an older version may still hold a bad entry
+    first.journal.add("Old bad entry", "urgent", "default")
+
+    second = ContinuousAgent(agent, journal=AgentJournal(path))
+    assert second.task_queue == ["Good"]
+    assert [r["task"] for r in second.get_results()] == ["Old bad entry"]
+    assert "Dropped on restore" in second.get_results()[0]["error"]
+
+    third = ContinuousAgent(agent, journal=AgentJournal(path))
+    assert third.task_queue == ["Good"]
@@ -0,0 +1,172 @@
+"""Tests for the asyncio agent runtime."""
+
+import threading
+import time
+
+from src.llm_framework.async_runtime import AsyncAgentRuntime, AsyncContinuousAgent
+from src.llm_framework.core.agent import Agent, AgentConfig
+from tests.test_base_provider import MockProvider
+
+
+def make_agent(name="Test"):
+    """Create an agent around the mock provider."""
+    return Agent(AgentConfig(name=name), MockProvider())
+
+
+def test_runtime_hosts_agents_without_threads_per_agent():
+    """Test that many agents run on one loop thread."""
+    runtime = AsyncAgentRuntime(max_concurrency=4)
+    threads_before = threading.active_count()
+
+    for i in range(200):
+        runtime.add_agent(f"agent-{i}", make_agent(f"Agent {i}"), interval=0.01, max_iterations=1)
+    runtime.start_agents()
+    time.sleep(0.5)
+
+    # One loop thread plus at most max_concurrency pool workers
+    assert threading.active_count() - threads_before <= 5
+
+    status = runtime.get_status()
+    runtime.stop()
+
+    assert status["agent_count"] == 200
+    assert all(s["iteration_count"] == 1 for s in status["agents"].values())
+
+
+def test_async_agent_has_continuous_agent_surface():
+    """Test start/stop/status/results match ContinuousAgent."""
+    runtime = AsyncAgentRuntime()
+    cont_agent = runtime.add_agent("test", make_agent(), interval=0.01, max_iterations=2)
+    assert isinstance(cont_agent, AsyncContinuousAgent)
+
+    cont_agent.add_task("Task 1")
+    cont_agent.add_task("Task 2")
+    cont_agent.start()
+    assert cont_agent.is_running is True
+    time.sleep(0.3)
+
+    results = cont_agent.get_results()
+    assert [r["task"] for r in results] == ["Task 1", "Task 2"]
+    assert cont_agent.get_status()["is_running"] is False
+
+    cont_agent.stop()
+    runtime.stop()
+
+
+def test_async_agent_callbacks():
+    """Test that sync and async callbacks are invoked."""
+    runtime = AsyncAgentRuntime()
+    calls = []
+
+    async def async_callback(task, result):
+        calls.append(("async", task))
+
+    first = runtime.add_agent("a", make_agent(), interval=0.01, max_iterations=1)
+    first.on_result_callback = async_callback
+    first.add_task("Async task")
+
+    second = runtime.add_agent("b", make_agent(), interval=0.01, max_iterations=1)
+    second.on_result_callback = lambda task, result: calls.append(("sync", task))
+    second.add_task("Sync task")
+
+    runtime.start_agents()
+    time.sleep(0.3)
+    runtime.stop()
+
+    assert sorted(calls) == [("async", "Async task"), ("sync", "Sync task")]
+
+
+def test_interactive_task_wakes_idle_agent():
+    """Test that interactive work does not wait for the interval."""
+    runtime = AsyncAgentRuntime()
+    cont_agent = runtime.add_agent("test", make_agent(), interval=30)
+    cont_agent.start()
+    time.sleep(0.1)  # First iteration runs generated work, then sleeps
+
+    cont_agent.add_task("Urgent", priority="interactive")
+    time.sleep(0.2)
+    tasks = [r["task"] for r in cont_agent.get_results()]
+    runtime.stop()
+
+    assert "Urgent" in tasks
+
+
+def test_call_every():
+    """Test timer-based periodic tasks."""
+    runtime = AsyncAgentRuntime()
+    ticks = []
+    runtime.call_every(0.02, lambda: ticks.append(1))
+    time.sleep(0.2)
+    runtime.stop()
+
+    assert len(ticks) >= 3
+    assert runtime.is_running is False
+
+
+class RecordingProvider(MockProvider):
+    """Mock provider that logs prompts in call order and takes a while."""
+
+    def __init__(self, calls, delay=0.0):
+        super().__init__()
+        self.calls = calls
+        self.delay = delay
+
+    def generate(self, prompt, **kwargs):
+        self.calls.append(prompt)
+        time.sleep(self.delay)
+        return super().generate(prompt, **kwargs)
+
+
+def test_shared_scheduler_orders_tasks_across_agents():
+    """Test that an interactive task overtakes background tasks queued by other agents."""
+    runtime = AsyncAgentRuntime(max_concurrency=1)
+    calls = []
+
+    def add(name, task, priority, delay=0.0):
+        agent = Agent(AgentConfig(name=name), RecordingProvider(calls, delay))
+        cont_agent = runtime.add_agent(name, agent, interval=30, max_iterations=1)
+        cont_agent.add_task(task, priority=priority)
+        return cont_agent
+
+    add("blocker", "Hold the slot", "normal", delay=0.3).start()
+    time.sleep(0.05)
+    for i in range(5):
+        add(f"bulk-{i}", f"Bulk {i}", "background").start()
+    time.sleep(0.05)
+    add("urgent", "Urgent", "interactive").start()
+    time.sleep(0.5)
+
+    status = runtime.get_status()
+    runtime.stop()
+
+    order = [next(t for t in ["Hold", "Urgent", "Bulk"] if t in c) for c in calls]
+    assert order == ["Hold", "Urgent"] + ["Bulk"] * 5
+    assert status["turns_in_flight"] == 0
+    assert status["scheduler"]["dispatched"]["interactive"] == 1
+
+
+def test_stop_while_waiting_for_a_turn_keeps_the_task():
+    """Test that a forced stop neither loses queued nor running tasks."""
+    runtime = AsyncAgentRuntime(max_concurrency=1)
+    calls = []
+
+    blocker = runtime.add_agent(
+        "blocker", Agent(AgentConfig(name="blocker"), RecordingProvider(calls, delay=2.0)),
+        interval=30, max_iterations=1,
+    )
+    blocker.add_task("Hold the slot")
+    waiting = runtime.add_agent("waiting", make_agent("waiting"), interval=30, max_iterations=1)
+    waiting.add_task("Waiting")
+
+    blocker.start()
+    deadline = time.monotonic() + 5
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    waiting.start()
+    time.sleep(0.1)
+    runtime.stop(timeout=0.2)
+
+    assert waiting.task_queue == ["Waiting"]
+    assert waiting.get_results() == []
+    assert [r["task"] for r in blocker.get_results()] == ["Hold the slot"]
+    assert "Cancelled" in blocker.get_results()[0]["error"]
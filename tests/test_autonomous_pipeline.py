@@ -0,0 +1,136 @@
+"""Tests for the pipelined autonomous agent runtime."""
+
+import threading
+import time
+
+import pytest
+
+from src.llm_framework.analysis_cache import AnalysisCache
+from src.llm_framework.autonomous_agent import AutonomousAgent, CodeAnalysisAgent
+from src.llm_framework.autonomous_pipeline import AutonomousPipeline
+from src.llm_framework.repo_index import RepoIndex
+from src.llm_framework.work_log import WorkLogWriter
+
+
+class SlowAgent:
+    """LLM stand-in that takes a while and tracks concurrency."""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def execute(self, task):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return f"Done: {task}"
+
+
+class CountingAgent(AutonomousAgent):
+    """Autonomous agent with a fixed amount of work."""
+
+    def __init__(self, name, agent, items, tmp_path):
+        super().__init__(name, agent, str(tmp_path),
+                         log_writer=WorkLogWriter(str(tmp_path / f"{name}.jsonl")))
+        self.items = list(items)
+        self.lock = threading.Lock()
+
+    def discover_work(self):
+        with self.lock:
+            if not self.items:
+                return None
+            return {"context": {"item": self.items.pop(0)}}
+
+    def prepare_work(self, work):
+        return {"task": f"item {work['context']['item']}", "context": work["context"]}
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_pipeline_runs_generation_in_parallel(tmp_path):
+    """Test that LLM calls overlap and every item reaches the sink."""
+    llm = SlowAgent()
+    agents = [CountingAgent(f"agent{i}", llm, range(4), tmp_path) for i in range(2)]
+    pipeline = AutonomousPipeline(agents, generate_workers=4, idle_interval=60)
+
+    start = time.monotonic()
+    pipeline.start()
+    assert wait_for(lambda: sum(pipeline.get_stats()["completed"].values()) == 8)
+    elapsed = time.monotonic() - start
+    pipeline.stop(timeout=5)
+
+    # Eight 0.1 s calls with four workers: well under the sequential 0.8 s
+    assert llm.max_active > 1
+    assert elapsed < 0.6
+    stats = pipeline.get_stats()
+    assert stats["completed"] == {"agent0": 4, "agent1": 4}
+    assert stats["stages"]["sink"]["processed"] == 8
+    assert [len(a.work_log) for a in agents] == [4, 4]
+
+
+def test_pipeline_wakes_idle_agents(tmp_path):
+    """Test that an agent with no work rests until woken."""
+    agent = CountingAgent("agent", SlowAgent(0), [], tmp_path)
+    pipeline = AutonomousPipeline([agent], idle_interval=60)
+    pipeline.start()
+    assert wait_for(lambda: pipeline.get_stats()["stages"]["discover"]["processed"] == 1)
+
+    with agent.lock:
+        agent.items.append("late")
+    pipeline.wake()
+    assert wait_for(lambda: pipeline.get_stats()["completed"]["agent"] == 1, timeout=2)
+    pipeline.stop(timeout=5)
+
+
+def test_pipeline_counts_stage_errors(tmp_path):
+    """Test that a failing LLM call is counted and does not stop the pipeline."""
+
+    class FailingAgent:
+        def execute(self, task):
+            raise RuntimeError("provider down")
+
+    agent = CountingAgent("agent", FailingAgent(), range(3), tmp_path)
+    pipeline = AutonomousPipeline([agent], idle_interval=60)
+    pipeline.start()
+    assert wait_for(lambda: pipeline.get_stats()["stages"]["generate"]["errors"] == 3)
+    pipeline.stop(timeout=5)
+    assert pipeline.get_stats()["completed"]["agent"] == 0
+
+
+def test_pipeline_drives_split_agents(tmp_path):
+    """Test that CodeAnalysisAgent discovery and preparation run as stages."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for name in ("a", "b", "tiny"):
+        body = "x = 1\n" if name == "tiny" else f"def {name}():\n    return 1\n" * 10
+        (repo / f"{name}.py").write_text(body)
+
+    agent = CodeAnalysisAgent(SlowAgent(0), str(repo), RepoIndex(str(repo)), AnalysisCache())
+    agent.log_writer = WorkLogWriter(str(tmp_path / "log.jsonl"))
+    pipeline = AutonomousPipeline([agent], idle_interval=60)
+    pipeline.start()
+    assert wait_for(lambda: pipeline.get_stats()["completed"]["code_analysis"] == 1)
+    pipeline.stop(timeout=5)
+    assert agent.work_log[0]["work"]["context"]["files"] == [
+        str(repo / "a.py"), str(repo / "b.py")
+    ]
+    assert all("Analyze this Python code" in e["work"]["task"] for e in agent.work_log)
+
+
+def test_pipeline_rejects_invalid_workers():
+    """Test configuration validation."""
+    with pytest.raises(ValueError):
+        AutonomousPipeline([], generate_workers=0)
@@ -10,7 +10,7 @@ class MockProvider(BaseProvider):
     def generate(self, prompt: str, **kwargs) -> str:
         return f"Mock response to: {prompt}"
 
-    def is_available(self) -> bool:
+    def is_available(self, deadline=None) -> bool:
         return True
 
     def get_provider_name(self) -> str:
@@ -0,0 +1,123 @@
+"""Tests for the JSONL batch runner."""
+
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from src.llm_framework.batch import BatchRunner, load_completed_ids, read_records
+
+
+class EchoAgent:
+    """Agent that echoes its task after a delay taken from the task text."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def execute(self, task, context=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(float(task.split(":")[1]) if ":" in task else 0)
+        with self._lock:
+            self.active -= 1
+        if task.startswith("fail"):
+            raise RuntimeError("bad task")
+        return f"{task} {context or ''}".strip()
+
+
+def records(*tasks):
+    lines = [json.dumps({"id": f"r{i}", "agent": "echo", "task": t}) for i, t in enumerate(tasks)]
+    return read_records(io.StringIO("\n".join(lines)))
+
+
+def output_lines(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_ordered_output_follows_input_order():
+    """Test that ordered mode writes results in input order."""
+    output = io.StringIO()
+    runner = BatchRunner({"echo": EchoAgent()}, concurrency=3, ordered=True, progress_interval=None)
+
+    stats = runner.run(records("a:0.2", "b:0", "c:0.1"), output)
+
+    assert [line["id"] for line in output_lines(output)] == ["r0", "r1", "r2"]
+    assert stats["succeeded"] == 3
+
+
+def test_concurrency_is_bounded_and_errors_recorded():
+    """Test the concurrency cap and per-record error capture."""
+    agent = EchoAgent()
+    output = io.StringIO()
+    runner = BatchRunner({"echo": agent}, concurrency=2, progress_interval=None)
+
+    stats = runner.run(records("a:0.05", "b:0.05", "c:0.05", "fail", "d"), output)
+    by_id = {line["id"]: line for line in output_lines(output)}
+
+    assert agent.max_active == 2
+    assert by_id["r3"]["error"] == "bad task"
+    assert stats["failed"] == 1 and stats["succeeded"] == 4
+
+
+def test_resume_skips_completed_and_repairs_partial_line(tmp_path):
+    """Test checkpoint resume from an interrupted output file."""
+    path = tmp_path / "out.jsonl"
+    path.write_text(
+        json.dumps({"id": "r0", "result": "done"}) + "\n"
+        + json.dumps({"id": "r1", "error": "boom"}) + "\n"
+        + '{"id": "r2", "res'
+    )
+
+    assert load_completed_ids(str(path)) == {"r0", "r1"}
+    assert path.read_text().endswith("\n")
+    # Retrying drops the failed record, so the rerun does not add a second line
+    assert load_completed_ids(str(path), retry_errors=True) == {"r0"}
+    assert '"r1"' not in path.read_text()
+
+    with open(path, "a") as output:
+        stats = BatchRunner({"echo": EchoAgent()}, progress_interval=None).run(
+            records("a", "b", "c"), output, {"r0"}
+        )
+    ids = [json.loads(line)["id"] for line in path.read_text().splitlines()]
+
+    assert stats["skipped"] == 1
+    assert sorted(ids) == ["r0", "r1", "r2"]
+
+
+def test_read_records_validates_and_defaults_ids():
+    """Test record parsing."""
+    parsed = list(read_records(io.StringIO('{"agent": "x", "task": "t", "context": {"k": 1}}\n\n')))
+    assert parsed == [(0, {"agent": "x", "task": "t", "context": {"k": 1}, "id": "1"})]
+
+    with pytest.raises(ValueError):
+        list(read_records(io.StringIO('{"task": "no agent"}')))
+
+
+def test_unknown_agent_is_an_error_record():
+    """Test that records naming a missing agent fail without stopping the run."""
+    output = io.StringIO()
+    lines = io.StringIO(json.dumps({"id": 1, "agent": "nope", "task": "t"}))
+    BatchRunner({}, progress_interval=None).run(read_records(lines), output)
+
+    assert "Unknown agent" in output_lines(output)[0]["error"]
+
+
+def test_shared_agent_history_does_not_grow():
+    """Test that records run on per-record agent copies."""
+    from src.llm_framework.core.agent import Agent, AgentConfig
+    from src.llm_framework.providers.mock_provider import MockLLMProvider
+
+    agent = Agent(AgentConfig(name="writer"), MockLLMProvider())
+    output = io.StringIO()
+    lines = [json.dumps({"id": i, "agent": "writing", "task": f"Draft {i}"}) for i in range(20)]
+    stats = BatchRunner({"writing": agent}, concurrency=4, progress_interval=None).run(
+        read_records(io.StringIO("\n".join(lines))), output
+    )
+
+    assert stats["succeeded"] == 20
+    assert agent.conversation_history == []
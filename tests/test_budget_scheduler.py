@@ -0,0 +1,128 @@
+"""Tests for the shared LLM budget scheduler."""
+
+import os
+import queue
+import time
+
+import pytest
+
+from src.llm_framework.autonomous_pipeline import AutonomousPipeline
+from src.llm_framework.budget_scheduler import BudgetScheduler, Quota, WorkScorer
+from src.llm_framework.impact_analysis import ImportGraph
+from src.llm_framework.repo_index import RepoIndex
+from tests.test_autonomous_pipeline import CountingAgent, SlowAgent, wait_for
+
+
+class Named:
+    def __init__(self, name):
+        self.name = name
+
+
+def item(agent, task="x" * 40, score=None):
+    context = {} if score is None else {"value": score}
+    return (agent, {"task": task, "context": context}, None)
+
+
+class ContextScorer:
+    def score(self, agent_name, work):
+        return work["context"]["value"]
+
+
+def test_highest_value_first():
+    """Test that work is served by score, not arrival order."""
+    budget = BudgetScheduler(scorer=ContextScorer())
+    a, b = Named("a"), Named("b")
+    budget.put(item(a, score=0.1))
+    budget.put(item(b, score=0.9))
+    budget.put(item(a, score=0.5))
+
+    assert [budget.get(timeout=0)[1]["context"]["score"] for _ in range(3)] == [0.9, 0.5, 0.1]
+    with pytest.raises(queue.Empty):
+        budget.get(timeout=0)
+
+
+def test_call_quota_per_window():
+    """Test that an agent over its quota waits while others run."""
+    budget = BudgetScheduler(quotas={"a": Quota(calls=1)}, window=0.3, scorer=ContextScorer())
+    a, b = Named("a"), Named("b")
+    budget.put(item(a, score=0.9))
+    budget.put(item(a, score=0.8))
+    budget.put(item(b, score=0.1))
+
+    assert budget.get(timeout=0)[0] is a
+    # a is out of quota, so lower-value work from b goes next
+    assert budget.get(timeout=0)[0] is b
+    with pytest.raises(queue.Empty):
+        budget.get(timeout=0.05)
+
+    started = time.monotonic()
+    assert budget.get(timeout=2)[0] is a
+    assert time.monotonic() - started >= 0.2
+    assert budget.usage("a")["calls"] == 1
+
+
+def test_token_quota_and_charge():
+    """Test token accounting for prompts and responses."""
+    budget = BudgetScheduler(default_quota=Quota(tokens=100), window=60)
+    a = Named("a")
+    budget.put(item(a, task="x" * 200))  # 50 tokens
+    budget.put(item(a, task="x" * 200))
+    budget.get(timeout=0)
+    budget.charge("a", 40)
+    assert budget.usage("a") == {"calls": 1, "tokens": 90}
+    with pytest.raises(queue.Empty):
+        budget.get(timeout=0)
+
+    # A call bigger than the whole quota still runs once the window is free
+    big = BudgetScheduler(default_quota=Quota(tokens=10))
+    big.put(item(a, task="x" * 400))
+    assert big.get(timeout=0)[0] is a
+
+    with pytest.raises(ValueError):
+        Quota(calls=0)
+
+
+def test_put_blocks_when_full_and_drops_low_value():
+    """Test backpressure and the minimum score."""
+    budget = BudgetScheduler(scorer=ContextScorer(), min_score=0.2, maxsize=1)
+    a = Named("a")
+    budget.put(item(a, score=0.1))
+    assert budget.qsize() == 0 and budget.dropped == 1
+
+    budget.put(item(a, score=0.5))
+    with pytest.raises(queue.Full):
+        budget.put(item(a, score=0.5), timeout=0.05)
+
+
+def test_scorer_ranks_recent_central_files(tmp_path):
+    """Test recency, size and centrality scoring."""
+    (tmp_path / "core.py").write_text("def f():\n    return 1\n" * 20)
+    (tmp_path / "user.py").write_text("import core\n")
+    (tmp_path / "old.py").write_text("def g():\n    return 1\n" * 20)
+    week_ago = time.time() - 7 * 86400
+    os.utime(tmp_path / "old.py", (week_ago, week_ago))
+    index = RepoIndex(str(tmp_path))
+    scorer = WorkScorer(index, ImportGraph(index), agent_weights={"docs": 0.5})
+
+    core = scorer.score("code", {"context": {"files": [str(tmp_path / "core.py")]}})
+    old = scorer.score("code", {"context": {"file": str(tmp_path / "old.py")}})
+    user = scorer.score("code", {"context": {"changed": ["user.py"]}})
+    assert core > old and core > user
+    assert scorer.score("docs", {"context": {"file": "core.py"}}) == pytest.approx(core / 2)
+    assert scorer.score("code", {"context": {}}) == 0.0
+
+
+def test_pipeline_uses_budget(tmp_path):
+    """Test that the pipeline's LLM calls go through the budget."""
+    budget = BudgetScheduler(default_quota=Quota(calls=2), window=60)
+    agent = CountingAgent("agent", SlowAgent(0), range(5), tmp_path)
+    pipeline = AutonomousPipeline([agent], idle_interval=60, budget=budget)
+    pipeline.start()
+    assert wait_for(lambda: pipeline.get_stats()["completed"]["agent"] == 2)
+    time.sleep(0.2)
+    stats = pipeline.get_stats()
+    pipeline.stop(timeout=1)
+
+    assert stats["completed"]["agent"] == 2
+    assert stats["budget"]["agents"]["agent"]["calls"] == 2
+    assert stats["budget"]["agents"]["agent"]["tokens"] > 0
@@ -0,0 +1,171 @@
+"""Tests for asynchronous callback dispatch."""
+
+import threading
+import time
+
+import pytest
+from src.llm_framework.callback_dispatcher import CallbackDispatcher
+from src.llm_framework.continuous_agent import ContinuousAgent
+from src.llm_framework.core.agent import Agent, AgentConfig
+from tests.test_base_provider import MockProvider
+
+
+class RecordingSink:
+    """Sink that records every delivered result."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, task, result):
+        self.calls.append((task, result))
+
+
+class BatchSink:
+    """Sink that receives whole batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, task, result):
+        raise AssertionError("deliver_batch should be preferred")
+
+    def deliver_batch(self, items):
+        self.batches.append(list(items))
+
+
+def test_dispatcher_delivers_results():
+    """Test that submitted results reach the sink."""
+    sink = RecordingSink()
+    dispatcher = CallbackDispatcher(sink, batch_wait=0.01)
+
+    dispatcher("Task 1", "Result 1")
+    dispatcher("Task 2", "Result 2")
+    assert dispatcher.flush(timeout=2)
+    dispatcher.stop()
+
+    assert sink.calls == [("Task 1", "Result 1"), ("Task 2", "Result 2")]
+    assert dispatcher.get_stats()["delivered"] == 2
+
+
+def test_dispatcher_uses_deliver_batch():
+    """Test that sinks with deliver_batch receive batches."""
+    sink = BatchSink()
+    dispatcher = CallbackDispatcher(sink, batch_size=10, batch_wait=0.1)
+
+    for i in range(5):
+        dispatcher.submit(f"Task {i}", f"Result {i}")
+    dispatcher.stop()
+
+    delivered = [item for batch in sink.batches for item in batch]
+    assert len(delivered) == 5
+    assert len(sink.batches) < 5
+
+
+def test_dispatcher_retries_failed_delivery():
+    """Test that failed deliveries are retried."""
+    attempts = []
+
+    def flaky(task, result):
+        attempts.append(task)
+        if len(attempts) < 3:
+            raise RuntimeError("sink unavailable")
+
+    dispatcher = CallbackDispatcher(flaky, batch_wait=0.01, retry_backoff=0.01)
+    dispatcher.submit("Task", "Result")
+    dispatcher.stop()
+
+    stats = dispatcher.get_stats()
+    assert len(attempts) == 3
+    assert stats["delivered"] == 1
+    assert stats["failed"] == 0
+
+
+def test_dispatcher_drop_oldest_policy():
+    """Test that drop_oldest discards the oldest queued result."""
+    release = threading.Event()
+    sink = RecordingSink()
+
+    def slow(task, result):
+        release.wait(2)
+        sink(task, result)
+
+    dispatcher = CallbackDispatcher(
+        slow, max_outbox=2, batch_size=1, batch_wait=0, overflow_policy="drop_oldest"
+    )
+    dispatcher.submit("Task 0", "r")
+    time.sleep(0.1)  # Worker picks up Task 0 and blocks
+    for i in range(1, 5):
+        dispatcher.submit(f"Task {i}", "r")
+    release.set()
+    dispatcher.stop()
+
+    tasks = [task for task, _ in sink.calls]
+    assert tasks == ["Task 0", "Task 3", "Task 4"]
+    assert dispatcher.get_stats()["dropped"] == 2
+
+
+def test_dispatcher_spill_policy(tmp_path):
+    """Test that overflow spills to disk and is delivered later."""
+    release = threading.Event()
+    sink = RecordingSink()
+    spill_path = str(tmp_path / "outbox.jsonl")
+
+    def slow(task, result):
+        release.wait(2)
+        sink(task, result)
+
+    dispatcher = CallbackDispatcher(
+        slow,
+        max_outbox=1,
+        batch_size=1,
+        batch_wait=0,
+        overflow_policy="spill",
+        spill_path=spill_path,
+    )
+    dispatcher.submit("Task 0", "r")
+    time.sleep(0.1)
+    for i in range(1, 4):
+        dispatcher.submit(f"Task {i}", "r")
+
+    assert dispatcher.get_stats()["spilled"] == 2
+    release.set()
+    assert dispatcher.flush(timeout=2)
+    dispatcher.stop()
+
+    assert sorted(task for task, _ in sink.calls) == ["Task 0", "Task 1", "Task 2", "Task 3"]
+    assert dispatcher.get_stats()["dropped"] == 0
+
+
+def test_dispatcher_invalid_policy():
+    """Test that unknown overflow policies are rejected."""
+    with pytest.raises(ValueError, match="Unknown overflow policy"):
+        CallbackDispatcher(RecordingSink(), overflow_policy="explode")
+
+    with pytest.raises(ValueError, match="spill_path"):
+        CallbackDispatcher(RecordingSink(), overflow_policy="spill")
+
+
+def test_continuous_agent_with_dispatcher():
+    """Test that a slow sink does not block the agent loop."""
+    release = threading.Event()
+    sink = RecordingSink()
+
+    def slow(task, result):
+        release.wait(2)
+        sink(task, result)
+
+    agent = Agent(AgentConfig(name="Test"), MockProvider())
+    cont_agent = ContinuousAgent(agent, interval=0.01, max_iterations=3)
+    dispatcher = CallbackDispatcher(slow, batch_wait=0)
+    cont_agent.on_result_callback = dispatcher
+
+    cont_agent.start()
+    time.sleep(0.5)
+
+    # All iterations finished while the sink was still blocked
+    assert cont_agent.iteration_count == 3
+    assert "callback_dispatcher" in cont_agent.get_status()
+
+    release.set()
+    dispatcher.stop()
+    assert len(sink.calls) == 3
@@ -0,0 +1,118 @@
+"""Tests for the git change feed."""
+
+import json
+import subprocess
+
+import pytest
+
+from src.llm_framework.analysis_cache import AnalysisCache
+from src.llm_framework.autonomous_agent import CodeAnalysisAgent
+from src.llm_framework.change_feed import GitChangeFeed
+from src.llm_framework.repo_index import RepoIndex
+
+SOURCE = "".join(f"def f{i}():\n    return {i}\n\n\n" for i in range(10))
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=str(repo), check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A git repository with one commit."""
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    git(path, "config", "user.email", "dev@example.com")
+    git(path, "config", "user.name", "Dev")
+    (path / "a.py").write_text(SOURCE)
+    (path / "b.py").write_text(SOURCE.replace("return", "return -"))
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "initial")
+    return path
+
+
+class MockAgent:
+    def __init__(self):
+        self.tasks = []
+
+    def execute(self, task):
+        self.tasks.append(task)
+        return "Looks fine"
+
+
+def test_commits_produce_file_and_hunk_events(repo):
+    """Test that new commits are reported with their changed lines."""
+    feed = GitChangeFeed(str(repo), worktree=False)
+    assert feed.poll() == []
+
+    (repo / "a.py").write_text(SOURCE.replace("return 3", "return 33"))
+    git(repo, "mv", "b.py", "c.py")
+    git(repo, "commit", "-qam", "change")
+    events = {e.path: e for e in feed.poll()}
+
+    assert events["a.py"].status == "modified" and events["a.py"].source == "commit"
+    assert events["a.py"].hunks == [(14, 1)]
+    assert events["c.py"].status == "renamed" and events["c.py"].old_path == "b.py"
+
+    # A quiet repository costs no git calls
+    calls = feed.git_calls
+    assert feed.poll() == []
+    assert feed.git_calls == calls
+
+
+def test_worktree_changes(repo):
+    """Test that edits, new files and reverts are each reported once."""
+    feed = GitChangeFeed(str(repo))
+    feed.poll()
+
+    (repo / "a.py").write_text(SOURCE + "x = 1\n")
+    (repo / "new.py").write_text("y = 2\n")
+    events = {e.path: e for e in feed.poll()}
+    assert events["a.py"].source == "worktree" and events["a.py"].hunks == [(41, 1)]
+    assert events["new.py"].status == "added"
+    assert feed.poll() == []
+
+    git(repo, "checkout", "--", "a.py")
+    assert [e.path for e in feed.poll()] == ["a.py"]
+
+
+def test_restart_resumes_from_saved_commit(repo, tmp_path):
+    """Test that commits made while stopped are reported on restart."""
+    state = str(tmp_path / "feed.json")
+    GitChangeFeed(str(repo), state_path=state, worktree=False).poll()
+
+    (repo / "b.py").write_text("z = 3\n")
+    git(repo, "commit", "-qam", "offline change")
+    restarted = GitChangeFeed(str(repo), state_path=state, worktree=False)
+    assert [e.path for e in restarted.poll()] == ["b.py"]
+
+    # Unknown history asks subscribers for a full pass
+    with open(state, "w") as f:
+        json.dump({"head": "0" * 40}, f)
+    feed = GitChangeFeed(str(repo), state_path=state, worktree=False)
+    subscription = feed.subscribe("agent")
+    subscription.full_scan = False
+    feed.poll()
+    assert subscription.full_scan
+
+
+def test_agent_follows_feed(repo):
+    """Test that a following agent only looks at changed files."""
+    index = RepoIndex(str(repo), refresh_interval=None)
+    feed = GitChangeFeed(str(repo), index)
+    agent = CodeAnalysisAgent(MockAgent(), str(repo), index, AnalysisCache())
+    agent.follow(feed)
+    feed.poll()
+
+    while agent.run_cycle():
+        pass
+    assert agent.find_work() is None
+
+    (repo / "b.py").write_text(SOURCE.replace("return 5", "return 55"))
+    feed.poll()
+    work = agent.find_work()
+    assert work["context"]["units"] == ["b.py:21-22 f5"]
+    assert agent.find_work() is None
+    # The tree was walked once; the change came from git
+    assert index.refreshes == 1
@@ -0,0 +1,145 @@
+"""Tests for the AST code chunker."""
+
+from src.llm_framework.analysis_cache import AnalysisCache
+from src.llm_framework.autonomous_agent import CodeAnalysisAgent
+from src.llm_framework.code_chunker import PythonChunker, format_units, pack_units
+from src.llm_framework.repo_index import RepoIndex
+
+SOURCE = '''import os
+
+LIMIT = 10
+
+
+def helper(x):
+    return x + LIMIT
+
+
+@staticmethod
+def uses_helper(path):
+    return helper(len(os.listdir(path)))
+
+
+class Store:
+    """A store."""
+
+    def get(self):
+        return helper(1)
+'''
+
+
+class MockAgent:
+    def __init__(self):
+        self.tasks = []
+
+    def execute(self, task):
+        self.tasks.append(task)
+        return "Looks fine"
+
+
+def test_chunk_splits_units_with_dependencies():
+    """Test that functions, classes and module blocks become units."""
+    units = PythonChunker().chunk(SOURCE, "mod.py")
+
+    assert [(u.name, u.kind) for u in units] == [
+        ("<module:1>", "module"),
+        ("helper", "function"),
+        ("uses_helper", "function"),
+        ("Store", "class"),
+    ]
+    assert units[1].dependencies == ["LIMIT"]
+    assert units[2].dependencies == ["helper", "os"]
+    # Decorators belong to their function
+    assert units[2].start_line == 10 and units[2].source.startswith("@staticmethod")
+    assert units[3].label == "mod.py:15-19 Store"
+
+
+def test_unit_hash_ignores_position():
+    """Test that moving a function keeps its hash and editing it changes it."""
+    chunker = PythonChunker()
+    before = {u.name: u.hash for u in chunker.chunk(SOURCE)}
+    moved = {u.name: u.hash for u in chunker.chunk("\n\n" + SOURCE.replace("x + LIMIT", "x - LIMIT"))}
+
+    assert moved["uses_helper"] == before["uses_helper"]
+    assert moved["Store"] == before["Store"]
+    assert moved["helper"] != before["helper"]
+
+
+def test_large_units_are_split():
+    """Test that big classes split into methods and big functions into parts."""
+    methods = "".join(f"    def m{i}(self):\n        return {i}\n\n" for i in range(20))
+    body = "".join(f"    x{i} = {i}\n" for i in range(100))
+    source = f"class Big:\n    pass\n\n{methods}\ndef long():\n{body}"
+
+    units = PythonChunker(max_tokens=50).chunk(source)
+    names = [u.name for u in units]
+    assert names[:3] == ["Big", "Big.m0", "Big.m1"]
+    assert "long (part 1/" in names[21]
+    assert all(u.tokens <= 50 for u in units)
+    assert "".join(u.source for u in units[21:]) == "def long():\n" + body
+
+
+def test_syntax_error_falls_back_to_one_unit():
+    """Test that unparseable files are still analysed."""
+    units = PythonChunker().chunk("def broken(:\n    pass\n")
+    assert [u.kind for u in units] == ["module"]
+
+
+def test_pack_units_respects_budget():
+    """Test greedy packing into prompts."""
+    units = PythonChunker().chunk(SOURCE)
+    batches = pack_units(units, token_budget=30, overhead=0)
+
+    assert [u for batch in batches for u in batch] == units
+    assert all(sum(u.tokens for u in b) <= 30 or len(b) == 1 for b in batches)
+    assert len(batches) > 1
+    assert len(pack_units(units, token_budget=10000)) == 1
+
+    prompt = format_units(batches[0], "Review:")
+    assert prompt.startswith("Review:\n\n### <string>:1-3 <module:1> (module)")
+
+
+def test_agent_requeues_only_changed_units(tmp_path):
+    """Test that editing one function only sends that function again."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "mod.py").write_text(SOURCE)
+    llm = MockAgent()
+    agent = CodeAnalysisAgent(llm, str(repo), RepoIndex(str(repo)), AnalysisCache())
+
+    while agent.run_cycle():
+        pass
+    assert len(llm.tasks) == 1
+    assert "def get(self)" in llm.tasks[0] and "LIMIT = 10" in llm.tasks[0]
+
+    (repo / "mod.py").write_text(SOURCE.replace("x + LIMIT", "x * LIMIT"))
+    agent.index.invalidate()
+    work = agent.find_work()
+    assert work["context"]["units"] == ["mod.py:6-7 helper"]
+    assert "Uses: LIMIT" in work["task"]
+    assert agent.find_work() is None
+
+
+def test_units_left_queued_are_found_after_restart(tmp_path):
+    """Test that a restart picks up units that were chunked but never analysed."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "mod.py").write_text(SOURCE)
+    db = str(tmp_path / "cache.db")
+
+    llm = MockAgent()
+    agent = CodeAnalysisAgent(llm, str(repo), RepoIndex(str(repo)), AnalysisCache(db),
+                              token_budget=60)
+    assert agent.run_cycle()
+    assert agent._pending
+    # The file is not cached while some of its units are still queued
+    file_hash = agent.index.get("mod.py").hash
+    assert not agent.cache.seen(file_hash, "code_analysis", CodeAnalysisAgent.PROMPT_VERSION)
+    agent.cache.close()
+
+    restarted = CodeAnalysisAgent(llm, str(repo), RepoIndex(str(repo)), AnalysisCache(db),
+                                  token_budget=60)
+    while restarted.run_cycle():
+        pass
+    analysed = [label for task in llm.tasks for label in task.split("### ")[1:]]
+    assert len(analysed) == len(PythonChunker().chunk(SOURCE, "mod.py"))
+    assert restarted.cache.seen(file_hash, "code_analysis", CodeAnalysisAgent.PROMPT_VERSION)
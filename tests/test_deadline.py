@@ -0,0 +1,126 @@
+"""Tests for task deadlines and their propagation to providers."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.llm_framework.continuous_agent import ContinuousAgent
+from src.llm_framework.core.agent import Agent, AgentConfig
+from src.llm_framework.core.deadline import Deadline, DeadlineExceeded, request_timeout
+from src.llm_framework.providers.ollama_provider import OllamaProvider
+from tests.test_base_provider import MockProvider
+
+
+class RecordingProvider(MockProvider):
+    """Mock provider that remembers the kwargs it was called with."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        self.calls.append(kwargs)
+        return super().generate(prompt, **kwargs)
+
+
+def test_deadline_caps_request_timeout():
+    """Test that the provider timeout is bounded by the time remaining."""
+    assert request_timeout(None, 60) == 60
+    assert request_timeout(Deadline(), 60) == 60
+    assert request_timeout(Deadline(600), 60) == 60
+    assert request_timeout(Deadline(5), 60) <= 5
+
+
+def test_expired_and_cancelled_deadlines_raise():
+    """Test that no time is handed out once a deadline is over."""
+    expired = Deadline(0)
+    assert expired.expired
+    with pytest.raises(DeadlineExceeded):
+        request_timeout(expired, 60)
+
+    cancelled = Deadline(600)
+    cancelled.cancel()
+    assert cancelled.expired and cancelled.cancelled
+    with pytest.raises(DeadlineExceeded, match="cancelled"):
+        cancelled.check()
+
+
+def test_agent_passes_deadline_to_provider():
+    """Test that Agent.execute hands the deadline to the provider."""
+    provider = RecordingProvider()
+    agent = Agent(AgentConfig(name="Test"), provider)
+    deadline = Deadline(30)
+
+    agent.execute("Task", deadline=deadline)
+    agent.execute("Task")
+
+    assert provider.calls[0]["deadline"] is deadline
+    assert "deadline" not in provider.calls[1]
+
+
+def test_agent_skips_expired_task():
+    """Test that an expired task never reaches the provider."""
+    provider = RecordingProvider()
+    agent = Agent(AgentConfig(name="Test"), provider)
+
+    with pytest.raises(DeadlineExceeded):
+        agent.execute("Task", deadline=Deadline(0))
+    assert provider.calls == []
+
+
+def test_ollama_timeout_reports_deadline():
+    """Test that Ollama uses the remaining time and reports the expiry."""
+    provider = OllamaProvider()
+    provider.session = MagicMock()
+    deadline = Deadline(0.05)
+
+    def slow_post(*args, **kwargs):
+        assert kwargs["timeout"] <= 0.05
+        time.sleep(0.06)
+        raise requests.exceptions.ReadTimeout()
+
+    provider.session.post.side_effect = slow_post
+    with patch.object(OllamaProvider, "is_available", return_value=True):
+        with pytest.raises(DeadlineExceeded):
+            provider.generate("prompt", deadline=deadline)
+
+
+def test_health_check_is_bounded_by_deadline():
+    """Test that a slow health check ends at the deadline, not its own timeout."""
+    provider = OllamaProvider()
+    provider.session = MagicMock()
+    deadline = Deadline(0.05)
+
+    def slow_get(*args, **kwargs):
+        assert kwargs["timeout"] <= 0.05
+        time.sleep(0.06)
+        raise requests.exceptions.ReadTimeout()
+
+    provider.session.get.side_effect = slow_get
+    agent = Agent(AgentConfig(name="Test"), provider)
+    with pytest.raises(DeadlineExceeded):
+        agent.execute("Task", deadline=deadline)
+    provider.session.post.assert_not_called()
+
+
+def test_continuous_agent_skips_tasks_expired_in_queue():
+    """Test that tasks whose deadline passed while queued are not executed."""
+    provider = RecordingProvider()
+    agent = Agent(AgentConfig(name="Test"), provider)
+    cont_agent = ContinuousAgent(agent, interval=0.05, max_iterations=1)
+
+    cont_agent.add_task("Stale task", deadline=0.01)
+    cont_agent.add_task("Fresh task", deadline=30)
+    time.sleep(0.05)
+
+    cont_agent.start()
+    time.sleep(0.5)
+    cont_agent.stop()
+
+    results = cont_agent.get_results()
+    assert results[0]["task"] == "Stale task" and "deadline" in results[0]["error"]
+    assert results[1]["task"] == "Fresh task" and "result" in results[1]
+    assert len(provider.calls) == 1
+    assert cont_agent.get_status()["tasks_expired"] == 1
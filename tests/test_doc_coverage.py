@@ -0,0 +1,109 @@
+"""Tests for the docstring coverage index."""
+
+from src.llm_framework.analysis_cache import AnalysisCache
+from src.llm_framework.autonomous_agent import DocumentationAgent
+from src.llm_framework.doc_coverage import DocCoverageIndex, scan_docstrings
+from src.llm_framework.repo_index import RepoIndex
+
+SOURCE = '''"""Module docs."""
+
+
+def documented():
+    """Has docs."""
+
+
+def bare(x):
+    return x
+
+
+def _private():
+    pass
+
+
+class Thing:
+    def method(self):
+        """Has docs."""
+
+    def other(self):
+        pass
+'''
+
+
+class MockAgent:
+    def __init__(self):
+        self.tasks = []
+
+    def execute(self, task):
+        self.tasks.append(task)
+        return '"""Returns x."""'
+
+
+def test_scan_docstrings(tmp_path):
+    """Test that undocumented public symbols are found."""
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE)
+
+    symbols, missing = scan_docstrings(str(path), "mod.py")
+    assert symbols == 6
+    assert [(m.symbol, m.kind, m.start_line) for m in missing] == [
+        ("bare", "function", 8),
+        ("Thing", "class", 16),
+        ("Thing.other", "function", 20),
+    ]
+
+    assert scan_docstrings(str(path), "mod.py", include_private=True)[0] == 7
+    path.write_text("def broken(:\n")
+    assert scan_docstrings(str(path), "mod.py") == (0, [])
+
+
+def test_index_updates_incrementally(tmp_path):
+    """Test that only changed files are parsed again."""
+    (tmp_path / "a.py").write_text(SOURCE)
+    (tmp_path / "b.py").write_text('"""Docs."""\n')
+    coverage = DocCoverageIndex(RepoIndex(str(tmp_path)))
+
+    assert len(coverage.missing()) == 3
+    assert coverage.parsed == 2
+    assert coverage.coverage() == {"files": 2, "symbols": 7, "documented": 4, "ratio": 4 / 7}
+
+    (tmp_path / "a.py").write_text(SOURCE.replace("    return x", '    """Docs."""'))
+    (tmp_path / "b.py").unlink()
+    coverage.index.invalidate()
+    assert [m.symbol for m in coverage.missing()] == ["Thing", "Thing.other"]
+    assert coverage.parsed == 3
+    assert coverage.missing("b.py") == []
+
+
+def test_process_pool_matches_in_process(tmp_path):
+    """Test that parallel parsing gives the same result."""
+    for i in range(6):
+        (tmp_path / f"m{i}.py").write_text(SOURCE)
+
+    serial = DocCoverageIndex(RepoIndex(str(tmp_path)), parallel_threshold=100)
+    parallel = DocCoverageIndex(RepoIndex(str(tmp_path)), max_workers=2, parallel_threshold=1)
+    try:
+        assert parallel.missing() == serial.missing()
+        assert len(parallel.missing()) == 18
+    finally:
+        parallel.close()
+
+
+def test_agent_asks_only_about_gaps(tmp_path):
+    """Test that the documentation agent prompts once per undocumented symbol."""
+    (tmp_path / "mod.py").write_text(SOURCE)
+    llm = MockAgent()
+    agent = DocumentationAgent(llm, str(tmp_path), RepoIndex(str(tmp_path)), AnalysisCache())
+
+    while agent.run_cycle():
+        pass
+    assert len(llm.tasks) == 3
+    assert llm.tasks[0].startswith("Write a docstring for the function `bare` (mod.py, line 8)")
+    assert "def documented" not in "".join(llm.tasks)
+
+    # Editing one function only re-checks that function
+    (tmp_path / "mod.py").write_text(SOURCE.replace("return x", "return x + 1"))
+    agent.index.invalidate()
+    work = agent.find_work()
+    assert work["context"]["symbol"] == "bare"
+    assert agent.find_work() is None
+    agent.close()
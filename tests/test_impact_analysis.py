@@ -0,0 +1,115 @@
+"""Tests for test impact analysis."""
+
+import sqlite3
+
+from src.llm_framework.analysis_cache import AnalysisCache
+from src.llm_framework.autonomous_agent import TestMonitorAgent
+from src.llm_framework.impact_analysis import ImpactAnalyzer, ImportGraph, load_coverage_map
+from src.llm_framework.repo_index import RepoIndex
+
+
+class MockAgent:
+    def __init__(self):
+        self.tasks = []
+
+    def execute(self, task):
+        self.tasks.append(task)
+        return "Fix the assertion"
+
+
+def make_repo(root):
+    """A package whose __init__ imports every submodule, plus tests."""
+    files = {
+        "src/pkg/__init__.py": "from .a import f\nfrom .b import g\n",
+        "src/pkg/a.py": "def f():\n    return 1\n",
+        "src/pkg/b.py": "from . import a\n\n\ndef g():\n    return a.f() + 1\n",
+        "src/pkg/c.py": "def h():\n    return 3\n",
+        "tests/test_a.py": "from src.pkg.a import f\n\n\ndef test_f():\n    assert f() == 1\n",
+        "tests/test_b.py": "from pkg.b import g\n\n\ndef test_g():\n    assert g() == 2\n",
+        "tests/test_c.py": "def test_h():\n    from src.pkg import c\n    assert c.h() == 3\n",
+        "tests/conftest.py": "import sys, os\nsys.path.insert(0, os.path.join("
+                             "os.path.dirname(__file__), '..', 'src'))\n",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def test_import_graph(tmp_path):
+    """Test absolute, relative and lazy imports across source roots."""
+    make_repo(tmp_path)
+    graph = ImportGraph(RepoIndex(str(tmp_path)))
+
+    assert graph.dependencies("src/pkg/b.py") == {"src/pkg/__init__.py", "src/pkg/a.py"}
+    assert graph.dependencies("tests/test_b.py") == {"src/pkg/__init__.py", "src/pkg/b.py"}
+    assert "src/pkg/c.py" in graph.dependencies("tests/test_c.py")
+    # The package __init__ importing a and b does not make test_c depend on them
+    assert graph.dependents(["src/pkg/a.py"]) == {
+        "src/pkg/a.py", "src/pkg/b.py", "src/pkg/__init__.py",
+        "tests/test_a.py", "tests/test_b.py",
+    }
+    assert "tests/test_c.py" in graph.dependents(["src/pkg/__init__.py"])
+    assert graph.parsed == 8
+    graph.refresh()
+    assert graph.parsed == 8
+
+
+def test_affected_tests_with_coverage(tmp_path):
+    """Test that coverage contexts add tests the import graph cannot see."""
+    make_repo(tmp_path)
+    db = tmp_path / ".coverage"
+    conn = sqlite3.connect(str(db))
+    conn.executescript(
+        "CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT);"
+        "CREATE TABLE context (id INTEGER PRIMARY KEY, context TEXT);"
+        "CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits BLOB);"
+        f"INSERT INTO file VALUES (1, '{tmp_path / 'src/pkg/c.py'}');"
+        "INSERT INTO context VALUES (1, 'tests/test_a.py::test_f|run'), (2, '');"
+        "INSERT INTO line_bits VALUES (1, 1, x'01'), (1, 2, x'01');"
+    )
+    conn.commit()
+    conn.close()
+
+    assert load_coverage_map(str(db), str(tmp_path)) == {"src/pkg/c.py": {"tests/test_a.py"}}
+    assert load_coverage_map(str(tmp_path / "missing"), str(tmp_path)) == {}
+
+    index = RepoIndex(str(tmp_path))
+    assert ImpactAnalyzer(index).affected_tests(["src/pkg/c.py"]) == ["tests/test_c.py"]
+    analyzer = ImpactAnalyzer(index, coverage_db=str(db))
+    assert analyzer.affected_tests(["src/pkg/c.py"]) == ["tests/test_a.py", "tests/test_c.py"]
+
+
+def test_run_tests_in_parallel(tmp_path):
+    """Test that results report passes, failures and tracebacks."""
+    make_repo(tmp_path)
+    (tmp_path / "src/pkg/a.py").write_text("def f():\n    return 5\n")
+    analyzer = ImpactAnalyzer(RepoIndex(str(tmp_path)), workers=2)
+
+    results = analyzer.run_tests(["tests/test_a.py", "tests/test_c.py"])
+    assert [r.path for r in results] == ["tests/test_a.py", "tests/test_c.py"]
+    assert not results[0].passed and results[1].passed
+    failures = results[0].failures()
+    assert failures.startswith("=") and "assert 5 == 1" in failures
+    assert " in " not in failures.splitlines()[-1]
+
+
+def test_monitor_runs_only_affected_tests(tmp_path):
+    """Test that the agent runs affected tests and sends only failures to the LLM."""
+    make_repo(tmp_path)
+    llm = MockAgent()
+    agent = TestMonitorAgent(llm, str(tmp_path), RepoIndex(str(tmp_path)), AnalysisCache())
+
+    # First run: everything, all passing, no LLM call
+    assert agent.find_work() is None
+    assert len(agent.last_results) == 3 and llm.tasks == []
+
+    (tmp_path / "src/pkg/c.py").write_text("def h():\n    return 4\n")
+    agent.index.invalidate()
+    assert agent.run_cycle()
+    assert [r.path for r in agent.last_results] == ["tests/test_c.py"]
+    assert "tests/test_c.py" in llm.tasks[0] and "assert 4 == 3" in llm.tasks[0]
+
+    # No change, nothing to run
+    assert agent.find_work() is None
+    agent.close()
@@ -0,0 +1,163 @@
+"""Tests for concurrent provider discovery."""
+
+import os
+import time
+
+from src.llm_framework.config import Config
+from src.llm_framework.orchestrator import AgentOrchestrator
+from src.llm_framework.providers.ollama_provider import OllamaProvider
+from src.llm_framework.provider_discovery import ProviderDiscovery
+
+
+class FakeProvider:
+    def __init__(self, check_delay=0.0, delay=0.0, available=True, fail=False):
+        self.check_delay = check_delay
+        self.delay = delay
+        self.available = available
+        self.fail = fail
+        self.prompts = []
+
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model still loading")
+        return "OK"
+
+    def is_available(self):
+        time.sleep(self.check_delay)
+        return self.available
+
+
+def test_probes_run_concurrently_and_rank_by_latency():
+    """Test that health checks overlap and the fastest provider comes first."""
+    discovery = ProviderDiscovery(
+        {
+            "slow": lambda: FakeProvider(check_delay=0.3),
+            "fast": lambda: FakeProvider(check_delay=0.05),
+            "down": lambda: FakeProvider(available=False),
+        },
+        cache_path=None,
+    )
+
+    started = time.monotonic()
+    results = discovery.discover()
+    assert time.monotonic() - started < 0.5
+    assert [(r.name, r.available) for r in results] == [
+        ("fast", True), ("slow", True), ("down", False),
+    ]
+    assert results[0].latency < results[1].latency
+    assert set(discovery.providers) == {"fast", "slow"}
+    # No generation request is sent unless warm-up is asked for
+    assert not discovery.providers["fast"].prompts
+
+
+def test_overall_deadline_bounds_startup():
+    """Test that a hanging health check is reported as timed out."""
+    discovery = ProviderDiscovery(
+        {"hung": lambda: FakeProvider(check_delay=2.0), "fast": lambda: FakeProvider()},
+        timeout=0.2,
+        cache_path=None,
+    )
+
+    started = time.monotonic()
+    results = discovery.discover()
+    assert time.monotonic() - started < 1.0
+    assert results[0].name == "fast"
+    assert not results[1].available
+    assert "timed out" in results[1].error
+    assert list(discovery.providers) == ["fast"]
+
+
+def test_warmup_ranks_but_never_disqualifies():
+    """Test that warm-up only refines latency; slow or failing warm-ups stay available."""
+    discovery = ProviderDiscovery(
+        {
+            "cold": lambda: FakeProvider(delay=2.0),
+            "loading": lambda: FakeProvider(fail=True),
+            "warm": lambda: FakeProvider(check_delay=0.05, delay=0.01),
+        },
+        timeout=0.3,
+        warmup=True,
+        cache_path=None,
+    )
+
+    results = {r.name: r for r in discovery.discover()}
+    assert all(r.available for r in results.values())
+    assert discovery.providers["warm"].prompts == ["Reply with OK."]
+    assert results["warm"].latency < 0.05
+    assert results["cold"].latency < 0.05
+
+
+def test_results_cached_until_ttl_or_config_change(tmp_path):
+    """Test that a warm cache skips probing and never stores API keys."""
+    cache = str(tmp_path / "providers.json")
+    probes = []
+
+    def factory():
+        provider = FakeProvider(check_delay=0.01)
+        probes.append(provider)
+        return provider
+
+    def discover(api_key="secret-1", ttl=60):
+        discovery = ProviderDiscovery({"p": factory}, configs={"p": {"api_key": api_key}},
+                                      cache_path=cache, cache_ttl=ttl)
+        return discovery, discovery.discover()
+
+    first, results = discover()
+    assert not first.from_cache and results[0].available
+    assert "secret-1" not in (tmp_path / "providers.json").read_text()
+
+    second, cached = discover()
+    assert second.from_cache
+    assert cached == results
+
+    assert not discover(api_key="secret-2")[0].from_cache
+    time.sleep(0.05)
+    assert not discover(api_key="secret-2", ttl=0.01)[0].from_cache
+
+
+def test_nothing_available_is_not_cached(tmp_path):
+    """Test that a run that found no provider probes again next time."""
+    cache = tmp_path / "providers.json"
+    discovery = ProviderDiscovery({"down": lambda: FakeProvider(available=False)},
+                                  cache_path=str(cache))
+
+    assert not discovery.discover()[0].available
+    assert not cache.exists()
+
+
+def test_orchestrator_registers_fastest_provider_first(tmp_path, monkeypatch):
+    """Test that the orchestrator registers every available provider in latency order."""
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(OllamaProvider, "is_available", lambda self: time.sleep(0.2) or True)
+    monkeypatch.setattr(
+        "src.llm_framework.orchestrator.OpenAICompatibleProvider",
+        lambda **kw: FakeProvider(),
+    )
+
+    monkeypatch.chdir(tmp_path)
+    orchestrator = AgentOrchestrator(config=Config())
+    orchestrator.setup_default_providers(cache_path=str(tmp_path / "providers.json"))
+    assert list(orchestrator.providers) == ["openai", "ollama"]
+    assert [r.name for r in orchestrator.probe_results] == ["openai", "ollama"]
+
+
+def test_cache_is_only_used_when_configured(tmp_path, monkeypatch):
+    """Test that results are not cached without a path, and the env var sets one."""
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("LLM_PROVIDER_CACHE", raising=False)
+    monkeypatch.setattr("src.llm_framework.orchestrator.OllamaProvider",
+                        lambda **kw: FakeProvider())
+    monkeypatch.chdir(tmp_path)
+
+    orchestrator = AgentOrchestrator(config=Config())
+    orchestrator.setup_default_providers()
+    assert os.listdir(tmp_path) == []
+
+    cache = tmp_path / "cache" / "providers.json"
+    monkeypatch.setenv("LLM_PROVIDER_CACHE", str(cache))
+    AgentOrchestrator(config=Config()).setup_default_providers()
+    assert cache.exists()
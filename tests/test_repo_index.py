@@ -0,0 +1,113 @@
+"""Tests for the shared repository file index."""
+
+import os
+import subprocess
+
+from src.llm_framework.autonomous_agent import CodeAnalysisAgent, DocumentationAgent
+from src.llm_framework.repo_index import IgnoreRules, RepoIndex, blob_hash
+
+
+def write(root, rel, content):
+    """Create a file below root."""
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def test_gitignore_rules():
+    """Test the supported gitignore pattern forms."""
+    rules = IgnoreRules()
+    for line in ["# comment", "*.log", "!keep.log", "build/", "/top.txt", "docs/**/*.tmp"]:
+        rules.add(line)
+    rules.add("secret.py", "pkg")
+
+    assert rules.is_ignored("a/b/debug.log", False)
+    assert not rules.is_ignored("keep.log", False)
+    assert rules.is_ignored("src/build", True)
+    assert not rules.is_ignored("src/build", False)
+    assert rules.is_ignored("top.txt", False)
+    assert not rules.is_ignored("sub/top.txt", False)
+    assert rules.is_ignored("docs/a/b/x.tmp", False)
+    assert rules.is_ignored("pkg/secret.py", False)
+    assert not rules.is_ignored("secret.py", False)
+
+
+def test_index_respects_gitignore_and_excludes(tmp_path):
+    """Test that ignored and excluded files are not indexed."""
+    root = str(tmp_path)
+    write(root, ".gitignore", "generated/\n*.pyc\n")
+    write(root, "pkg/.gitignore", "local_*.py\n")
+    write(root, "pkg/module.py", "x = 1\n")
+    write(root, "pkg/local_settings.py", "y = 2\n")
+    write(root, "generated/out.py", "z = 3\n")
+    write(root, "pkg/module.pyc", "")
+    write(root, "__pycache__/cached.py", "")
+
+    index = RepoIndex(root)
+
+    assert [e.rel_path for e in index.files(".py")] == ["pkg/module.py"]
+
+
+def test_index_hash_matches_git(tmp_path):
+    """Test that content hashes are git blob SHAs."""
+    path = write(str(tmp_path), "a.py", "print('hello')\n")
+    expected = subprocess.run(
+        ["git", "hash-object", path], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    assert blob_hash(path, os.path.getsize(path)) == expected
+    assert RepoIndex(str(tmp_path)).get("a.py").hash == expected
+
+
+def test_index_refresh_is_incremental(tmp_path):
+    """Test that only changed files are re-hashed and removals are noticed."""
+    root = str(tmp_path)
+    write(root, "a.py", "a = 1\n")
+    b = write(root, "b.py", "b = 1\n")
+    index = RepoIndex(root, refresh_interval=0)
+
+    assert index.refresh() == 2
+    assert index.hashed == 2
+    assert index.refresh() == 0
+    assert index.hashed == 2
+
+    write(root, "a.py", "a = 22\n")
+    os.remove(b)
+    assert index.refresh() == 2
+    assert index.hashed == 3
+    assert [e.rel_path for e in index.files()] == ["a.py"]
+
+
+def test_index_refresh_is_throttled_until_invalidated(tmp_path):
+    """Test that agents sharing an index do not walk the tree every call."""
+    root = str(tmp_path)
+    write(root, "a.py", "a = 1\n")
+    index = RepoIndex(root, refresh_interval=60)
+    index.files()
+    write(root, "new.py", "n = 1\n")
+
+    assert index.get("new.py") is None
+    index.invalidate(["new.py"])
+    assert index.get("new.py") is not None
+    assert index.refreshes == 2
+
+
+def test_autonomous_agents_share_index(tmp_path):
+    """Test that agents find work through the shared index."""
+    root = str(tmp_path)
+    write(root, "tiny.py", "x = 1\n")
+    path = write(root, "big.py", "def f():\n    return 1\n" * 10)
+
+    class Agent:
+        def execute(self, task):
+            return task
+
+    code_agent = CodeAnalysisAgent(Agent(), root)
+    doc_agent = DocumentationAgent(Agent(), root)
+
+    assert code_agent.index is doc_agent.index
+    assert code_agent.find_work()["context"]["files"] == [path]
+    assert doc_agent.find_work()["context"]["file"] == path
+    assert code_agent.find_work() is None
@@ -0,0 +1,139 @@
+"""Tests for the priority-class fair scheduler."""
+
+import time
+
+import pytest
+from src.llm_framework.scheduler import TaskScheduler, priority_class_for
+from src.llm_framework.continuous_agent import ContinuousAgent
+from src.llm_framework.core.agent import Agent, AgentConfig
+from tests.test_base_provider import MockProvider
+
+
+def drain(scheduler):
+    """Pop every task in dispatch order."""
+    order = []
+    while True:
+        entry = scheduler.pop()
+        if entry is None:
+            return order
+        order.append(entry.task)
+
+
+def test_priority_classes_served_in_order():
+    """Test that interactive work runs before normal and background."""
+    scheduler = TaskScheduler()
+    scheduler.push("bg", priority_class="background")
+    scheduler.push("normal", priority_class="normal")
+    scheduler.push("urgent", priority_class="interactive")
+
+    assert drain(scheduler) == ["urgent", "normal", "bg"]
+
+
+def test_fifo_within_single_flow():
+    """Test that a single flow keeps submission order."""
+    scheduler = TaskScheduler()
+    for i in range(5):
+        scheduler.push(f"Task {i}")
+
+    assert drain(scheduler) == [f"Task {i}" for i in range(5)]
+
+
+def test_fair_share_across_flows():
+    """Test that a deep backlog in one flow does not block another."""
+    scheduler = TaskScheduler()
+    for i in range(10):
+        scheduler.push(f"research {i}", flow="research")
+    scheduler.push("coding 0", flow="coding")
+
+    order = drain(scheduler)
+    assert order.index("coding 0") <= 1
+
+
+def test_flow_weights():
+    """Test that a heavier flow receives a larger share."""
+    scheduler = TaskScheduler(flow_weights={"coding": 3.0})
+    for i in range(6):
+        scheduler.push("research", flow="research")
+        scheduler.push("coding", flow="coding")
+
+    first_eight = drain(scheduler)[:8]
+    assert first_eight.count("coding") == 6
+
+
+def test_starvation_protection():
+    """Test that an old background task is promoted."""
+    scheduler = TaskScheduler(starvation_age=0.05)
+    scheduler.push("old background", priority_class="background")
+    time.sleep(0.1)
+    scheduler.push("fresh urgent", priority_class="interactive")
+
+    assert scheduler.pop().task == "old background"
+    assert scheduler.promoted == 1
+
+
+def test_discard_and_contains():
+    """Test removing queued tasks by key."""
+    scheduler = TaskScheduler()
+    scheduler.push("a", key=1)
+    scheduler.push("b", key=2)
+
+    assert 1 in scheduler
+    assert scheduler.discard(1) is True
+    assert scheduler.discard(1) is False
+    assert len(scheduler) == 1
+    assert drain(scheduler) == ["b"]
+
+
+def test_invalid_priority_class():
+    """Test that unknown classes are rejected."""
+    with pytest.raises(ValueError, match="Unknown priority class"):
+        TaskScheduler().push("x", priority_class="urgent")
+
+
+def test_priority_class_for():
+    """Test numeric priority mapping."""
+    assert priority_class_for(5) == "interactive"
+    assert priority_class_for(0) == "normal"
+    assert priority_class_for(-1) == "background"
+
+
+def test_continuous_agent_runs_interactive_first():
+    """Test that ContinuousAgent dispatches by priority class."""
+    agent = Agent(AgentConfig(name="Test"), MockProvider())
+    cont_agent = ContinuousAgent(agent, interval=0.01, max_iterations=2)
+    cont_agent.add_task("Normal task")
+    cont_agent.add_task("Urgent task", priority="interactive")
+
+    assert cont_agent.task_queue == ["Urgent task", "Normal task"]
+
+    cont_agent.start()
+    time.sleep(0.3)
+    cont_agent.stop()
+
+    assert [r["task"] for r in cont_agent.get_results()] == ["Urgent task", "Normal task"]
+
+
+def test_automatic_keys_do_not_collide_with_explicit_keys():
+    """Test that keyless tasks never take the key of a caller's task."""
+    scheduler = TaskScheduler()
+    auto = scheduler.push("generated")
+    scheduler.push("explicit", key=0)
+
+    assert auto.key == ("auto", 0)
+    assert len(scheduler) == 2
+    assert scheduler.discard(0) is True
+    assert drain(scheduler) == ["generated"]
+
+
+def test_pushing_an_existing_key_replaces_the_task():
+    """Test that a second push with the same key supersedes the first."""
+    scheduler = TaskScheduler()
+    scheduler.push("a", key="k")
+    scheduler.push("b", key="k")
+
+    assert len(scheduler) == 1
+    assert [e.task for e in scheduler.pending()] == ["b"]
+    assert "k" in scheduler
+    assert scheduler.discard("k") is True
+    assert len(scheduler) == 0
+    assert scheduler.pop() is None
@@ -0,0 +1,160 @@
+"""Tests for the multi-process sharded runner."""
+
+import os
+import time
+
+from src.llm_framework.sharded_runner import ShardedAgentRunner
+from src.llm_framework.core.agent import Agent, AgentConfig
+from tests.test_base_provider import MockProvider
+
+
+def mock_factory(agent_names):
+    """Build mock agents inside a shard process."""
+    return {name: Agent(AgentConfig(name=name), MockProvider()) for name in agent_names}
+
+
+class HangingProvider(MockProvider):
+    """Provider that never answers a task mentioning 'hang'."""
+
+    def generate(self, prompt, **kwargs):
+        if "hang" in prompt:
+            time.sleep(3600)
+        return super().generate(prompt, **kwargs)
+
+
+def hanging_factory(agent_names):
+    """Build agents whose provider can hang inside a shard process."""
+    return {name: Agent(AgentConfig(name=name), HangingProvider()) for name in agent_names}
+
+
+def wait_for(predicate, timeout=10.0):
+    """Poll until predicate is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def make_runner(**kwargs):
+    """Create a runner over four mock agents."""
+    return ShardedAgentRunner(
+        ["research", "coding", "writing", "review"],
+        agent_factory=mock_factory,
+        agent_kwargs={"interval": 0.05},
+        heartbeat_interval=0.1,
+        **kwargs,
+    )
+
+
+def test_agents_spread_across_shards():
+    """Test round-robin assignment of agents to shards."""
+    runner = make_runner(num_shards=2)
+
+    assert runner.shard_for("research") == 0
+    assert runner.shard_for("coding") == 1
+    assert runner.shard_for("writing") == 0
+    assert ShardedAgentRunner(["a"], num_shards=8).num_shards == 1
+
+
+def test_sharded_runner_executes_tasks_and_aggregates_status():
+    """Test that tasks run in worker processes and results come back."""
+    runner = make_runner(num_shards=2)
+    results = []
+    runner.on_result_callback = lambda task, result: results.append(task)
+
+    runner.add_task("coding", "Sharded task")
+    runner.start()
+    try:
+        assert wait_for(lambda: "Sharded task" in results)
+        assert wait_for(lambda: runner.get_status()["iteration_count"] > 0)
+
+        status = runner.get_status()
+        assert len(status["shards"]) == 2
+        assert {s["pid"] for s in status["shards"]}.isdisjoint({os.getpid()})
+        assert all(s["alive"] for s in status["shards"])
+        assert set(status["agents"]) == {"research", "coding", "writing", "review"}
+        assert status["agents"]["coding"]["shard"] == 1
+    finally:
+        runner.stop()
+
+    assert runner.get_status()["is_running"] is False
+
+
+def test_sharded_runner_restarts_dead_shard():
+    """Test automatic restart after a shard process dies."""
+    runner = make_runner(num_shards=2)
+    runner.start()
+    try:
+        assert wait_for(lambda: all(s["alive"] for s in runner.get_status()["shards"]))
+        victim = runner._shards[0].process
+        victim.kill()
+
+        assert wait_for(lambda: runner.restart_count == 1)
+        assert wait_for(lambda: runner._shards[0].process.is_alive())
+        assert runner._shards[0].process.pid != victim.pid
+        assert runner.get_status()["shards"][0]["restarts"] == 1
+    finally:
+        runner.stop()
+
+
+def test_sharded_runner_restarts_shard_with_hung_agent(tmp_path):
+    """Test that an agent stuck on one task gets its shard restarted."""
+    runner = ShardedAgentRunner(
+        ["research", "coding"],
+        num_shards=2,
+        agent_factory=hanging_factory,
+        agent_kwargs={"interval": 0.05},
+        heartbeat_interval=0.1,
+        task_timeout=0.5,
+        state_dir=str(tmp_path),
+    )
+    runner.add_task("coding", "Please hang", priority="interactive")
+    runner.start()
+    try:
+        assert wait_for(lambda: runner.get_agent_status("coding")["busy_for"] > 0)
+        assert wait_for(lambda: runner._shards[1].restarts >= 1)
+        assert runner._shards[0].restarts == 0
+        assert {"coding.wal", "research.wal"} <= set(os.listdir(tmp_path))
+        # The healthy shard reports on its own queue and is unaffected
+        seen = runner._shards[0].last_heartbeat
+        assert wait_for(lambda: runner._shards[0].last_heartbeat > seen)
+    finally:
+        runner.stop()
+
+
+def test_restart_resends_undelivered_tasks():
+    """Test that tasks still in a replaced shard's queue reach the new process."""
+    runner = make_runner(num_shards=2)
+    results = []
+    runner.on_result_callback = lambda task, result: results.append(task)
+    runner.add_task("research", "Queued before restart")
+    shard = runner._shards[0]
+    old_queues = (shard.task_queue, shard.event_queue)
+
+    # Restart the shard before any process could read its queue
+    with runner._lock:
+        runner.is_running = True
+        runner._restart(shard, "test")
+    try:
+        assert (shard.task_queue, shard.event_queue) != old_queues
+        assert wait_for(lambda: runner._drain_events() or "Queued before restart" in results)
+    finally:
+        runner.stop()
+
+
+def test_proxies_match_continuous_agent_surface():
+    """Test that proxies expose the ContinuousAgent monitoring surface."""
+    runner = make_runner(num_shards=2)
+    runner.start()
+    try:
+        proxies = runner.agents()
+        assert [p.name for p in proxies] == ["research", "coding", "writing", "review"]
+        assert wait_for(lambda: all(p.is_running for p in proxies))
+
+        status = proxies[0].get_status()
+        for key in ("is_running", "iteration_count", "tasks_pending", "results_count"):
+            assert key in status
+    finally:
+        runner.stop()
@@ -0,0 +1,55 @@
+"""Tests for queue wakeup notifications."""
+
+import os
+import socket
+import threading
+import time
+
+from src.llm_framework.task_notify import QueueListener, notify_listeners
+
+
+def test_listener_times_out_without_notification(tmp_path):
+    """Test that wait returns False when nothing is submitted."""
+    with QueueListener(str(tmp_path / "n")) as listener:
+        assert listener.is_push
+        assert listener.wait(timeout=0.05) is False
+
+
+def test_notification_wakes_blocked_listener(tmp_path):
+    """Test that a waiting listener wakes promptly on notify."""
+    directory = str(tmp_path / "n")
+    with QueueListener(directory) as listener:
+        woke = []
+        waiter = threading.Thread(target=lambda: woke.append(listener.wait(timeout=5)))
+        start = time.monotonic()
+        waiter.start()
+        time.sleep(0.05)
+
+        assert notify_listeners(directory) == 1
+        waiter.join()
+
+        assert woke == [True]
+        assert time.monotonic() - start < 1
+
+
+def test_burst_collapses_into_one_wakeup(tmp_path):
+    """Test that several notifications are consumed by one wait."""
+    directory = str(tmp_path / "n")
+    with QueueListener(directory) as listener:
+        for _ in range(5):
+            notify_listeners(directory)
+
+        assert listener.wait(timeout=1) is True
+        assert listener.wait(timeout=0.05) is False
+
+
+def test_stale_sockets_are_removed(tmp_path):
+    """Test that sockets of exited workers are cleaned up."""
+    directory = tmp_path / "n"
+    directory.mkdir()
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(str(directory / "999-0.sock"))
+    stale.close()
+
+    assert notify_listeners(str(directory)) == 0
+    assert not os.listdir(directory)
@@ -0,0 +1,228 @@
+"""Tests for the SQLite-backed task queue."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import task_queue
+from llm_framework.admission import QueueFullError
+
+
+@pytest.fixture
+def queue_files(tmp_path, monkeypatch):
+    """Point the queue at temporary files."""
+    monkeypatch.setattr(task_queue, "QUEUE_FILE", str(tmp_path / "queue.json"))
+    monkeypatch.setattr(task_queue, "DB_FILE", str(tmp_path / "queue.db"))
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_DEPTH", 0)
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_WAIT", 0)
+    return tmp_path
+
+
+def test_add_and_complete_task(queue_files):
+    """Test the add, claim, complete cycle."""
+    task_id = task_queue.add_task("research", "Study queues")
+
+    task = task_queue.get_next_task("research")
+    assert task["id"] == task_id
+    assert task_queue.get_next_task("research") is None
+
+    task_queue.complete_task(task_id, "Queues are useful")
+    results = task_queue.load_results()
+    assert results[-1]["result"] == "Queues are useful"
+
+
+def test_add_task_respects_max_depth(queue_files, monkeypatch):
+    """Test that the depth limit rejects new tasks."""
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_DEPTH", 1)
+    task_queue.add_task("coding", "Task 1")
+
+    with pytest.raises(QueueFullError):
+        task_queue.add_task("coding", "Task 2")
+
+    assert task_queue.get_status()["rejected"] == 1
+
+
+def test_add_task_sheds_low_priority_when_overloaded(queue_files, monkeypatch):
+    """Test wait-based shedding spares positive-priority tasks."""
+    task_queue.add_task("writing", "Old task")
+    with task_queue._store().transaction() as conn:
+        conn.execute("UPDATE tasks SET submitted_at = '2000-01-01T00:00:00'")
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_WAIT", 60)
+
+    with pytest.raises(QueueFullError):
+        task_queue.add_task("writing", "Background task")
+    task_queue.add_task("writing", "Urgent task", priority=5)
+
+    status = task_queue.get_status()
+    assert status["shed"] == 1
+    assert status["pending_by_agent"] == {"writing": 2}
+
+
+def test_get_next_fair_task_interleaves_agent_types(queue_files):
+    """Test that the fair scheduler does not always serve research first."""
+    from llm_framework.scheduler import TaskScheduler
+
+    for i in range(3):
+        task_queue.add_task("research", f"Research {i}")
+    task_queue.add_task("writing", "Writing 0")
+    task_queue.add_task("coding", "Urgent fix", priority=1)
+
+    scheduler = TaskScheduler()
+    agent_types = ["research", "coding", "writing"]
+    order = []
+    while True:
+        task = task_queue.get_next_fair_task(agent_types, scheduler)
+        if task is None:
+            break
+        order.append(task["task"])
+
+    assert order[0] == "Urgent fix"
+    assert order.index("Writing 0") <= 2
+    assert len(order) == 5
+
+
+def test_fair_claim_tracks_flow_heads_not_tasks(queue_files):
+    """Test that fair claims keep one scheduler entry per flow and share tenants."""
+    from llm_framework.scheduler import TaskScheduler
+
+    task_queue.add_tasks(
+        {"agent_type": "coding", "task": f"Bulk {i}", "tenant": "big"} for i in range(200)
+    )
+    task_queue.add_task("coding", "Small 0", tenant="small")
+    task_queue.add_task("coding", "Small 1", tenant="small")
+    task_queue.add_task("research", "Background", priority=-1)
+
+    scheduler = TaskScheduler()
+    first = [task_queue.get_next_fair_task(["coding", "research"], scheduler)["task"]
+             for _ in range(4)]
+    assert len(scheduler) <= 3
+    assert "Small 0" in first and "Small 1" in first
+    assert "Background" not in first
+
+    batch = task_queue.get_next_fair_tasks(["coding"], scheduler, 5, worker_id="w")
+    assert [t["tenant"] for t in batch] == ["big"] * 5
+    assert all(t["worker_id"] == "w" for t in batch)
+
+
+def test_fair_claim_returns_when_nothing_can_be_claimed(queue_files, monkeypatch):
+    """Test that zero slots, or flows always drained by others, end the claim."""
+    from llm_framework.scheduler import TaskScheduler
+
+    task_queue.add_task("coding", "Pending")
+    scheduler = TaskScheduler()
+    assert task_queue.get_next_fair_tasks(["coding"], scheduler, 0) == []
+
+    attempts = []
+    store = task_queue._store()
+    monkeypatch.setattr(store, "claim_batch", lambda *a, **kw: attempts.append(1) or [])
+    assert task_queue.get_next_fair_tasks(["coding"], scheduler, 1) == []
+    assert len(attempts) == task_queue.FAIR_CLAIM_ATTEMPTS
+
+
+def test_migrate_json_queue(queue_files):
+    """Test importing the legacy JSON queue file."""
+    import json
+
+    legacy = [
+        {"id": 1, "agent_type": "coding", "task": "Old", "priority": 0,
+         "status": "pending", "submitted_at": "2024-01-01T00:00:00", "result": None},
+        {"id": 2, "agent_type": "coding", "task": "Done", "priority": 0,
+         "status": "completed", "submitted_at": "2024-01-01T00:00:00", "result": "ok"},
+    ]
+    (queue_files / "queue.json").write_text(json.dumps(legacy))
+
+    assert task_queue.migrate_json_queue() == 2
+    assert task_queue.get_next_task("coding")["task"] == "Old"
+    assert [t["result"] for t in task_queue.load_results()] == ["ok"]
+
+
+def test_lease_heartbeat_keeps_task(queue_files):
+    """Test that a renewed lease outlives its original duration."""
+    import time
+
+    task_id = task_queue.add_task("coding", "Long generation")
+    task_queue.get_next_task("coding", worker_id="w1", lease=0.3)
+
+    with task_queue.lease_heartbeat(task_id, "w1", lease=0.3):
+        time.sleep(0.6)
+        assert task_queue.get_next_task("coding", worker_id="w2") is None
+
+    assert task_queue.complete_task(task_id, "done", worker_id="w1")
+
+
+def test_add_tasks_streams_jsonl_in_batches(queue_files):
+    """Test bulk submission from JSONL and batch claiming."""
+    import io
+
+    lines = io.StringIO(
+        '{"agent_type": "coding", "task": "Fix bug"}\n'
+        "\n"
+        '{"request_id": "r-2", "title": "Add cache", "body": "Cache results."}\n'
+        '{"agent_type": "coding", "task": "Urgent", "priority": 2}\n'
+    )
+    count = task_queue.add_tasks(
+        task_queue.read_jsonl_tasks(lines, agent_type="coding"), batch_size=2
+    )
+
+    claimed = task_queue.claim_batch("coding", 2, worker_id="w")
+    assert count == 3
+    assert [t["task"] for t in claimed] == ["Urgent", "Fix bug"]
+    assert task_queue.claim_batch("coding", 5)[0]["task"] == "Add cache\n\nCache results."
+
+
+def test_add_tasks_leaves_input_unchanged(queue_files):
+    """Test that bulk submission does not modify the caller's dictionaries."""
+    tasks = [{"agent_type": "coding", "task": "Fix", "idempotency_key": "k"}]
+    task_queue.add_tasks(tasks)
+
+    assert tasks == [{"agent_type": "coding", "task": "Fix", "idempotency_key": "k"}]
+    assert task_queue.add_tasks(tasks) == 1
+    assert task_queue.get_status()["tasks_pending"] == 1
+
+
+def test_add_tasks_rejects_batch_over_depth(queue_files, monkeypatch):
+    """Test that a batch exceeding the depth limit is refused whole."""
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_DEPTH", 3)
+    batch = [{"agent_type": "writing", "task": f"Task {i}"} for i in range(4)]
+
+    with pytest.raises(QueueFullError):
+        task_queue.add_tasks(batch, batch_size=2)
+
+    status = task_queue.get_status()
+    assert status["tasks_pending"] == 2
+    assert status["rejected"] == 2
+
+
+def test_add_task_wakes_listener(queue_files):
+    """Test that submitting a task notifies idle workers."""
+    with task_queue.listen() as listener:
+        task_queue.add_task("research", "Wake up")
+        assert listener.wait(timeout=1) is True
+
+
+def test_add_task_deduplicates_and_honours_idempotency_keys(queue_files):
+    """Test content-hash dedup, idempotency keys and opting out."""
+    first = task_queue.add_task("coding", "Write docs")
+    dup = task_queue.add_task("coding", "Write docs")
+    fresh = task_queue.add_task("coding", "Write docs", dedup=False)
+    keyed = task_queue.add_task("coding", "Write docs v1", idempotency_key="req-1")
+    retry = task_queue.add_task("coding", "Write docs v2", idempotency_key="req-1")
+
+    store = task_queue._store()
+    assert store.get(dup)["duplicate_of"] == first
+    assert store.get(fresh)["duplicate_of"] is None
+    assert store.get(retry)["duplicate_of"] == keyed
+    assert task_queue.get_status()["deduplicated"] == 2
+
+
+def test_search_results_relative_since(queue_files):
+    """Test result search with relative time filters."""
+    task_id = task_queue.add_task("research", "Find papers")
+    task_queue.get_next_task("research")
+    task_queue.complete_task(task_id, "Found three papers")
+
+    assert [t["id"] for t in task_queue.search_results(since="1h", grep="papers")] == [task_id]
+    assert task_queue.search_results(until="1h") == []
@@ -0,0 +1,255 @@
+"""Tests for the SQLite task store."""
+
+import threading
+
+from src.llm_framework.task_store import SQLiteTaskStore
+
+
+def test_ids_are_monotonic(tmp_path):
+    """Test that ids keep increasing and are never reused."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    first = store.add("coding", "Task 1")
+    second = store.add("coding", "Task 2")
+    with store.transaction() as conn:
+        conn.execute("DELETE FROM tasks WHERE id = ?", (second,))
+
+    assert second > first
+    assert store.add("coding", "Task 3") > second
+
+
+def test_claim_order(tmp_path):
+    """Test claims follow priority class, then priority, then id."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    store.add("coding", "Background", priority=-1)
+    store.add("coding", "Normal")
+    store.add("coding", "Urgent", priority=3)
+    store.add("research", "Other agent", priority=9)
+
+    order = [store.claim("coding")["task"] for _ in range(3)]
+
+    assert order == ["Urgent", "Normal", "Background"]
+    assert store.claim("coding") is None
+    assert store.count(status="pending") == 1
+
+
+def test_claim_id_only_once(tmp_path):
+    """Test that a task cannot be claimed twice."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    task_id = store.add("writing", "Draft")
+
+    assert store.claim_id(task_id)["status"] == "in-progress"
+    assert store.claim_id(task_id) is None
+
+
+def test_concurrent_claims_never_overlap(tmp_path):
+    """Test that threads claiming at once never receive the same task."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    for i in range(200):
+        store.add("coding", f"Task {i}")
+
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            task = store.claim("coding")
+            if task is None:
+                return
+            with lock:
+                claimed.append(task["id"])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(claimed) == 200
+    assert len(set(claimed)) == 200
+
+
+def test_wal_mode_and_counters(tmp_path):
+    """Test the database uses WAL and counters accumulate."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    mode = store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+
+    store.increment_counter("rejected")
+    store.increment_counter("rejected", 2)
+
+    assert mode == "wal"
+    assert store.get_counters() == {"rejected": 3}
+
+
+def test_expired_lease_is_requeued_then_dead_lettered(tmp_path):
+    """Test that abandoned tasks return to the queue until max_attempts."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"), max_attempts=2)
+    task_id = store.add("coding", "Crashy")
+
+    assert store.claim("coding", worker_id="a", lease=-1)["attempts"] == 1
+    task = store.claim("coding", worker_id="b", lease=-1)
+    assert task["worker_id"] == "b"
+    assert task["attempts"] == 2
+
+    assert store.claim("coding", worker_id="c") is None
+    assert store.get(task_id)["status"] == "dead"
+    assert store.get(task_id)["last_error"] == "lease expired"
+
+    assert store.retry(task_id)
+    assert store.claim("coding", worker_id="c")["attempts"] == 1
+
+
+def test_lost_lease_rejects_renew_and_complete(tmp_path):
+    """Test that only the current lease holder can renew or complete."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    task_id = store.add("coding", "Slow")
+    store.claim("coding", worker_id="a", lease=-1)
+    store.requeue_expired()
+    store.claim("coding", worker_id="b")
+
+    assert not store.renew(task_id, "a")
+    assert not store.complete(task_id, "stale", worker_id="a")
+    assert store.renew(task_id, "b")
+    assert store.complete(task_id, "fresh", worker_id="b")
+    assert store.get(task_id)["result"] == "fresh"
+
+
+def test_fail_retries_then_dead_letters(tmp_path):
+    """Test that failed attempts are retried up to max_attempts."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"), max_attempts=2)
+    task_id = store.add("writing", "Flaky")
+
+    store.claim("writing", worker_id="w")
+    assert store.fail(task_id, "boom", worker_id="w") == "pending"
+    store.claim("writing", worker_id="w")
+    assert store.fail(task_id, "boom again", worker_id="w") == "dead"
+    assert store.get(task_id)["last_error"] == "boom again"
+
+
+def test_old_database_gains_lease_columns(tmp_path):
+    """Test that databases without lease columns are upgraded on open."""
+    import sqlite3
+
+    path = str(tmp_path / "tasks.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, agent_type TEXT NOT NULL, "
+        "task TEXT NOT NULL, priority INTEGER NOT NULL DEFAULT 0, "
+        "priority_class TEXT NOT NULL DEFAULT 'normal', class_rank INTEGER NOT NULL DEFAULT 1, "
+        "tenant TEXT NOT NULL DEFAULT 'default', status TEXT NOT NULL DEFAULT 'pending', "
+        "submitted_at TEXT NOT NULL, started_at TEXT, completed_at TEXT, result TEXT)"
+    )
+    conn.execute("INSERT INTO tasks (agent_type, task, submitted_at) VALUES ('coding', 'Old', '')")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteTaskStore(path)
+    assert store.claim("coding", worker_id="w")["attempts"] == 1
+
+
+def test_add_many_and_claim_batch(tmp_path):
+    """Test batched insert and claim in one transaction each."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    ids = store.add_many({"agent_type": "coding", "task": f"Task {i}"} for i in range(5))
+
+    batch = store.claim_batch("coding", 3, worker_id="w")
+
+    assert ids == sorted(ids)
+    assert [t["id"] for t in batch] == ids[:3]
+    assert all(t["worker_id"] == "w" for t in batch)
+    assert store.count(status="pending") == 2
+
+
+def test_pending_duplicates_share_one_execution(tmp_path):
+    """Test that identical pending tasks run once and fan out the result."""
+    from src.llm_framework.task_store import content_key
+
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    key = content_key("coding", "Same")
+    first = store.add("coding", "Same", dedup_key=key)
+    second = store.add("coding", "Same", priority=5, dedup_key=key)
+
+    claimed = store.claim("coding", worker_id="w")
+    assert claimed["id"] == first
+    assert claimed["priority_class"] == "interactive"
+    assert store.claim("coding") is None
+    assert store.get(second)["status"] == "duplicate"
+
+    store.complete(first, "shared", worker_id="w")
+    assert store.get(second)["status"] == "completed"
+    assert store.get(second)["result"] == "shared"
+    assert store.get_counters()["deduplicated"] == 1
+
+
+def test_completed_result_reused_within_freshness_window(tmp_path):
+    """Test that fresh completed results answer resubmissions."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    first = store.add("research", "Q", dedup_key="k")
+    store.claim("research")
+    store.complete(first, "A")
+
+    reused = store.get(store.add("research", "Q", dedup_key="k", fresh_for=60))
+    assert reused["status"] == "completed"
+    assert reused["result"] == "A"
+
+    with store.transaction() as conn:
+        conn.execute("UPDATE tasks SET completed_at = '2000-01-01T00:00:00' WHERE id = ?", (first,))
+    assert store.get(store.add("research", "Q", dedup_key="k", fresh_for=60))["status"] == "pending"
+    assert store.get(store.add("research", "Q", dedup_key="k"))["status"] == "duplicate"
+
+
+def test_duplicates_follow_dead_lettered_original(tmp_path):
+    """Test that duplicates are dead-lettered and retried with their original."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"), max_attempts=1)
+    first = store.add("writing", "X", dedup_key="k")
+    second = store.add("writing", "X", dedup_key="k")
+    store.claim("writing")
+    store.fail(first, "boom")
+
+    assert store.get(second)["status"] == "dead"
+    assert store.retry(first)
+    assert store.get(second)["status"] == "duplicate"
+
+
+def test_dedup_lookup_uses_key_index(tmp_path):
+    """Test that finding a duplicate's original searches by key, not all originals."""
+    from src.llm_framework.task_store import (
+        FIND_ACTIVE_ORIGINAL,
+        FIND_FRESH_ORIGINAL,
+        content_key,
+    )
+
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    store.add_many(
+        {"agent_type": "coding", "task": f"T{i}", "dedup_key": content_key("coding", f"T{i}")}
+        for i in range(3000)
+    )
+    conn = store._connect()
+    conn.execute("ANALYZE")
+    for sql, args in ((FIND_ACTIVE_ORIGINAL, ("k",)), (FIND_FRESH_ORIGINAL, ("k", ""))):
+        plan = " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", args))
+        assert "idx_tasks_dedup (dedup_key=?" in plan
+        assert "idx_tasks_duplicate_of" not in plan
+
+    key = content_key("coding", "T1500")
+    assert store.get(store.add("coding", "T1500", dedup_key=key))["duplicate_of"] == 1501
+
+
+def test_search_filters_and_paginates(tmp_path):
+    """Test full-text search, filters and keyset pagination of results."""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    for i in range(5):
+        task_id = store.add("coding" if i % 2 else "research", f"Task {i}")
+        store.claim_id(task_id)
+        store.complete(task_id, "quantum widgets" if i < 3 else "plain answer")
+    store.add("coding", "Still pending")
+
+    page = store.search(limit=2)
+    assert [t["task"] for t in page] == ["Task 4", "Task 3"]
+    assert [t["task"] for t in store.search(limit=2, before_id=page[-1]["id"])] == [
+        "Task 2", "Task 1"
+    ]
+    assert [t["task"] for t in store.search(text="quantum")] == ["Task 2", "Task 1", "Task 0"]
+    assert [t["task"] for t in store.search(text="quantum", agent_type="coding")] == ["Task 1"]
+    assert store.search(text='widgets" OR "x') == []
+    assert store.search(since="2999-01-01T00:00:00") == []
+    assert store.search(status=None, text="pending")[0]["status"] == "pending"
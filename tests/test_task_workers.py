@@ -0,0 +1,191 @@
+"""Tests for per-agent-type worker pools."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import task_queue
+import task_workers
+
+
+class StubAgent:
+    """Agent that records concurrency and optionally sleeps or fails."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.active = 0
+        self.max_active = 0
+        self.finished = []
+        self._lock = threading.Lock()
+
+    def execute(self, task):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.finished.append((task, time.monotonic()))
+        if self.fail:
+            raise RuntimeError("boom")
+        return f"done: {task}"
+
+
+@pytest.fixture
+def queue_db(tmp_path, monkeypatch):
+    """Point the queue at a temporary database."""
+    monkeypatch.setattr(task_queue, "DB_FILE", str(tmp_path / "queue.db"))
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_DEPTH", 0)
+    monkeypatch.setattr(task_queue, "MAX_QUEUE_WAIT", 0)
+    return tmp_path
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_slow_pool_does_not_block_other_types(queue_db):
+    """Test that a long coding task does not delay research tasks."""
+    coding, research = StubAgent(delay=0.5), StubAgent()
+    pools = [task_workers.WorkerPool("coding", coding), task_workers.WorkerPool("research", research)]
+    for pool in pools:
+        pool.start()
+
+    task_queue.add_task("coding", "Slow build")
+    task_queue.add_task("research", "Quick lookup")
+    for pool in pools:
+        pool.notify()
+
+    assert wait_for(lambda: research.finished and coding.finished)
+    assert research.finished[0][1] < coding.finished[0][1]
+    for pool in pools:
+        pool.stop(timeout=5)
+
+
+def test_pool_runs_tasks_concurrently_and_reports_stats(queue_db):
+    """Test configured concurrency and throughput/latency stats."""
+    agent = StubAgent(delay=0.2)
+    pool = task_workers.WorkerPool("writing", agent, concurrency=3)
+    for i in range(3):
+        task_queue.add_task("writing", f"Draft {i}")
+    pool.start()
+
+    assert wait_for(lambda: pool.get_stats()["completed"] == 3)
+    pool.stop(timeout=5)
+
+    stats = pool.get_stats()
+    assert agent.max_active == 3
+    assert stats["latency"]["p50"] >= 0.2
+    assert stats["throughput_per_min"] > 0
+    assert task_queue.get_status()["tasks_pending"] == 0
+
+
+def test_stop_waits_for_in_flight_task(queue_db):
+    """Test graceful shutdown lets the running task complete."""
+    agent = StubAgent(delay=0.3)
+    pool = task_workers.WorkerPool("coding", agent)
+    task_id = task_queue.add_task("coding", "Refactor")
+    pool.start()
+    assert wait_for(lambda: pool.get_stats()["in_flight"] == 1)
+
+    pool.stop(timeout=5)
+
+    assert task_queue._store().get(task_id)["status"] == "completed"
+
+
+def test_failed_task_is_released_for_retry(queue_db):
+    """Test that an agent error counts as failed and re-queues the task."""
+    pool = task_workers.WorkerPool("research", StubAgent(fail=True))
+    task_id = task_queue.add_task("research", "Flaky")
+    pool.start()
+    assert wait_for(lambda: pool.get_stats()["failed"] >= 1)
+    pool.stop(timeout=5)
+
+    assert task_queue._store().get(task_id)["last_error"] == "Error: boom"
+
+
+def test_pool_claims_free_slots_in_one_pass(queue_db, monkeypatch):
+    """Test that idle threads are filled by one batched claim."""
+    claims = []
+    fair_tasks = task_workers.get_next_fair_tasks
+
+    def recording(agent_types, scheduler, n, **kwargs):
+        tasks = fair_tasks(agent_types, scheduler, n, **kwargs)
+        if tasks:
+            claims.append((n, len(tasks)))
+        return tasks
+
+    monkeypatch.setattr(task_workers, "get_next_fair_tasks", recording)
+    agent = StubAgent(delay=0.2)
+    pool = task_workers.WorkerPool("coding", agent, concurrency=3)
+    for i in range(3):
+        task_queue.add_task("coding", f"Task {i}")
+    pool.start()
+
+    assert wait_for(lambda: pool.get_stats()["completed"] == 3)
+    pool.stop(timeout=5)
+    assert claims == [(3, 3)]
+    assert agent.max_active == 3
+    assert pool.get_stats()["lost"] == 0
+
+
+def test_pool_never_leases_more_than_its_threads(queue_db, monkeypatch):
+    """Test that tasks claimed but not yet started count against free slots."""
+    claims = []
+    fair_tasks = task_workers.get_next_fair_tasks
+
+    def recording(agent_types, scheduler, n, **kwargs):
+        reserved = pool._reserved
+        tasks = fair_tasks(agent_types, scheduler, n, **kwargs)
+        if tasks:
+            claims.append(reserved + len(tasks))
+        return tasks
+
+    monkeypatch.setattr(task_workers, "get_next_fair_tasks", recording)
+    pool = task_workers.WorkerPool("coding", StubAgent(delay=0.02), concurrency=3)
+    for i in range(20):
+        task_queue.add_task("coding", f"Task {i}")
+    pool.start()
+
+    assert wait_for(lambda: pool.get_stats()["completed"] == 20)
+    pool.stop(timeout=5)
+    assert claims and max(claims) <= 3
+    assert pool._reserved == 0
+
+
+def test_threads_do_not_share_agent_history(queue_db):
+    """Test that each thread runs its own agent copy with bounded history."""
+    from llm_framework.core.agent import Agent, AgentConfig
+    from llm_framework.providers.mock_provider import MockLLMProvider
+
+    agent = Agent(AgentConfig(name="writer"), MockLLMProvider())
+    pool = task_workers.WorkerPool("writing", agent, concurrency=2)
+    for i in range(4):
+        task_queue.add_task("writing", f"Draft {i}")
+    pool.start()
+
+    assert wait_for(lambda: pool.get_stats()["completed"] == 4)
+    pool.stop(timeout=5)
+    assert agent.conversation_history == []
+
+
+def test_parse_concurrency():
+    """Test per-pool concurrency parsing."""
+    agent_types = ["research", "coding", "writing"]
+
+    assert task_workers.parse_concurrency("coding=4, research=2", agent_types) == {
+        "research": 2, "coding": 4, "writing": 1
+    }
+    with pytest.raises(ValueError):
+        task_workers.parse_concurrency("painting=1", agent_types)
+    with pytest.raises(ValueError):
+        task_workers.parse_concurrency("coding", agent_types)
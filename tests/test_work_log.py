@@ -0,0 +1,95 @@
+"""Tests for the append-only work log."""
+
+import gzip
+import os
+import time
+
+from src.llm_framework.autonomous_agent import AutonomousAgent
+from src.llm_framework.work_log import WorkLogWriter, log_files, read_work_log, tail_work_log
+
+
+def test_writer_appends_and_buffers(tmp_path):
+    """Test that entries are buffered and appended, never rewritten."""
+    path = str(tmp_path / "work.jsonl")
+    writer = WorkLogWriter(path, flush_every=3, flush_interval=60)
+
+    writer.append({"n": 0})
+    writer.append({"n": 1})
+    assert os.path.getsize(path) == 0
+    writer.append({"n": 2})
+    assert [e["n"] for e in read_work_log(path)] == [0, 1, 2]
+
+    writer.append({"n": 3})
+    writer.close()
+    writer = WorkLogWriter(path)
+    writer.append({"n": 4})
+    writer.close()
+    assert [e["n"] for e in read_work_log(path)] == [0, 1, 2, 3, 4]
+
+
+def test_writer_flushes_quiet_entries_on_a_timer(tmp_path):
+    """Test that an entry left buffered reaches the file without another append."""
+    path = str(tmp_path / "work.jsonl")
+    writer = WorkLogWriter(path, flush_every=50, flush_interval=0.1)
+
+    writer.append({"n": 0})
+    assert os.path.getsize(path) == 0
+    time.sleep(0.3)
+    assert [e["n"] for e in read_work_log(path)] == [0]
+    writer.close()
+
+
+def test_writer_rotates_by_size_and_keeps_backups(tmp_path):
+    """Test size rotation, backup retention and reading across files."""
+    path = str(tmp_path / "work.jsonl")
+    writer = WorkLogWriter(path, max_bytes=40, backups=2, flush_every=1)
+    for n in range(12):
+        writer.append({"n": n, "pad": "x" * 10})
+    writer.close()
+
+    files = log_files(path)
+    assert [os.path.basename(f) for f in files] == ["work.jsonl.2", "work.jsonl.1", "work.jsonl"]
+    entries = [e["n"] for e in read_work_log(path)]
+    assert entries == sorted(entries) and entries[-1] == 11 and len(entries) < 12
+
+
+def test_writer_rotates_by_age_with_compression(tmp_path):
+    """Test time rotation into gzip backups."""
+    path = str(tmp_path / "work.jsonl")
+    writer = WorkLogWriter(path, max_age=0, compress=True, flush_every=1)
+    writer.append({"n": 0})
+    writer.append({"n": 1})
+    writer.close()
+
+    with gzip.open(path + ".1.gz", "rt") as f:
+        assert '"n": 0' in f.read()
+    assert [e["n"] for e in read_work_log(path)] == [0, 1]
+    assert [e["n"] for e in read_work_log(path, include_rotated=False)] == [1]
+
+
+def test_tail_reads_only_what_it_needs(tmp_path):
+    """Test tailing within and across rotated files, skipping torn lines."""
+    path = str(tmp_path / "work.jsonl")
+    writer = WorkLogWriter(path, max_bytes=200, compress=True, flush_every=1)
+    for n in range(50):
+        writer.append({"n": n})
+    writer.close()
+    with open(path, "a") as f:
+        f.write('{"n": 5')
+
+    assert [e["n"] for e in tail_work_log(path, 3)] == [47, 48, 49]
+    assert [e["n"] for e in tail_work_log(path, 30)] == list(range(20, 50))
+    assert tail_work_log(str(tmp_path / "missing.jsonl")) == []
+
+
+def test_autonomous_agent_logs_to_writer(tmp_path):
+    """Test that log_work appends to the JSONL log and bounds memory."""
+    path = str(tmp_path / "agent.jsonl")
+    agent = AutonomousAgent("test", None, str(tmp_path), log_writer=WorkLogWriter(path))
+    for n in range(agent.WORK_LOG_MEMORY + 5):
+        agent.log_work({"task": f"task {n}"}, f"result {n}")
+    agent.close()
+
+    assert len(agent.work_log) == agent.WORK_LOG_MEMORY
+    assert tail_work_log(path, 1)[0]["work"]["task"] == f"task {agent.WORK_LOG_MEMORY + 4}"
+    assert sum(1 for _ in read_work_log(path)) == agent.WORK_LOG_MEMORY + 5